@@ -1,5 +1,4 @@
 from PyQt6 import QtCore, QtWidgets, QtGui
-from PyQt6 import uic
 from PyQt6.QtWidgets import *
 from PyQt6.QtCore import *
 from PyQt6.QtGui import *
@@ -10,7 +9,8 @@ import random
 import time
 import pickle
 import csv
-from scipy import signal
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 
 import matplotlib
@@ -19,13 +19,30 @@ from matplotlib.figure import Figure
 matplotlib.use('QtAgg')
 from matplotlib.colors import to_rgba
 
-from python_ble_api import python_ble_api
+from ble_device_manager import BleDeviceManager
 from signal_segmentation_api import signal_segmentation_api
+from design_compiler import CommandCompiler
+from playback_schedule import PlaybackSchedule, LoopRegion, apply_commands, correction, empty_state
+from signal_resampler import resample_chunks
+from waveform_importer import open_audio_file, is_audio_file
+from waveform_lod import LODLine
+from timeline_composer import ComposedTimeline
+from timeline_overview import TimelineOverview
+from timeline_extent import TimelineExtent
+from spatial_index import UniformGrid
 from utils import *
 from timeline_timer import TimelineTimer
+from telemetry import telemetry
+from haptics_logging import get_logger
 from signal_generator import OscillatorDialog, ChirpDialog, NoiseDialog, FMDialog, PWMDialog
 
 import copy
+import logging
+
+playback_log = get_logger('playback')
+canvas_log = get_logger('canvas')
+timeline_log = get_logger('timeline')
+ui_log = get_logger('ui')
 
 class BluetoothDeviceSearchThread(QtCore.QThread):
     devices_found = QtCore.pyqtSignal(list)
@@ -36,19 +53,21 @@ class BluetoothDeviceSearchThread(QtCore.QThread):
 
     def run(self):
         # This method will be executed in a separate thread
-        devices = self.ble_api.get_ble_devices()
+        devices = self.ble_api.scan_devices()  # (name, address) pairs, from the scan cache if it is recent
         self.devices_found.emit(devices)  # Emit the devices found signal
 
 class BluetoothConnectThread(QtCore.QThread):
     connection_result = QtCore.pyqtSignal(bool)
 
-    def __init__(self, ble_api, device_name):
+    def __init__(self, ble_api, address, device_name=None, chains=None):
         super().__init__()
         self.ble_api = ble_api
+        self.address = address  # identical controllers share a name: connect by address
         self.device_name = device_name
+        self.chains = chains  # chain letters driven by this device (None: the unassigned ones)
 
     def run(self):
-        success = self.ble_api.connect_ble_device(self.device_name)
+        success = self.ble_api.connect_ble_address(self.address, self.device_name, self.chains)
         self.connection_result.emit(success)  # Emit the result (success or failure)
 
 class BluetoothConnectDialog(QtWidgets.QDialog):
@@ -75,6 +94,11 @@ class BluetoothConnectDialog(QtWidgets.QDialog):
         self.device_dropdown = QtWidgets.QComboBox(self)
         layout.addWidget(self.device_dropdown)
 
+        # Chains driven by the device when several controllers are used, e.g. "A, B"
+        self.chains_input = QtWidgets.QLineEdit(self)
+        self.chains_input.setPlaceholderText("Chains on this device, e.g. A, B (empty: all unassigned chains)")
+        layout.addWidget(self.chains_input)
+
         # Create a Connect button with the text in gray color to indicate disabled state
         self.connect_button = QtWidgets.QPushButton("Connect", self)
         self.connect_button.setStyleSheet("color: gray;")
@@ -89,7 +113,7 @@ class BluetoothConnectDialog(QtWidgets.QDialog):
         # self.start_search()
 
     def start_search(self):
-        """Start searching for devices in the background thread."""
+        """Start searching for devices in the background thread (recent scan results are reused)."""
         self.device_dropdown.clear()  # Clear the dropdown list
         self.connect_button.setStyleSheet("color: gray;")
         self.connect_button.setEnabled(False)  # Disable connect button while searching
@@ -104,7 +128,8 @@ class BluetoothConnectDialog(QtWidgets.QDialog):
     def load_devices(self, devices):
         """Load BLE devices into the dropdown list once the search is complete."""
         if devices:
-            self.device_dropdown.addItems(devices)
+            for name, address in devices:
+                self.device_dropdown.addItem(f"{name} ({address})", (address, name))
             self.connect_button.setStyleSheet("color: black;")
             self.connect_button.setEnabled(True)  # Enable connect button when devices are found
             self.status_label.setText(f"Found {len(devices)} device(s).")
@@ -114,16 +139,18 @@ class BluetoothConnectDialog(QtWidgets.QDialog):
 
     def connect_to_device(self):
         """Attempt to connect to the selected device in a background thread."""
-        selected_device = self.device_dropdown.currentText()
+        selected_device = self.device_dropdown.currentData()
         if selected_device:
+            address, name = selected_device
             # Lock the buttons and show "Connecting to device..."
             self.connect_button.setStyleSheet("color: gray;")
             self.connect_button.setEnabled(False)
             self.search_button.setEnabled(False)
-            self.status_label.setText(f"Connecting to {selected_device}...")
+            self.status_label.setText(f"Connecting to {name} ({address})...")
 
             # Start the connection in a background thread
-            self.connect_thread = BluetoothConnectThread(self.ble_api, selected_device)
+            chains = [chain.strip().upper() for chain in self.chains_input.text().split(',') if chain.strip()]
+            self.connect_thread = BluetoothConnectThread(self.ble_api, address, name, chains)
             self.connect_thread.connection_result.connect(self.on_connection_finished)
             self.connect_thread.start()
 
@@ -195,116 +222,103 @@ class HapticCommandManager:
         self.ble_api = ble_api
         self.is_playing = False
         self.CHAIN_JUMP_INDEX = 16
-        self.active_actuators = set()
-        self.last_sent_commands = [] # for the end of the slider use
-
-
-    def detect_leaving_edges(self, current_amplitudes):
-        current_actuators = set(current_amplitudes.keys())
-        leaving_edges = self.active_actuators - current_actuators
-        stop_commands = [
-            self.prepare_command(actuator_id, 0, 0, 0)  # Prepare stop command
-            for actuator_id in leaving_edges
-        ]
-        self.active_actuators = current_actuators
-        return stop_commands
-
-    def actuator_id_to_addr(self, actuator_id):
-        chain, index = actuator_id.split('.')
-        return (ord(chain) - ord('A')) * self.CHAIN_JUMP_INDEX + int(index) - 1
-
-    def map_amplitude_to_duty(self, amplitude):
-        # print(f"Input Amplitude: {amplitude}, Mapped Duty: {int(round(amplitude * 15))}")
-        # Map amplitude from 0 to 1 to 0 to 15
-        return int(round(amplitude * 15))
-
-
-    def map_frequency_to_freq_param(self, frequency):
-        if frequency == 0: # no high frequency component, use default 170 Hz
-            return 2
-        else:
-            # Define the frequency set
-            frequency_set = [123, 145, 170, 200, 235, 275, 322, 384]
-            
-            # Find the closest frequency in the set
-            closest_freq = min(frequency_set, key=lambda x: abs(x - frequency))
-            
-            # Return the index of the closest frequency
-            return frequency_set.index(closest_freq)
-
-    def prepare_command(self, actuator_id, amplitude, frequency, start_or_stop=1):
-        return {
-            'addr': self.actuator_id_to_addr(actuator_id),
-            'duty': self.map_amplitude_to_duty(amplitude),
-            'freq': self.map_frequency_to_freq_param(frequency),
-            'start_or_stop': start_or_stop
-        }  # 1 for start
-
-    def process_commands(self, commands):
-        if self.is_playing:
-            commands_filtered, self.last_sent_commands = self.filter_commands(commands, self.last_sent_commands)
-            if len(commands_filtered) > 0:
-                self.ble_api.send_command_list(commands_filtered)  # Send the list of commands
-                print(f"Sending command list at Time {time.perf_counter()}: {commands_filtered}")
-
-    def filter_commands(self, new_commands, old_commands):
-        # Filter out commands that are the same as the last sent commands
-        # update the last sent commands to the new commands, if the same addr is found but different duty, freq, or start_or_stop, update the command
-        # each command is the format of a json object: with addr, duty, freq, start_or_stop
-        new_commands_dict = {c['addr']: c for c in new_commands}
-        old_commands_dict = {c['addr']: c for c in old_commands}
-        filtered_commands = []
-        last_sent_commands = []
-        for addr, new_command in new_commands_dict.items():
-            if addr in old_commands_dict:
-                old_command = old_commands_dict[addr]
-                if new_command != old_command:
-                    filtered_commands.append(new_command)
-                    last_sent_commands.append(new_command)
-                else:
-                    last_sent_commands.append(old_command)
+        # Precompiled playback (see playback_schedule.py)
+        self.schedule = None
+        self.next_frame = 0  # index of the next schedule frame to send
+        self.device_state = empty_state()  # last command sent to every address by the schedule
+        self.region = None  # LoopRegion the schedule wraps around, see set_region
+        self.prepared = None  # schedule packed in the background for the next playback, see prepare_stream
+
+    def load_stream(self, stream):
+        """Pack a compiled stream for the BLE API; the packets are reused while the stream and the routing are unchanged."""
+        if self.schedule is None or not self.schedule.is_valid_for(stream, self.ble_api):
+            prepared = self.prepared
+            if prepared is not None and prepared.is_valid_for(stream, self.ble_api):
+                self.schedule = prepared
             else:
-                filtered_commands.append(new_command)
-                last_sent_commands.append(new_command)
-        return filtered_commands, last_sent_commands
+                self.schedule = PlaybackSchedule(stream, self.ble_api)
+        return self.schedule
 
-        
-
-    def start_playback(self):
+    def prepare_stream(self, stream):
+        """Pack a stream ahead of playback (on a worker thread); load_stream uses it if it is still valid then."""
+        if self.schedule is not None and self.schedule.is_valid_for(stream, self.ble_api):
+            return
+        self.prepared = PlaybackSchedule(stream, self.ble_api)
+
+    def set_region(self, start_time, end_time):
+        """Loop region of the schedule (None to clear it); its wrap batch is packed here, not at every wrap."""
+        if start_time is None or self.schedule is None:
+            self.region = None
+        elif self.region is None or self.region.schedule is not self.schedule \
+                or (self.region.start_time, self.region.end_time) != (start_time, end_time):
+            self.region = LoopRegion(self.schedule, self.ble_api, start_time, end_time)
+        return self.region
+
+    def start_schedule(self, time_position):
+        """Start streaming the loaded schedule at time_position; the actuators playing at that time start at once."""
         self.is_playing = True
+        self.seek(time_position)
+
+    def seek(self, time_position):
+        """Continue the schedule from time_position, sending one batch that corrects what the device is playing."""
+        self.next_frame = self.schedule.index_at(time_position)
+        target = self.schedule.state_at(self.next_frame)
+        commands = correction(self.device_state, target)
+        self.device_state = target
+        if len(commands):
+            self.send_batches(self.ble_api.pack_batches(commands))
+            playback_log.debug("Seek to %f: sent %d correcting commands", time_position, len(commands))
+
+    def due_batches(self, end, batches):
+        """Add the packets of the frames before index end to batches, and track the device state."""
+        for index in range(self.next_frame, end):
+            batches.extend(self.schedule.batches[index])
+            apply_commands(self.device_state, self.schedule.frame_commands(index))
+        self.next_frame = max(self.next_frame, end)
+
+    def send_batches(self, batches):
+        if batches:
+            send_start = time.perf_counter()
+            self.ble_api.send_batches(batches)
+            telemetry.record('tick.send', time.perf_counter() - send_start)
+
+    def play_to(self, time_position):
+        """Send the packets of the schedule frames due at time_position (several, in order, if ticks were late)."""
+        if not self.is_playing:
+            return
+        batches = []
+        self.due_batches(self.schedule.index_at(time_position), batches)
+        self.send_batches(batches)
+
+    def wrap_to(self, time_position):
+        """
+        Finish the loop region and continue at time_position inside it: the last frames, the wrap batch
+        and the first frames of the next pass go out together, so the loop has no gap.
+        """
+        if not self.is_playing:
+            return
+        region = self.region
+        batches = []
+        if self.next_frame <= region.end_index:
+            self.due_batches(region.end_index, batches)
+            batches.extend(region.wrap_batches)
+        else:  # Seeked past the end of the region: correct from what the device is actually playing
+            batches.extend(self.schedule.pack_commands(self.ble_api, correction(self.device_state, region.start_state)))
+        self.device_state = region.start_state.copy()
+        self.next_frame = region.start_index
+        self.due_batches(self.schedule.index_at(time_position), batches)
+        self.send_batches(batches)
 
     def stop_playback(self):
         self.is_playing = False
-        # Generate stop commands for all active actuators based on the current active signals
-        stop_commands = [
-            {"addr": self.actuator_id_to_addr(actuator_id), "duty": 0, "freq": 0, "start_or_stop": 0}
-            for actuator_id in self.active_actuators
-        ]
-        
-        # Send STOP commands to the actuators
-        if stop_commands:
-            self.ble_api.send_command_list(stop_commands)  # Send the list of stop commands
-            self.last_sent_commands = stop_commands  # Log the last sent stop commands
-            current_time = time.time()
-            print(f"[Play Button Stopping] Sending stop command list at {current_time}: {stop_commands}")
+        # Stop commands for every actuator the schedule left playing
+        stop_commands = correction(self.device_state, empty_state())
+        self.device_state = empty_state()
         
-        # Clear active actuators and active signals after sending the stop commands
-        self.active_actuators.clear()
-
-
-    def update(self, current_amplitudes):
-        """Update the playing signals if there is a change."""
-        # Detect leaving edges and generate stop commands
-        stop_commands = self.detect_leaving_edges(current_amplitudes)
-
-        # Prepare all commands for active actuators, ensuring we handle None parameters safely
-        active_commands = []
-        for actuator_id, signal_details in current_amplitudes.items():
-            active_commands.append(self.prepare_command(actuator_id, signal_details["current_amplitude"], signal_details["current_frequency"], 1))
-
-        all_commands = stop_commands + active_commands
-        # Process the commands (not time-guarded)
-        self.process_commands(all_commands)
+        # Send STOP commands to the actuators (packed like the schedule: addresses with no device are dropped)
+        if len(stop_commands):
+            self.send_batches(self.ble_api.pack_batches(stop_commands))
+            playback_log.info("[Play Button Stopping] Sending stop commands at %f to %s", time.time(), stop_commands['addr'].tolist())
 
 class DesignSaver:
     def __init__(self, actuator_canvas, timeline_canvases, mpl_canvas, app_reference):
@@ -449,8 +463,9 @@ class DesignSaver:
         } for actuator in self.actuator_canvas.actuators]
 
     def collect_timeline_data(self):
+        # Read from actuator_signals: the timeline view only holds the actuator currently shown
         timeline_data = []
-        for actuator_id, timeline_canvas in self.timeline_canvases.items():
+        for actuator_id, signals in self.app_reference.actuator_signals.items():
             timeline_data.extend([{
                 'actuator_id': actuator_id,
                 'type': signal["type"],
@@ -460,7 +475,7 @@ class DesignSaver:
                 'high_freq': signal.get("high_freq", None),  # high frequency data
                 'low_freq': signal.get("low_freq", None),    # low frequency data
                 'parameters': signal["parameters"]
-            } for signal in timeline_canvas.signals])
+            } for signal in signals])
         return timeline_data
 
 
@@ -546,6 +561,9 @@ class MplCanvas(FigureCanvas):
         # Enable drag and drop
         self.setAcceptDrops(True)
 
+        # Level-of-detail line showing the current signal
+        self.lod_line = None
+
         # Draw initial empty plot
         self.plot([], [])
 
@@ -558,6 +576,9 @@ class MplCanvas(FigureCanvas):
         pass  # Disable mouse press event handling
 
     def plot(self, x, y):
+        if self.lod_line is not None:
+            self.lod_line.detach()
+            self.lod_line = None
         self.axes.clear()
         bg_color = (134/255, 150/255, 167/255)
         # Convert RGB to rgba using matplotlib.colors.to_rgba
@@ -565,7 +586,8 @@ class MplCanvas(FigureCanvas):
         self.axes.set_facecolor(bg_color)
         
         if len(x) == len(y):
-            self.axes.plot(x, y, color=spine_color)
+            # Only the min/max envelope of each visible pixel is handed to matplotlib
+            self.lod_line = LODLine(self.axes, x, y, color=spine_color)
         else:
             print(f"Error: x and y must have the same length, but have shapes {x.shape} and {y.shape}")
         
@@ -712,6 +734,7 @@ class MplCanvas(FigureCanvas):
         return self.formatting_data(signal_type, data)
 
     def generate_custom_chirp_json(self, signal_type, chirp_type, frequency, amplitude, rate, duration):
+        from scipy import signal  # Imported here rather than at module level: SciPy takes a while to load
         # Time array
         t = np.linspace(0, duration, int(TIME_STAMP * duration))
         
@@ -743,6 +766,7 @@ class MplCanvas(FigureCanvas):
         return self.formatting_data(signal_type, data)
 
     def generate_custom_FM_json(self, signal_type, FM_type, frequency, amplitude, modulation, index, duration):
+        from scipy import signal
         # Time array
         t = np.linspace(0, duration, int(TIME_STAMP * duration))
         
@@ -767,6 +791,7 @@ class MplCanvas(FigureCanvas):
         return self.formatting_data(signal_type, data)
         
     def generate_custom_PWM_json(self, signal_type, frequency, amplitude, duty_cycle, duration):
+        from scipy import signal
         # Time array
         t = np.linspace(0, duration, int(TIME_STAMP * duration))
         # generate PWM signal
@@ -845,7 +870,13 @@ class PreviewCanvas(FigureCanvas):
         # Initialize the canvas size to match layout.ui
         # self.setSizePolicy(QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Expanding)
 
+        # Level-of-detail line showing the previewed signal
+        self.lod_line = None
+
     def plot_default_signal(self, signal_data):
+        if self.lod_line is not None:
+            self.lod_line.detach()
+            self.lod_line = None
         self.axes.clear()
 
         # Define the color for the signal line
@@ -853,7 +884,7 @@ class PreviewCanvas(FigureCanvas):
 
         if signal_data is not None and "data" in signal_data:
             t = np.linspace(0, 1, len(signal_data["data"]))
-            self.axes.plot(t, signal_data["data"], color=spine_color)  # Use spine_color for the line
+            self.lod_line = LODLine(self.axes, t, signal_data["data"], color=spine_color)  # Use spine_color for the line
         else:
             # Clear the plot if signal_data is None or invalid
             self.axes.clear()
@@ -877,6 +908,12 @@ class ActuatorSignalHandler(QObject):
         super().__init__(parent)
         self.actuator_id = actuator_id
 
+# Space kept around the actuator body for the selection/playback rim
+HIGHLIGHT_MARGIN = 4
+
+# Search radius around a click for actuators (covers the body of the largest actuator size)
+ACTUATOR_PICK_RADIUS = 20
+
 class Actuator(QGraphicsItem):
     def __init__(self, x, y, size, color, actuator_type, id, predecessor=None, successor=None):
         super().__init__()
@@ -891,6 +928,19 @@ class Actuator(QGraphicsItem):
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsSelectable)
         self.setAcceptHoverEvents(True)
 
+        # Keep the rendered item in a device-resolution pixmap; it is only repainted on update() or zoom
+        self.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)
+
+        # Spatial index of the canvas this actuator belongs to, kept in sync through itemChange
+        self.spatial_index = None
+        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemSendsGeometryChanges)
+
+        # Playing a signal during playback; drawn like the selection rim but independent of the selection model
+        self.active = False
+
+        # Key of the last glyph pixmap drawn from QPixmapCache
+        self.glyph_cache_key = None
+
         # Create a signal handler for this actuator
         self.signal_handler = ActuatorSignalHandler(self.id)
 
@@ -927,34 +977,84 @@ class Actuator(QGraphicsItem):
                 return name
         return "Unknown"
 
-    def boundingRect(self):
+    def body_rect(self):
         return QRectF(-self.size/2, -self.size/2, self.size, self.size)
 
+    def boundingRect(self):
+        # Include the highlight rim, drawn outside the body
+        return self.body_rect().adjusted(-HIGHLIGHT_MARGIN, -HIGHLIGHT_MARGIN, HIGHLIGHT_MARGIN, HIGHLIGHT_MARGIN)
+
+    def shape(self):
+        path = QPainterPath()
+        path.addRect(self.body_rect())
+        return path
+
+    def itemChange(self, change, value):
+        if change == QGraphicsItem.GraphicsItemChange.ItemPositionHasChanged and self.spatial_index is not None:
+            self.spatial_index.move(self, value.x(), value.y())
+        return super().itemChange(change, value)
+
+    def set_active(self, active):
+        """Show or hide the playback highlight, repainting only when it changes."""
+        if active != self.active:
+            self.active = active
+            self.update()
+
+    def glyph_key(self, resolution):
+        """Pixmap cache key covering everything that changes the rendered glyph."""
+        highlighted = self.isSelected() or self.active
+        return (f"actuator:{self.actuator_type}:{self.color.rgba()}:{self.size}:{highlighted}:{self.id}:"
+                f"{self.text_horizontal_offset}:{self.text_vertical_offset}:{self.calculate_font_size()}:{resolution:.3f}")
+
+    def render_glyph(self, resolution):
+        """Render the actuator into a transparent pixmap at the given device pixels per scene unit."""
+        rect = self.boundingRect()
+        pixmap = QPixmap(max(1, int(np.ceil(rect.width() * resolution))), max(1, int(np.ceil(rect.height() * resolution))))
+        pixmap.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(pixmap)
+        painter.setRenderHints(QPainter.RenderHint.Antialiasing | QPainter.RenderHint.TextAntialiasing)
+        painter.scale(resolution, resolution)
+        painter.translate(-rect.left(), -rect.top())
+        self.draw_glyph(painter)
+        painter.end()
+        return pixmap
+
     def paint(self, painter, option, widget):
+        # Reuse the pre-rendered glyph for the current look and zoom level
+        resolution = option.levelOfDetailFromTransform(painter.worldTransform()) * painter.device().devicePixelRatioF()
+        key = self.glyph_key(resolution)
+        pixmap = QPixmapCache.find(key)
+        if pixmap is None:
+            pixmap = self.render_glyph(resolution)
+            QPixmapCache.insert(key, pixmap)
+        self.glyph_cache_key = key
+        painter.drawPixmap(self.boundingRect(), pixmap, QRectF(pixmap.rect()))
+
+    def draw_glyph(self, painter):
         # Clear any previous drawing to avoid overlap
         painter.setBrush(QBrush(self.color))
         painter.setPen(QPen(Qt.GlobalColor.black, 1))
 
         # Draw the actuator shape based on its type (without the highlight)
         if self.actuator_type == "LRA":
-            painter.drawEllipse(self.boundingRect())
+            painter.drawEllipse(self.body_rect())
         elif self.actuator_type == "VCA":
-            painter.drawRect(self.boundingRect())
+            painter.drawRect(self.body_rect())
         else:  # "M  "
-            painter.drawRoundedRect(self.boundingRect(), 5, 5)
+            painter.drawRoundedRect(self.body_rect(), 5, 5)
 
-        # Now, only draw the highlight rim if the item is selected
-        if self.isSelected():
+        # Now, only draw the highlight rim if the item is selected or playing
+        if self.isSelected() or self.active:
             highlight_pen = QPen(QColor(225, 20, 146), 3)  # Thicker rim for highlighting
             painter.setPen(highlight_pen)
             
             # Draw the highlight rim (slightly larger than the original shape)
             if self.actuator_type == "LRA":
-                painter.drawEllipse(self.boundingRect().adjusted(-2, -2, 2, 2))  # Slightly larger for the rim
+                painter.drawEllipse(self.body_rect().adjusted(-2, -2, 2, 2))  # Slightly larger for the rim
             elif self.actuator_type == "VCA":
-                painter.drawRect(self.boundingRect().adjusted(-2, -2, 2, 2))
+                painter.drawRect(self.body_rect().adjusted(-2, -2, 2, 2))
             else:  # "M  "
-                painter.drawRoundedRect(self.boundingRect().adjusted(-2, -2, 2, 2), 5, 5)
+                painter.drawRoundedRect(self.body_rect().adjusted(-2, -2, 2, 2), 5, 5)
 
         # Set font size
         font = painter.font()
@@ -969,7 +1069,7 @@ class Actuator(QGraphicsItem):
             formatted_id = self.id  # Handle cases where ID does not contain a '.'
 
         # Calculate text position
-        rect = self.boundingRect()
+        rect = self.body_rect()
         text_rect = QRectF(rect.left() + self.text_horizontal_offset,
                         rect.top() + self.text_vertical_offset,
                         rect.width(),
@@ -1033,8 +1133,8 @@ class Actuator(QGraphicsItem):
         self.update()  # Force repaint of the canvas
         canvas.update()  # Ensure the view is updated
 
-        # Trigger a redraw of all lines
-        canvas.redraw_all_lines()
+        # Move the connection lines attached to the dragged actuators
+        canvas.update_actuator_lines(selected_items)
 
     def adjust_text_position(self, vertical_offset, horizontal_offset):
         self.text_vertical_offset = vertical_offset
@@ -1048,6 +1148,10 @@ class Actuator(QGraphicsItem):
         self.update()
     
     def update_properties(self, actuator_type, color):
+        # Drop the glyph rendered with the old look
+        if self.glyph_cache_key is not None:
+            QPixmapCache.remove(self.glyph_cache_key)
+            self.glyph_cache_key = None
         self.actuator_type = actuator_type
         self.color = color
         self.update()
@@ -1143,6 +1247,9 @@ class ActuatorCanvas(QGraphicsView):
         self.setRenderHints(QPainter.RenderHint.Antialiasing)
 
         self.actuators = []
+        self.actuator_index = {}  # id -> Actuator, kept in sync with self.actuators
+        self.spatial_index = UniformGrid()  # actuator positions for neighbourhood queries
+        self.connection_items = {}  # (predecessor id, successor id) -> (line item, arrowhead item)
         self.branch_colors = {}
         self.color_index = 0  # Index for the color list
 
@@ -1171,9 +1278,13 @@ class ActuatorCanvas(QGraphicsView):
         # Initialize a set to track currently selected actuators for quick lookup
         self.current_selected_actuators = set()
 
+        # Playback highlighting: (actuators, clip boundary times, bitmap of active actuators per interval)
+        self.activity_map = None
+        self.active_states = None
+
 
     def handle_selection_change(self):
-        print("Entered handle_selection_change")
+        canvas_log.debug("Entered handle_selection_change")
         # Get the new selection as a set
         new_selected = set(
             item for item in self.scene.selectedItems() if isinstance(item, Actuator)
@@ -1212,7 +1323,7 @@ class ActuatorCanvas(QGraphicsView):
         self.scene.update()
 
 
-    def draw_arrowhead(self, line, ratio=0.55):
+    def arrowhead_polygon(self, line, ratio=0.55):
         # Calculate the midpoint of the line
         midpoint = QPointF((line.p1().x() + ratio * (line.p2().x() - line.p1().x())), 
                             (line.p1().y() + ratio * (line.p2().y() - line.p1().y())))
@@ -1235,20 +1346,57 @@ class ActuatorCanvas(QGraphicsView):
         transform.rotate(-angle)  # Rotate it according to the line's angle
 
         # Apply the transformation to the arrowhead
-        arrow_head = transform.map(arrow_head)
+        return transform.map(arrow_head)
+
+    def add_connection(self, predecessor_actuator, successor_actuator):
+        """Create (or reuse) the line and arrowhead items of a predecessor -> successor edge."""
+        key = (predecessor_actuator.id, successor_actuator.id)
+        items = self.connection_items.get(key)
+        if items is None or items[0].scene() is not self.scene:
+            line_item = self.scene.addLine(QLineF(), QPen(Qt.GlobalColor.black, 2))
+            line_item.setZValue(-1)  # Ensure the line is behind the actuators
+            arrow_item = self.scene.addPolygon(QPolygonF(), QPen(Qt.GlobalColor.black), QBrush(Qt.GlobalColor.black))
+            arrow_item.setZValue(-1)  # Ensure the arrowhead is behind the actuators
+            self.connection_items[key] = (line_item, arrow_item)
+        self.update_connection(key, predecessor_actuator, successor_actuator)
+
+    def update_connection(self, key, predecessor_actuator, successor_actuator):
+        """Move an existing edge to the current positions of its two actuators."""
+        line_item, arrow_item = self.connection_items[key]
+        line = QLineF(predecessor_actuator.pos(), successor_actuator.pos())
+        line_item.setLine(line)
+        arrow_item.setPolygon(self.arrowhead_polygon(line))
+
+    def remove_connection(self, key):
+        line_item, arrow_item = self.connection_items.pop(key)
+        for item in (line_item, arrow_item):
+            if item.scene() is self.scene:
+                self.scene.removeItem(item)
 
-        # Draw the arrowhead
-        arrow_item = self.scene.addPolygon(arrow_head, QPen(Qt.GlobalColor.black), QBrush(Qt.GlobalColor.black))
-        arrow_item.setZValue(-1)  # Ensure the arrowhead is behind the actuators
+    def remove_actuator_connections(self, actuator_id):
+        for key in [key for key in self.connection_items if actuator_id in key]:
+            self.remove_connection(key)
+
+    def update_actuator_lines(self, actuators):
+        """Update only the edges touching the given (moved) actuators."""
+        updated = set()
+        for actuator in actuators:
+            if not isinstance(actuator, Actuator):
+                continue
+            for key in ((actuator.predecessor, actuator.id), (actuator.id, actuator.successor)):
+                if key in self.connection_items and key not in updated:
+                    predecessor_actuator = self.actuator_index.get(key[0])
+                    successor_actuator = self.actuator_index.get(key[1])
+                    if predecessor_actuator and successor_actuator:
+                        self.update_connection(key, predecessor_actuator, successor_actuator)
+                        updated.add(key)
 
     def redraw_all_lines(self):
-        """Redraw all lines connecting actuators and check for topology conflicts."""
-        # Remove all existing lines and arrowheads except for the scale line and text
-        for item in self.scene.items():
-            if isinstance(item, (QGraphicsLineItem, QGraphicsPolygonItem)):
-                self.scene.removeItem(item)
+        """Sync the connection lines with the actuator topology and check for topology conflicts."""
+        # Edges that should be drawn; existing line and arrowhead items are reused
+        edges = {}
 
-        # Iterate through all actuators and draw lines when both conditions are met
+        # Iterate through all actuators and keep the edges where both conditions are met
         for actuator in self.actuators:
             # Check for topology conflicts
             if actuator.predecessor:
@@ -1280,20 +1428,19 @@ class ActuatorCanvas(QGraphicsView):
             if actuator.predecessor:
                 predecessor_actuator = self.get_actuator_by_id(actuator.predecessor)
                 if predecessor_actuator and predecessor_actuator.successor == actuator.id:
-                    # Draw the line from predecessor to current actuator
-                    line = QLineF(predecessor_actuator.pos(), actuator.pos())
-                    line_item = self.scene.addLine(line, QPen(Qt.GlobalColor.black, 2))
-                    line_item.setZValue(-1)  # Ensure the line is behind the actuators
-                    self.draw_arrowhead(line)
+                    edges[(predecessor_actuator.id, actuator.id)] = (predecessor_actuator, actuator)
 
-            # Draw the arrow connecting to the successor
+            # Keep the arrow connecting to the successor
             if actuator.successor:
                 successor_actuator = self.get_actuator_by_id(actuator.successor)
                 if successor_actuator and successor_actuator.predecessor == actuator.id:
-                    line = QLineF(actuator.pos(), successor_actuator.pos())
-                    line_item = self.scene.addLine(line, QPen(Qt.GlobalColor.black, 2))
-                    line_item.setZValue(-1)  # Ensure the line is behind the actuators
-                    self.draw_arrowhead(line)
+                    edges[(actuator.id, successor_actuator.id)] = (actuator, successor_actuator)
+
+        # Remove the edges that no longer exist, then create or move the remaining ones
+        for key in [key for key in self.connection_items if key not in edges]:
+            self.remove_connection(key)
+        for predecessor_actuator, successor_actuator in edges.values():
+            self.add_connection(predecessor_actuator, successor_actuator)
 
     def generate_topology_conflict_warning(self, actuator_id_1, actuator_id_2):
         """Generate a warning message for a topology conflict between two actuators."""
@@ -1360,6 +1507,9 @@ class ActuatorCanvas(QGraphicsView):
         actuator = Actuator(x, y, self.actuator_size, color, actuator_type, new_id, predecessor, successor)
         self.scene.addItem(actuator)
         self.actuators.append(actuator)
+        self.actuator_index[new_id] = actuator
+        self.spatial_index.insert(actuator, x, y)
+        actuator.spatial_index = self.spatial_index
         actuator.setZValue(0)  # Ensure actuator is above the lines
 
         # Update predecessor's successor to the newly added actuator
@@ -1370,20 +1520,13 @@ class ActuatorCanvas(QGraphicsView):
                 pred_actuator.update()
 
                 # Draw a line from the predecessor to the newly added actuator
-                line = QLineF(pred_actuator.pos(), actuator.pos())
-                line_item = self.scene.addLine(line, QPen(Qt.GlobalColor.black, 2))
-                line_item.setZValue(-1)  # Ensure the line is behind the actuators
-                self.draw_arrowhead(line)  # Draw the arrowhead
+                self.add_connection(pred_actuator, actuator)
 
         # Draw an arrow connecting to the successor (if applicable)
         if successor:
-            for act in self.actuators:
-                if act.id == successor:
-                    line = QLineF(actuator.pos(), act.pos())
-                    line_item = self.scene.addLine(line, QPen(Qt.GlobalColor.black, 2))
-                    line_item.setZValue(-1)  # Ensure the line is behind the actuators
-                    self.draw_arrowhead(line)
-                    break
+            succ_actuator = self.get_actuator_by_id(successor)
+            if succ_actuator:
+                self.add_connection(actuator, succ_actuator)
 
         actuator.update()  # Update the new actuator to reflect changes
 
@@ -1393,13 +1536,27 @@ class ActuatorCanvas(QGraphicsView):
 
     def get_actuator_by_id(self, actuator_id):
         """Retrieve an actuator by its ID."""
-        for actuator in self.actuators:
-            if actuator.id == actuator_id:
-                return actuator
-        return None
+        return self.actuator_index.get(actuator_id)
+
+    def is_drop_allowed(self, pos, exclude=None):
+        """Inside the white canvas area and not on top of another actuator."""
+        if not self.canvas_rect.contains(pos):
+            return False
+        return not self.spatial_index.any_within(pos.x(), pos.y(), self.actuator_size, exclude=exclude)
+
+    def forget_actuator_position(self, actuator):
+        self.spatial_index.remove(actuator)
+        actuator.spatial_index = None
 
-    def is_drop_allowed(self, pos):
-        return self.canvas_rect.contains(pos)
+    def actuator_at(self, scene_pos):
+        """Topmost actuator whose body contains scene_pos, looked up in the spatial index."""
+        hits = [actuator for actuator in self.spatial_index.query(scene_pos.x(), scene_pos.y(), ACTUATOR_PICK_RADIUS)
+                if actuator.body_rect().contains(actuator.mapFromScene(scene_pos))]
+        return max(hits, key=lambda actuator: actuator.zValue(), default=None)
+
+    def positions_overlap(self, positions, margin):
+        """True if any of the (x, y) positions lies within margin of an existing actuator."""
+        return any(self.spatial_index.any_within(x, y, margin) for (x, y) in positions)
 
 
     def update_canvas_visuals(self):
@@ -1413,7 +1570,7 @@ class ActuatorCanvas(QGraphicsView):
         self.white_rect_item.setZValue(-999)
 
     def mousePressEvent(self, event):
-        item = self.itemAt(event.pos())
+        item = self.actuator_at(self.mapToScene(event.pos()))
 
         if event.button() == Qt.MouseButton.LeftButton:
             if isinstance(item, Actuator):  # Left-click on an actuator
@@ -1473,9 +1630,12 @@ class ActuatorCanvas(QGraphicsView):
         elif hasattr(self, 'dragging_item') and self.dragging_item:
             if hasattr(self, 'dragging_actuator') and self.dragging_actuator:
                 pos = self.mapToScene(event.pos())
-                if not self.is_drop_allowed(pos):
+                if not self.is_drop_allowed(pos, exclude=self.dragging_actuator):
                     self.scene.removeItem(self.dragging_actuator)
                     self.actuators.remove(self.dragging_actuator)
+                    self.actuator_index.pop(self.dragging_actuator.id, None)
+                    self.forget_actuator_position(self.dragging_actuator)
+                    self.remove_actuator_connections(self.dragging_actuator.id)
                 self.dragging_actuator = None
             self.dragging_item = None
             event.accept()
@@ -1486,6 +1646,7 @@ class ActuatorCanvas(QGraphicsView):
         if hasattr(self, 'dragging_actuator') and self.dragging_actuator:
             pos = self.mapToScene(event.pos())
             self.dragging_actuator.setPos(pos.x(), pos.y())
+            self.update_actuator_lines([self.dragging_actuator])
 
     def start_dragging_item(self, event):
         item = self.dragging_item
@@ -1599,7 +1760,7 @@ class ActuatorCanvas(QGraphicsView):
         # Immediately update the plotter by switching back to the main canvas
         # self.haptics_app.switch_to_main_canvas()
         self.haptics_app.update_plotter(actuator.id, actuator.actuator_type, actuator.color)
-        self.haptics_app.update_actuator_text()
+        self.haptics_app.update_actuator_text([actuator_id])
 
 
     def edit_actuator_properties(self, actuator):
@@ -1610,12 +1771,14 @@ class ActuatorCanvas(QGraphicsView):
                 new_id = dialog.id_input.text()
 
                 # Check for ID conflicts
-                if any(act.id == new_id and act != actuator for act in self.actuators):
+                if self.actuator_index.get(new_id, actuator) is not actuator:
                     # Show a warning message if there's a conflict
                     QMessageBox.warning(self, "ID Conflict Detected", f"Actuator ID '{new_id}' already exists. Please choose a different ID.")
                     continue  # Reopen the dialog for the user to change the ID
                 
                 actuator.id = new_id
+                self.actuator_index.pop(old_id, None)
+                self.actuator_index[new_id] = actuator
                 
                 # Update color if branch has changed
                 old_branch = old_id.split('.')[0]
@@ -1713,6 +1876,8 @@ class ActuatorCanvas(QGraphicsView):
 
         # Remove the actuator from the scene
         self.actuators.remove(actuator)
+        self.actuator_index.pop(actuator.id, None)
+        self.forget_actuator_position(actuator)
         self.scene.removeItem(actuator)
         self.actuator_deleted.emit(actuator.id)  # Emit the deletion signal
 
@@ -1805,25 +1970,12 @@ class ActuatorCanvas(QGraphicsView):
             y = spacing_y * (row + 1)
             actuator_positions.append((x, y))
 
-        # Step 7: Determine bounding box of existing actuators to detect overlap
-        if self.actuators:
-            all_x = [act.pos().x() for act in self.actuators]
-            all_y = [act.pos().y() for act in self.actuators]
-            min_x_existing, max_x_existing = min(all_x), max(all_x)
-            min_y_existing, max_y_existing = min(all_y), max(all_y)
-        else:
-            # No existing actuators, no need to worry about overlap
-            min_x_existing = min_y_existing = max_x_existing = max_y_existing = 0
-
-        # Define a margin to consider for overlapping (in pixels)
+        # Step 7: Define a margin to consider for overlapping (in pixels); existing actuators
+        # closer than this to a new position are found through the spatial index
         margin = 20
 
         # Step 8: Check for overlap and shift positions if necessary
-        overlap_detected = any(
-            (min_x_existing - margin <= x <= max_x_existing + margin and
-            min_y_existing - margin <= y <= max_y_existing + margin)
-            for (x, y) in actuator_positions
-        )
+        overlap_detected = self.positions_overlap(actuator_positions, margin)
 
         shift_x, shift_y = spacing_x, spacing_y  # Define how much to shift each iteration
         max_shift_attempts = 10  # Prevent infinite loops
@@ -1834,11 +1986,7 @@ class ActuatorCanvas(QGraphicsView):
             actuator_positions = [(x + shift_x, y + shift_y) for (x, y) in actuator_positions]
 
             # Re-check for overlap after shifting
-            overlap_detected = any(
-                (min_x_existing - margin <= x <= max_x_existing + margin and
-                min_y_existing - margin <= y <= max_y_existing + margin)
-                for (x, y) in actuator_positions
-            )
+            overlap_detected = self.positions_overlap(actuator_positions, margin)
 
             # Check if any actuator is out of canvas bounds after shifting
             out_of_bounds = False
@@ -1851,11 +1999,7 @@ class ActuatorCanvas(QGraphicsView):
             if out_of_bounds:
                 # If shifting causes out-of-bounds, try shifting in the opposite direction
                 actuator_positions = [(x - 2 * shift_x, y - 2 * shift_y) for (x, y) in actuator_positions]
-                overlap_detected = any(
-                    (min_x_existing - margin <= x <= max_x_existing + margin and
-                    min_y_existing - margin <= y <= max_y_existing + margin)
-                    for (x, y) in actuator_positions
-                )
+                overlap_detected = self.positions_overlap(actuator_positions, margin)
                 shift_attempts += 1
                 continue
 
@@ -1907,7 +2051,10 @@ class ActuatorCanvas(QGraphicsView):
     def clear_canvas(self):
         for actuator in self.actuators:
             self.scene.removeItem(actuator)
+            actuator.spatial_index = None
         self.actuators.clear()
+        self.actuator_index.clear()
+        self.spatial_index.clear()
         self.branch_colors.clear()
         self.actuator_size = 20  # Reset to default size
         self.update_canvas_visuals()
@@ -1922,16 +2069,43 @@ class ActuatorCanvas(QGraphicsView):
                 self.scene.removeItem(item)
             elif isinstance(item, QGraphicsTextItem):
                 self.scene.removeItem(item)
+        self.connection_items.clear()
+
+    def build_activity_map(self):
+        """Precompute which actuators play a clip between each pair of consecutive clip boundaries."""
+        actuators = list(self.actuators)
+        intervals = [(i, signal["start_time"], signal["stop_time"])
+                     for i, actuator in enumerate(actuators)
+                     for signal in self.haptics_app.actuator_signals.get(actuator.id, [])]
+        times = np.unique([t for _, start_time, stop_time in intervals for t in (start_time, stop_time)])
+
+        # bitmap[k, i]: actuator i is active during [times[k], times[k + 1])
+        bitmap = np.zeros((len(times), len(actuators)), dtype=bool)
+        for i, start_time, stop_time in intervals:
+            bitmap[np.searchsorted(times, start_time):np.searchsorted(times, stop_time), i] = True
+
+        self.activity_map = (actuators, times, bitmap)
+        self.active_states = np.array([actuator.active for actuator in actuators], dtype=bool)
+
+    def invalidate_activity_map(self):
+        """Rebuild the activity bitmap on the next highlight (call when signals or actuators changed)."""
+        self.activity_map = None
 
     def highlight_actuators_at_time(self, time_position):
-        for actuator in self.actuators:
-            signals = self.haptics_app.actuator_signals.get(actuator.id, [])
-            is_active = any(signal["start_time"] <= time_position <= signal["stop_time"] for signal in signals)
-            if is_active:
-                actuator.setSelected(True)  # Highlight the actuator
-            else:
-                actuator.setSelected(False)  # Remove highlight
-        self.update()  # Ensure the canvas is updated
+        if self.activity_map is None:
+            self.build_activity_map()
+        actuators, times, bitmap = self.activity_map
+
+        interval = np.searchsorted(times, time_position, side='right') - 1
+        if 0 <= interval < len(bitmap):
+            states = bitmap[interval]
+        else:
+            states = np.zeros(len(actuators), dtype=bool)
+
+        # Only repaint the actuators whose state flipped; the selection is left untouched
+        for i in np.flatnonzero(states != self.active_states):
+            actuators[i].set_active(bool(states[i]))
+        self.active_states = states.copy()
 
 class SelectionBarView(QGraphicsView):
     def __init__(self, scene, parent=None):
@@ -2169,6 +2343,9 @@ class CreateBranchDialog(QDialog):
         self.button_box.button(QDialogButtonBox.StandardButton.Ok).setEnabled(is_valid)
 
 
+# Number of actuator timelines whose composed signal stays cached in the shared TimelineCanvas
+COMPOSED_TIMELINE_CACHE_SIZE = 16
+
 class TimelineCanvas(FigureCanvas):
 
     def __init__(self, parent=None, width=8, height=2, dpi=100, color=(134/255, 150/255, 167/255), label="", app_reference=None):
@@ -2197,6 +2374,11 @@ class TimelineCanvas(FigureCanvas):
         
         self.signals = []  # List to store each signal's data along with their parameters
 
+        # Combined signal of all clips and its LOD pyramid, kept between plots. The canvas is
+        # reused for every actuator, so the most recently shown timelines keep their own cache
+        self.composed_timeline = ComposedTimeline(TIME_STAMP, component='data')
+        self.composed_timelines = OrderedDict()
+
         # Variables to track dragging
         self._dragging = False
         self._last_mouse_x = None
@@ -2204,12 +2386,67 @@ class TimelineCanvas(FigureCanvas):
         # dragggg
         self.signal_duration = 0  # Store the signal duration
 
+        # Persistent artists: the level-of-detail signal line and the pan arrows are created once
+        # and only updated in place by plot_signal_data
+        self.lod_line = LODLine(self.axes, [], [], color=spine_color)
+
+        # Adjust arrow size and location using mutation_scale
+        arrow_props = dict(facecolor='gray', edgecolor='none', alpha=0.6, mutation_scale=50)
+        self.pan_arrows = [
+            # Left arrow at the start of the plot
+            self.axes.annotate('', xy=(0.035, 0.5), xytext=(-0.1, 0.5),
+                            xycoords='axes fraction', textcoords='axes fraction',
+                            arrowprops=dict(arrowstyle='-|>', **arrow_props)),
+            # Right arrow at the end of the plot
+            self.axes.annotate('', xy=(0.965, 0.5), xytext=(1.1, 0.5),
+                            xycoords='axes fraction', textcoords='axes fraction',
+                            arrowprops=dict(arrowstyle='-|>', **arrow_props)),
+        ]
+        for arrow in self.pan_arrows:
+            arrow.set_visible(False)
+
+        # Blitting state while panning: the static figure is cached once per drag and only the
+        # x-axis and the signal line are redrawn, at most once per frame (~60 fps)
+        self._pan_background = None
+        self._pending_xlim = None
+        self._pan_timer = QTimer(self)
+        self._pan_timer.setSingleShot(True)
+        self._pan_timer.setInterval(16)
+        self._pan_timer.timeout.connect(self.render_pan_frame)
+
+    def show_actuator(self, actuator_id, color, signals):
+        """Swap the canvas over to another actuator's timeline without rebuilding the figure."""
+        # Stop any pan in progress on the previous timeline
+        self._pan_timer.stop()
+        self._pending_xlim = None
+        if self._dragging:
+            self._dragging = False
+            self.end_pan()
+
+        self.fig.set_facecolor(color)
+        self.axes.set_facecolor(color)
+        self.setStyleSheet(f"background-color: rgba({int(color[0]*255)}, {int(color[1]*255)}, {int(color[2]*255)}, 0);")
+
+        # Least recently used cache of composed timelines, one per actuator
+        if actuator_id in self.composed_timelines:
+            self.composed_timelines.move_to_end(actuator_id)
+        else:
+            self.composed_timelines[actuator_id] = ComposedTimeline(TIME_STAMP, component='data')
+            if len(self.composed_timelines) > COMPOSED_TIMELINE_CACHE_SIZE:
+                self.composed_timelines.popitem(last=False)
+        self.composed_timeline = self.composed_timelines[actuator_id]
+
+        self.signals = signals
+        self.signal_duration = 0
+        self.plot_all_signals()
+
     # dragggg
     def mousePressEvent(self, event):
         # Keep the original left-click dragging functionality
         if event.button() == Qt.MouseButton.LeftButton and self.signal_duration > 2:
             self._dragging = True
             self._last_mouse_x = event.position().x()
+            self.begin_pan()
 
         # Code for upper timeline canvas right click
         # # Add new code for right-click context menu
@@ -2245,17 +2482,57 @@ class TimelineCanvas(FigureCanvas):
         if self._dragging and self.signal_duration > 2:
             dx = event.position().x() - self._last_mouse_x
             self._last_mouse_x = event.position().x()
-            xmin, xmax = self.axes.get_xlim()
+            xmin, xmax = self._pending_xlim or self.axes.get_xlim()
             delta_x = dx * (xmax - xmin) / self.fig.get_size_inches()[0] / self.fig.dpi
             # Limit dragging to the signal duration
             if xmin - delta_x >= 0 and xmax - delta_x <= self.signal_duration:
-                self.axes.set_xlim(xmin - delta_x, xmax - delta_x)
-                self.draw()
+                # Coalesce mouse moves; the view is rendered by the frame timer
+                self._pending_xlim = (xmin - delta_x, xmax - delta_x)
+                if not self._pan_timer.isActive():
+                    self._pan_timer.start()
     # dragggg
     def mouseReleaseEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
+            if self._dragging:
+                self._pan_timer.stop()
+                self.render_pan_frame()
+                self.end_pan()
             self._dragging = False
 
+    def begin_pan(self):
+        """Cache everything except the x-axis and the signal line so pan frames can be blitted."""
+        if not self.supports_blit:
+            return
+        self.lod_line.line.set_animated(True)
+        self.axes.xaxis.set_animated(True)
+        self.draw()
+        self._pan_background = self.copy_from_bbox(self.fig.bbox)
+        self.blit_pan_artists()
+
+    def render_pan_frame(self):
+        """Apply the pending x-range and redraw only what changes while panning."""
+        if self._pending_xlim is None:
+            return
+        self.axes.set_xlim(*self._pending_xlim)  # Also refreshes the level-of-detail line data
+        self._pending_xlim = None
+        if self._pan_background is not None:
+            self.restore_region(self._pan_background)
+            self.blit_pan_artists()
+        else:
+            self.draw_idle()
+
+    def blit_pan_artists(self):
+        self.axes.draw_artist(self.axes.xaxis)
+        self.axes.draw_artist(self.lod_line.line)
+        self.blit(self.fig.bbox)
+
+    def end_pan(self):
+        """Return the animated artists to the regular draw and repaint the full figure once."""
+        self._pan_background = None
+        self.lod_line.line.set_animated(False)
+        self.axes.xaxis.set_animated(False)
+        self.draw_idle()
+
     def check_overlap(self, new_start_time, new_stop_time):
         for signal in self.signals:
             if not (new_stop_time <= signal["start_time"] or new_start_time >= signal["stop_time"]):
@@ -2290,48 +2567,8 @@ class TimelineCanvas(FigureCanvas):
 
 
     def replace_overlap(self, new_start_time, new_stop_time, new_signal_data, new_signal_type, new_signal_parameters):
-        adjusted_signals = []
-
-        for signal in self.signals:
-            if signal["start_time"] < new_start_time < signal["stop_time"]:
-                # Case: The new signal overlaps the end of this signal
-                if new_stop_time < signal["stop_time"]:
-                    # Trim the end of the original signal and keep the non-overlapping part
-                    signal_part = {
-                        "type": signal["type"],
-                        "data": signal["data"][:int((new_start_time - signal["start_time"]) * TIME_STAMP)],
-                        "high_freq": signal["high_freq"][:int((new_start_time - signal["start_time"]) * TIME_STAMP)],
-                        "low_freq": signal["low_freq"][:int((new_start_time - signal["start_time"]) * TIME_STAMP)],
-                        "start_time": signal["start_time"],
-                        "stop_time": new_start_time,
-                        "parameters": signal["parameters"]
-                    }
-                    adjusted_signals.append(signal_part)
-                else:
-                    # Remove the overlapping portion of the original signal
-                    signal["stop_time"] = new_start_time
-                    signal["data"] = signal["data"][:int((new_start_time - signal["start_time"]) * TIME_STAMP)]
-                    signal["high_freq"] = signal["high_freq"][:int((new_start_time - signal["start_time"]) * TIME_STAMP)]
-                    signal["low_freq"] = signal["low_freq"][:int((new_start_time - signal["start_time"]) * TIME_STAMP)]
-                    adjusted_signals.append(signal)
-
-            elif signal["start_time"] < new_stop_time < signal["stop_time"]:
-                # Case: The new signal overlaps the start of this signal
-                signal["start_time"] = new_stop_time
-                signal["data"] = signal["data"][int((new_stop_time - signal["start_time"]) * TIME_STAMP):]
-                signal["high_freq"] = signal["high_freq"][int((new_stop_time - signal["start_time"]) * TIME_STAMP):]
-                signal["low_freq"] = signal["low_freq"][int((new_stop_time - signal["start_time"]) * TIME_STAMP):]
-                adjusted_signals.append(signal)
-
-            elif new_start_time <= signal["start_time"] and new_stop_time >= signal["stop_time"]:
-                # Case: The new signal completely overlaps this signal, so the original signal is removed
-
-                continue
-            else:
-                # No overlap, keep the signal as is
-                adjusted_signals.append(signal)
-
-        # Add the new signal as well
+        # Trim, split or drop the signals under the new one, then add the new signal
+        adjusted_signals = cut_signal_range(self.signals, new_start_time, new_stop_time)
         adjusted_signals.append({
             "type": new_signal_type,
             "data": new_signal_data["data"],
@@ -2347,62 +2584,8 @@ class TimelineCanvas(FigureCanvas):
 
 
     def adjust_previous_signals(self, new_start_time, new_stop_time):
-        adjusted_signals = []
-        for signal in self.signals:
-            if signal["start_time"] < new_start_time < signal["stop_time"]:
-                # Case: The new signal overlaps the end of this signal
-                if new_stop_time < signal["stop_time"]:
-                    # Trim the end of the original signal and keep the non-overlapping part
-                    signal_part = {
-                        "type": signal["type"],
-                        "data": signal["data"][:int((new_start_time - signal["start_time"]) * TIME_STAMP)],
-                        "high_freq": signal["high_freq"][:int((new_start_time - signal["start_time"]) * TIME_STAMP)],
-                        "low_freq": signal["low_freq"][:int((new_start_time - signal["start_time"]) * TIME_STAMP)],
-                        "start_time": signal["start_time"],
-                        "stop_time": new_start_time,
-                        "parameters": signal["parameters"]
-                    }
-                    adjusted_signals.append(signal_part)
-                else:
-                    # Remove the overlapping portion of the original signal
-                    signal["stop_time"] = new_start_time
-                    signal["data"] = signal["data"][:int((new_start_time - signal["start_time"]) * TIME_STAMP)]
-                    signal["high_freq"] = signal["high_freq"][:int((new_start_time - signal["start_time"]) * TIME_STAMP)]
-                    signal["low_freq"] = signal["low_freq"][:int((new_start_time - signal["start_time"]) * TIME_STAMP)]
-                    adjusted_signals.append(signal)
-            elif signal["start_time"] < new_stop_time < signal["stop_time"]:
-                # Case: The new signal overlaps the start of this signal
-                signal["start_time"] = new_stop_time
-                signal["data"] = signal["data"][int((new_stop_time - signal["start_time"]) * TIME_STAMP):]
-                signal["high_freq"] = signal["high_freq"][int((new_stop_time - signal["start_time"]) * TIME_STAMP):]
-                signal["low_freq"] = signal["low_freq"][int((new_stop_time - signal["start_time"]) * TIME_STAMP):]
-                adjusted_signals.append(signal)
-            elif signal["start_time"] < new_start_time and signal["stop_time"] > new_stop_time:
-                # Case: The new signal completely overlaps this signal
-                signal_part1 = {
-                    "type": signal["type"],
-                    "data": signal["data"][:int((new_start_time - signal["start_time"]) * TIME_STAMP)],
-                    "high_freq": signal["high_freq"][:int((new_start_time - signal["start_time"]) * TIME_STAMP)],
-                    "low_freq": signal["low_freq"][:int((new_start_time - signal["start_time"]) * TIME_STAMP)],
-                    "start_time": signal["start_time"],
-                    "stop_time": new_start_time,
-                    "parameters": signal["parameters"]
-                }
-                signal_part2 = {
-                    "type": signal["type"],
-                    "data": signal["data"][int((new_stop_time - signal["start_time"]) * TIME_STAMP):],
-                    "high_freq": signal["high_freq"][int((new_stop_time - signal["start_time"]) * TIME_STAMP):],
-                    "low_freq": signal["low_freq"][int((new_stop_time - signal["start_time"]) * TIME_STAMP):],
-                    "start_time": new_stop_time,
-                    "stop_time": signal["stop_time"],
-                    "parameters": signal["parameters"]
-                }
-                adjusted_signals.extend([signal_part1, signal_part2])
-            else:
-                # No overlap, keep the signal as is
-                adjusted_signals.append(signal)
-
-        self.signals = adjusted_signals
+        # Keep only the parts of the previous signals outside the new time range
+        self.signals = cut_signal_range(self.signals, new_start_time, new_stop_time)
 
 
     def set_custom_xlabel(self, xlabel, fontsize=9.5, color='black'):
@@ -2438,10 +2621,7 @@ class TimelineCanvas(FigureCanvas):
                         'low_freq': low_freq_signal.tolist()     # Low frequency data
                     }
 
-                    # Print the lengths of data, high_freq, and low_freq
-                    print(f"Original Data Length: {len(signal_data['data'])}, First 10 elements: {signal_data['data'][:10]}, Min: {min(signal_data['data'])}, Max: {max(signal_data['data'])}")
-                    print(f"High Frequency Data Length: {len(signal_data['high_freq'])}, First 10 elements: {signal_data['high_freq'][:10]}, Min: {min(signal_data['high_freq'])}, Max: {max(signal_data['high_freq'])}")
-                    print(f"Low Frequency Data Length: {len(signal_data['low_freq'])}, First 10 elements: {signal_data['low_freq'][:10]}, Min: {min(signal_data['low_freq'])}, Max: {max(signal_data['low_freq'])}")
+                    self.log_signal_components(signal_data)
 
 
                     # Check for overlapping signals and handle accordingly
@@ -2480,10 +2660,7 @@ class TimelineCanvas(FigureCanvas):
                         'low_freq': low_freq_signal.tolist()     # Low frequency data
                     }
 
-                    # Print the lengths of data, high_freq, and low_freq
-                    print(f"Original Data Length: {len(signal_data['data'])}, First 10 elements: {signal_data['data'][:10]}, Min: {min(signal_data['data'])}, Max: {max(signal_data['data'])}")
-                    print(f"High Frequency Data Length: {len(signal_data['high_freq'])}, First 10 elements: {signal_data['high_freq'][:10]}, Min: {min(signal_data['high_freq'])}, Max: {max(signal_data['high_freq'])}")
-                    print(f"Low Frequency Data Length: {len(signal_data['low_freq'])}, First 10 elements: {signal_data['low_freq'][:10]}, Min: {min(signal_data['low_freq'])}, Max: {max(signal_data['low_freq'])}")
+                    self.log_signal_components(signal_data)
 
 
                     # Check for overlapping signals and handle accordingly
@@ -2509,7 +2686,7 @@ class TimelineCanvas(FigureCanvas):
         for actuator_id in selected_actuators:
             self.app_reference.actuator_signals[actuator_id] = copy.deepcopy(final_signals)
 
-        self.app_reference.update_actuator_text()
+        self.app_reference.update_actuator_text(selected_actuators)
         self.app_reference.update_pushButton_5_state()
 
 
@@ -2552,10 +2729,18 @@ class TimelineCanvas(FigureCanvas):
         return None  # Return None if dialog was canceled or invalid
 
 
+    def log_signal_components(self, signal_data):
+        """Log the length, first samples and range of each component (min/max over the whole clip, so only when enabled)."""
+        if not timeline_log.isEnabledFor(logging.DEBUG):
+            return
+        for name, label in (('data', "Original Data"), ('high_freq', "High Frequency Data"), ('low_freq', "Low Frequency Data")):
+            values = signal_data[name]
+            timeline_log.debug("%s Length: %d, First 10 elements: %s, Min: %s, Max: %s", label, len(values), values[:10], min(values), max(values))
+
     def record_signal(self, signal_type, signal_data, start_time, stop_time, parameters):
         """Record the signal to the timelinecanvas. In there the signal_data is unpacked to "data", "high_freq", and "low_freq" """
         # Record the signal data, including original, high frequency, and low frequency components
-        print("Recorded")
+        timeline_log.debug("Recorded %s from %s to %s s", signal_type, start_time, stop_time)
         self.signals.append({
             "type": signal_type,
             "data": signal_data['data'],          # Store the original data as "data"
@@ -2567,94 +2752,41 @@ class TimelineCanvas(FigureCanvas):
         })
 
     def plot_all_signals(self):
-        # Set a variable to control which signal component to plot
-        component_to_plot = 'data'  # Options: 'data', 'high_freq', 'low_freq'
-
-        if not self.signals:
-            # If no signals recorded, render a default plot with 10 seconds of 0 amplitude
-            default_duration = 10  # seconds
-            t = np.linspace(0, default_duration, TIME_STAMP * default_duration)
-            signal_data = np.zeros_like(t)
-            self.plot_signal_data(t, signal_data)
-            return
+        # Only the sample ranges of clips that changed since the last plot are composed again
+        max_stop_time, combined_signal, pyramid = self.composed_timeline.update(self.signals)
 
-        # Determine the max stop time across all recorded signals
-        max_stop_time = max([signal["stop_time"] for signal in self.signals])
-
-        # Store the signal duration for use in dragging functionality
-        self.signal_duration = max_stop_time
-
-        # Initialize an empty array of zeros for the full duration
-        total_samples = int(max_stop_time * TIME_STAMP)
-        combined_signal = np.zeros(total_samples)
-
-        # Fill in the combined signal with each recorded signal's selected data component
-        for signal in self.signals:
-            start_sample = int(signal["start_time"] * TIME_STAMP)
-            stop_sample = int(signal["stop_time"] * TIME_STAMP)
-            signal_duration = stop_sample - start_sample
-
-            # Use only the selected component (data, high_freq, low_freq)
-            if component_to_plot in signal and len(signal[component_to_plot]) > 0:
-                # Adjust the signal data to fit the required duration (stretch or truncate as needed)
-                signal_data = np.tile(signal[component_to_plot], int(np.ceil(signal_duration / len(signal[component_to_plot]))))[:signal_duration]
-
-                # If the adjusted signal_data is still too short, pad it with zeros
-                if len(signal_data) < signal_duration:
-                    signal_data = np.pad(signal_data, (0, signal_duration - len(signal_data)), 'constant')
-            else:
-                # Handle the case where the selected component is empty or not available
-                signal_data = np.zeros(signal_duration)  # Fallback to an empty signal for this duration
+        if self.signals:
+            # Store the signal duration for use in dragging functionality
+            self.signal_duration = max_stop_time
 
-            # Perform the assignment to the combined signal
-            combined_signal[start_sample:stop_sample] = signal_data
+        # The line only needs the first and last sample times of the evenly spaced time axis
+        t = (0, max_stop_time)
+        self.plot_signal_data(t, combined_signal, pyramid)
 
-        # Generate time array for the x-axis
-        t = np.linspace(0, max_stop_time, total_samples)
-        self.plot_signal_data(t, combined_signal)
 
-
-    def plot_signal_data(self, t, signal_data):
-        # Clear the current plot and plot the new signal
-        self.axes.clear()
-        
-        # Set spine color and customize appearance
-        spine_color = to_rgba((240/255, 235/255, 229/255))
-        self.axes.spines['bottom'].set_color(spine_color)
-        self.axes.spines['top'].set_color(spine_color)
-        self.axes.spines['right'].set_color(spine_color)
-        self.axes.spines['left'].set_color(spine_color)
-        self.axes.tick_params(axis='x', colors=spine_color, labelsize=8)
-        self.axes.tick_params(axis='y', colors=spine_color, labelsize=8)
-        self.axes.set_ylabel('Amplitude', fontsize=9.5, color=spine_color)
-        self.set_custom_xlabel('Time (s)', fontsize=9.5, color=spine_color)
-
-        # Plot the signal data
-        self.axes.plot(t, signal_data, color=spine_color)
+    def plot_signal_data(self, t, signal_data, pyramid=None):
+        # Swap the new signal into the persistent line; axes styling and annotations are kept
+        self.lod_line.set_signal(t, signal_data, pyramid)
+        self.axes.relim()
 
         #draggg
         # Check if the signal is longer than 10 seconds
-        if self.signal_duration > 2:
+        long_signal = self.signal_duration > 2
+        for arrow in self.pan_arrows:
+            arrow.set_visible(long_signal)
+        if long_signal:
             self.axes.set_xlim(0, 2)  # Show only the first 10 seconds initially
-            
-            # Adjust arrow size and location using mutation_scale
-            arrow_props = dict(facecolor='gray', edgecolor='none', alpha=0.6, mutation_scale=50)
-
-            # Left arrow at the start of the plot
-            self.axes.annotate('', xy=(0.035, 0.5), xytext=(-0.1, 0.5),
-                            xycoords='axes fraction', textcoords='axes fraction',
-                            arrowprops=dict(arrowstyle='-|>', **arrow_props))
-
-            # Right arrow at the end of the plot
-            self.axes.annotate('', xy=(0.965, 0.5), xytext=(1.1, 0.5),
-                            xycoords='axes fraction', textcoords='axes fraction',
-                            arrowprops=dict(arrowstyle='-|>', **arrow_props))
+        else:
+            self.axes.set_autoscalex_on(True)
+        self.axes.autoscale_view()
+        self.lod_line.refresh()
 
         # Draw the updated plot
         self.draw()
 
 
     def generate_signal_data(self, signal_type, parameters):
+        from scipy import signal
         # Generate the signal data based on the type and modified parameters
         t = np.linspace(0, parameters["duration"], int(TIME_STAMP * parameters["duration"]))
         if signal_type == "Sine":
@@ -2753,6 +2885,71 @@ class TimeInputDialog(QDialog):
         button_box.rejected.connect(self.reject)
         layout.addWidget(button_box)
 
+class TelemetryDialog(QDialog):
+    """Live table of the playback telemetry (tick phases, timer jitter, BLE write latency)."""
+    COLUMNS = ["Metric", "Count", "Mean (ms)", "p50 (ms)", "p95 (ms)", "p99 (ms)", "Max (ms)"]
+    KEYS = ["count", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Playback Statistics")
+        self.resize(620, 320)
+        layout = QVBoxLayout(self)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table)
+
+        button_layout = QHBoxLayout()
+        reset_button = QPushButton("Reset")
+        reset_button.clicked.connect(self.reset)
+        save_button = QPushButton("Save as JSON...")
+        save_button.clicked.connect(self.save_json)
+        button_layout.addWidget(reset_button)
+        button_layout.addStretch()
+        button_layout.addWidget(save_button)
+        layout.addLayout(button_layout)
+
+        # Refresh twice a second while the dialog is visible
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(500)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        self.refresh()
+        self.refresh_timer.start()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.refresh_timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        summary = telemetry.summary()
+        self.table.setRowCount(len(summary))
+        for row, (name, stats) in enumerate(summary.items()):
+            self.table.setItem(row, 0, QTableWidgetItem(name))
+            for column, key in enumerate(self.KEYS, start=1):
+                value = stats[key]
+                item = QTableWidgetItem(str(value) if key == "count" else f"{value:.3f}")
+                item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.table.setItem(row, column, item)
+
+    def reset(self):
+        telemetry.reset()
+        self.refresh()
+
+    def save_json(self):
+        file_name, _ = QFileDialog.getSaveFileName(self, "Save Playback Statistics", "telemetry.json", "JSON Files (*.json)")
+        if file_name:
+            try:
+                telemetry.dump_json(file_name)
+            except OSError as e:
+                QMessageBox.warning(self, "Error", f"Failed to save statistics: {str(e)}")
+
 class CanvasSizeDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -2886,17 +3083,51 @@ class FloatingVerticalSlider(QSlider):
                 time_position = total_time * (new_x - self.left_offset) / (self.parent().width() - self.left_offset - self.right_offset)
                 self.app_reference.set_current_time_position_manually(time_position)
 
-class Haptics_App(QtWidgets.QMainWindow):
+LAYOUT_UI_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'layout.ui')
+LAYOUT_PY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'layout.py')
+
+class RuntimeLayout:
+    """Fallback when layout.py is missing or older than layout.ui: parse layout.ui at startup as before."""
+    def setupUi(self, MainWindow):
+        from PyQt6 import uic
+        uic.loadUi(LAYOUT_UI_PATH, MainWindow)
+
+def compile_layout():
+    """Regenerate layout.py from layout.ui (run `python app.py --compile-layout` after editing it in Qt Designer)."""
+    import io
+    from PyQt6.uic import compileUi
+    # Compile into memory first so a failure never leaves a half-written layout.py behind
+    generated = io.StringIO()
+    with open(LAYOUT_UI_PATH, 'r', encoding='utf-8') as ui_file:
+        compileUi(ui_file, generated)
+    with open(LAYOUT_PY_PATH, 'w', encoding='utf-8') as py_file:
+        py_file.write(generated.getvalue())
+
+def load_compiled_layout():
+    """
+    Return the Ui_MainWindow class of the checked-in, pyuic-compiled layout.py. Nothing is written
+    at runtime: if layout.ui is newer (edited but not recompiled), layout.ui is parsed instead.
+    """
+    if os.path.exists(LAYOUT_UI_PATH) and (not os.path.exists(LAYOUT_PY_PATH)
+                                           or os.path.getmtime(LAYOUT_UI_PATH) > os.path.getmtime(LAYOUT_PY_PATH)):
+        ui_log.warning("layout.py is older than layout.ui, loading layout.ui at runtime (run `python app.py --compile-layout`)")
+        return RuntimeLayout
+
+    try:
+        from layout import Ui_MainWindow
+    except ImportError as e:
+        ui_log.warning("Could not import layout.py (%s), loading layout.ui at runtime", e)
+        return RuntimeLayout
+    return Ui_MainWindow
+
+Ui_MainWindow = load_compiled_layout()
+
+class Haptics_App(QtWidgets.QMainWindow, Ui_MainWindow):
     def __init__(self):
         super().__init__()
-        # Get the absolute path to the current script
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-
-        # Construct the absolute path to the layout.ui file
-        ui_file_path = os.path.join(current_dir, 'layout.ui')
-
-        # Load the UI file
-        self.ui = uic.loadUi(ui_file_path, self)
+        # Build the widgets from the compiled layout (no .ui parsing at startup)
+        self.setupUi(self)
+        self.ui = self
  
         self.resize(1500, 750)
         self.setWindowTitle("VibraForge GUI Editor")
@@ -2972,11 +3203,12 @@ class Haptics_App(QtWidgets.QMainWindow):
         # Connect the actuator_added signal to the add_actuator_to_timeline slot
         self.actuator_canvas.actuator_added.connect(self.add_actuator_to_timeline)
 
-        # Setup scroll area for timeline
+        # Setup scroll area for timeline: one custom-painted widget draws a row per actuator
         self.timeline_layout = QVBoxLayout(self.ui.scrollAreaWidgetContents)
-
-        # Dictionary to store references to timeline widgets
-        self.timeline_widgets = {}
+        self.timeline_overview = TimelineOverview(self.ui.scrollAreaWidgetContents)
+        self.timeline_overview.clip_context_menu_requested.connect(self.show_signal_context_menu)
+        self.timeline_layout.addWidget(self.timeline_overview)
+        self.timeline_layout.addStretch()
 
         # Connect the properties_changed signal to the update_timeline_actuator slot
         self.actuator_canvas.properties_changed.connect(self.update_timeline_actuator)
@@ -3012,9 +3244,13 @@ class Haptics_App(QtWidgets.QMainWindow):
 
         # Add a dictionary to store signals for each actuator
         self.actuator_signals = {}
+        # Largest stop time of all clips, updated with each edit (see update_actuator_text)
+        self.timeline_extent = TimelineExtent()
 
-        # Initialize timeline_canvases as an empty dictionary
+        # Initialize timeline_canvases as an empty dictionary; it maps the actuator currently shown
+        # to the single TimelineCanvas, which is created on first use and then reused for every actuator
         self.timeline_canvases = {}
+        self.timeline_canvas = None
 
         # Instantiate DesignSaver
         self.design_saver = DesignSaver(self.actuator_canvas, self.timeline_canvases, self.maincanvas, self)
@@ -3060,14 +3296,48 @@ class Haptics_App(QtWidgets.QMainWindow):
         # Call this method initially to set the state of pushButton_5
         self.update_pushButton_5_state()
 
-        self.current_amplitudes = {}
 
-        self.ble_api = python_ble_api()
+        self.ble_api = BleDeviceManager()  # One or more BLE controllers, chains sharded across them
         self.haptic_manager = HapticCommandManager(self.ble_api)
+        # Clips are compiled to commands and packed on a worker thread shortly after each edit (and again
+        # when playback starts, for what changed since), so Play does not wait for the whole design
+        self.command_compiler = CommandCompiler(self.timeline_timer.update_interval / 1000)
+        self.compile_executor = ThreadPoolExecutor(max_workers=1)
+        self.compile_future = None
+        self.compile_timer = QtCore.QTimer(self)
+        self.compile_timer.setSingleShot(True)
+        self.compile_timer.setInterval(300)  # Edits often come in bursts (drags, imports): compile once they settle
+        self.compile_timer.timeout.connect(self.prepare_playback_in_background)
 
         self.ui.actionConnect_Bluetooth_Device.triggered.connect(self.show_bluetooth_connect_dialog)
         self.ui.actionDisconnect_Bluetooth_Device.triggered.connect(self.show_bluetooth_disconnect_dialog)
 
+        # Playback statistics (telemetry) panel, created on first use
+        self.telemetry_dialog = None
+        self.actionShow_Playback_Statistics = QAction("Playback Statistics", self)
+        self.ui.menuDevice.addSeparator()
+        self.ui.menuDevice.addAction(self.actionShow_Playback_Statistics)
+        self.actionShow_Playback_Statistics.triggered.connect(self.show_telemetry_dialog)
+
+        # Looping and A/B section playback
+        self.loop_enabled = False
+        self.section = None  # (start, end) time of the A/B section, None for the whole timeline
+        self.section_start = None  # A, until B is set
+        self.wrap_pending = False  # A loop wrap was taken: ticks timed before the timer seeked back are ignored
+        self.menuPlayback = self.ui.menubar.addMenu("Playback")
+        self.actionLoop_Playback = QAction("Loop", self, checkable=True, shortcut="L")
+        self.actionLoop_Playback.toggled.connect(self.set_loop_enabled)
+        self.actionSet_Section_Start = QAction("Set Section Start (A) at Slider", self, shortcut="[")
+        self.actionSet_Section_Start.triggered.connect(self.set_section_start)
+        self.actionSet_Section_End = QAction("Set Section End (B) at Slider", self, shortcut="]")
+        self.actionSet_Section_End.triggered.connect(self.set_section_end)
+        self.actionClear_Section = QAction("Clear Section", self)
+        self.actionClear_Section.triggered.connect(self.clear_section)
+        self.menuPlayback.addAction(self.actionLoop_Playback)
+        self.menuPlayback.addSeparator()
+        for action in (self.actionSet_Section_Start, self.actionSet_Section_End, self.actionClear_Section):
+            self.menuPlayback.addAction(action)
+
         self.bluetooth_connected = False
         self.ui.label.setText('<html>Bluetooth Status:</b> <span style="color:red;"><b>Not Connected</b></span></html>')
         
@@ -3131,15 +3401,16 @@ class Haptics_App(QtWidgets.QMainWindow):
 
 
     def show_bluetooth_connect_dialog(self):
-        """Show the Bluetooth connection dialog if no device is currently connected."""
-        if not self.bluetooth_connected:
-            dialog = BluetoothConnectDialog(self.ble_api, self)
-            dialog.device_selected_signal.connect(self.update_bluetooth_connection_status)  # Handle connection signal
-            dialog.exec()  # Show the dialog
-        else:
-            # If a device is already connected, show a warning message
-            QtWidgets.QMessageBox.warning(self, "Bluetooth Connection",
-                                        "A Bluetooth device is already connected. Please disconnect the current device first.")
+        """Show the Bluetooth connection dialog; further devices can be connected to drive more chains."""
+        dialog = BluetoothConnectDialog(self.ble_api, self)
+        dialog.device_selected_signal.connect(self.update_bluetooth_connection_status)  # Handle connection signal
+        dialog.exec()  # Show the dialog
+
+    def show_telemetry_dialog(self):
+        if self.telemetry_dialog is None:
+            self.telemetry_dialog = TelemetryDialog(self)
+        self.telemetry_dialog.show()
+        self.telemetry_dialog.raise_()
 
     def show_bluetooth_disconnect_dialog(self):
         """Show the Bluetooth disconnection confirmation dialog."""
@@ -3154,10 +3425,14 @@ class Haptics_App(QtWidgets.QMainWindow):
 
     def update_bluetooth_connection_status(self, success):
         """Update the connection status variable based on the connection result."""
-        self.is_bluetooth_connected = success  # Update the connection status
-        if success:
+        # A failed attempt leaves the devices that were already connected in place
+        connected = self.ble_api.connected_devices()
+        self.is_bluetooth_connected = bool(connected)  # Update the connection status
+        self.compile_timer.start()  # The routing changed: pack the stream again before the next Play
+        if connected:
             self.bluetooth_connected = True
-            self.ui.label.setText('<html>Bluetooth Status:</b> <span style="color:green;"><b>Connected</b></span></html>')
+            count = f" ({len(connected)} devices)" if len(connected) > 1 else ""
+            self.ui.label.setText(f'<html>Bluetooth Status:</b> <span style="color:green;"><b>Connected{count}</b></span></html>')
             print("Connected from Haptics")
         else:
             self.bluetooth_connected = False
@@ -3213,13 +3488,49 @@ class Haptics_App(QtWidgets.QMainWindow):
             self.pause_slider_movement()
             self.haptic_manager.stop_playback()
         else:
+            start, end = self.playback_region()
+            if not start <= self.current_time_position < end:
+                self.set_current_time_position_manually(start)  # Section playback starts at A
+            self.start_haptic_playback()  # Compile first: the slider starts moving once the packets are ready
             self.start_slider_movement()
-            self.haptic_manager.start_playback()
+
+    def start_haptic_playback(self):
+        """Compile the clips (edited actuators only) and stream the precompiled packets from the current position."""
+        compile_start = time.perf_counter()
+        stream = self.command_compiler.compile(self.actuator_signals)
+        self.haptic_manager.load_stream(stream)
+        self.haptic_manager.set_region(*self.playback_region())
+        telemetry.record('playback.compile', time.perf_counter() - compile_start)
+        playback_log.info("Compiled %d commands in %.3f s (%d actuators sampled)", len(stream),
+                          time.perf_counter() - compile_start, self.command_compiler.sampled)
+        self.haptic_manager.start_schedule(self.current_time_position)
+
+    def prepare_playback_in_background(self):
+        """Compile the edited actuators and pack the stream on the worker thread, ahead of the next Play."""
+        if self.slider_moving:
+            return  # Leave the CPU to playback: Play compiles what changed
+        # The worker gets its own lists and clip dicts: the GUI thread keeps editing (and sorting) them
+        actuator_signals = {actuator_id: [dict(signal) for signal in signals] for actuator_id, signals in self.actuator_signals.items()}
+        if self.compile_future is not None:
+            self.compile_future.cancel()  # Superseded, unless it already started
+        self.compile_future = self.compile_executor.submit(self.prepare_playback, actuator_signals)
+
+    def prepare_playback(self, actuator_signals):
+        """Runs on the worker thread; start_haptic_playback reuses the stream and packets if nothing changed since."""
+        try:
+            stream = self.command_compiler.compile(actuator_signals)
+            self.haptic_manager.prepare_stream(stream)
+            playback_log.debug("Compiled %d commands in the background (%d actuators sampled)", len(stream),
+                               self.command_compiler.sampled)
+        except Exception:
+            playback_log.exception("Background compile failed, playback compiles when it starts")
 
     def start_slider_movement(self):
         """Start moving the slider based on the current slider position."""
         self.start_time = time.time() - self.current_time_position  # Adjust start time based on current slider position
+        self.actuator_canvas.invalidate_activity_map()  # Signals may have been edited since the last playback
         self.slider_moving = True
+        self.wrap_pending = False
         self.timeline_timer.play()  # Timer interval for updating the slider position
         self.pushButton_5.setIcon(self.pause_icon)
         self.actuator_canvas.setEnabled(False)
@@ -3231,20 +3542,68 @@ class Haptics_App(QtWidgets.QMainWindow):
         self.pushButton_5.setIcon(self.run_icon)  # Switch back to Run icon
         self.actuator_canvas.setEnabled(True)
 
+    def playback_region(self):
+        """(start, end) time that playback runs through: the A/B section, or the whole timeline."""
+        if self.section is not None:
+            return self.section
+        return 0, self.calculate_total_time()
+
+    def set_loop_enabled(self, enabled):
+        self.loop_enabled = enabled
+        self.statusBar().showMessage("Looping " + ("on" if enabled else "off"))
+
+    def set_section_start(self):
+        self.section_start = self.current_time_position
+        if self.section is not None and self.section_start < self.section[1]:
+            self.update_section(self.section_start, self.section[1])
+        else:
+            self.statusBar().showMessage(f"Section start (A) at {self.section_start:.3f} s, set the end (B)")
+
+    def set_section_end(self):
+        start = self.section_start if self.section_start is not None else 0
+        if self.current_time_position <= start:
+            self.statusBar().showMessage("The section end (B) must be after its start (A)")
+            return
+        self.update_section(start, self.current_time_position)
+
+    def clear_section(self):
+        self.section_start = None
+        self.update_section(None, None)
+
+    def update_section(self, start, end):
+        self.section = (start, end) if start is not None else None
+        if self.section is not None:
+            self.statusBar().showMessage(f"Section {start:.3f} s - {end:.3f} s")
+        else:
+            self.statusBar().showMessage("Section cleared")
+        if self.slider_moving:  # Takes effect on the running playback
+            self.haptic_manager.set_region(*self.playback_region())
+
     # calculate the longest play time of all signals
     def calculate_total_time(self):
-        all_stop_times = []
-        for signals in self.actuator_signals.values():
-            all_stop_times.extend([signal["stop_time"] for signal in signals])
-        return max(all_stop_times) if all_stop_times else 0
+        return self.timeline_extent.total_time
 
     def move_slider(self, timeline_time):
         """Move the slider in real time based on the signal's total time."""
         if self.slider_moving:
+            tick_start = time.perf_counter()
+            region_start, region_end = self.playback_region()
+            if self.wrap_pending:
+                if timeline_time >= region_end:
+                    return  # Timed before the wrap reached the timer: its frames were sent with the wrap
+                self.wrap_pending = False
             self.current_time_position = timeline_time
             # Calculate the total time of all signals
             total_time = self.calculate_total_time()
 
+            wrapped = False
+            if self.loop_enabled and self.current_time_position >= region_end > region_start and self.haptic_manager.region:
+                # Wrap to the start of the region, keeping the overshoot so that the timing does not slip.
+                # The timer is shifted rather than set: time that passed since this tick was measured is kept
+                self.current_time_position = self.haptic_manager.region.wrap(timeline_time)
+                self.timeline_timer.shift(self.current_time_position - timeline_time)
+                self.wrap_pending = wrapped = True
+
             # Ensure total_time is valid
             if total_time > 0:
                 # Update the label with the current time
@@ -3262,9 +3621,10 @@ class Haptics_App(QtWidgets.QMainWindow):
                 # Move the slider to the new position
                 self.floating_slider.move(int(new_pos), self.floating_slider.y())
 
-                # Highlight actuators and update signals based on the new time position
-                current_amplitudes = self.update_current_amplitudes(self.current_time_position)
+                # Highlight actuators based on the new time position
                 self.actuator_canvas.highlight_actuators_at_time(self.current_time_position)
+                # UI = time label, slider and highlight, i.e. everything before the haptic update
+                telemetry.record('tick.ui', time.perf_counter() - tick_start)
             else:
                 print("Warning: No signals found or invalid total time.")
                 self.timeline_timer.reset()
@@ -3273,8 +3633,14 @@ class Haptics_App(QtWidgets.QMainWindow):
                 self.actuator_canvas.setEnabled(True)
                 return
 
-            # Stop the slider when it reaches the end of the total time
-            if self.current_time_position >= total_time:
+            # Send the precompiled packets that are due
+            if wrapped:
+                self.haptic_manager.wrap_to(self.current_time_position)
+            else:
+                self.haptic_manager.play_to(min(self.current_time_position, region_end))
+
+            # Stop the slider when it reaches the end of the section or of the total time
+            if self.current_time_position >= region_end:
                 self.timeline_timer.reset()
                 self.slider_moving = False
                 self.pushButton_5.setIcon(self.run_icon)
@@ -3282,18 +3648,23 @@ class Haptics_App(QtWidgets.QMainWindow):
                 self.haptic_manager.stop_playback()
 
                 # Reset to the beginning when reaching the end
-                self.current_time_position = 0  # Reset current position to 0 for next play
+                self.current_time_position = region_start  # Reset current position to the start for next play
+                self.timeline_timer.manual_update(region_start)
 
-            # Update the haptic manager with the new signal information
-            # print(f"timeline time = {self.current_time_position}, time = {time.perf_counter()}")
-            self.haptic_manager.update(current_amplitudes)
+            telemetry.record('tick.total', time.perf_counter() - tick_start)
 
     def set_current_time_position_manually(self, time_position):
         """Set the current time position manually and update the slider position."""
         self.current_time_position = time_position
-        self.timeline_timer.manual_update(self.current_time_position)
+        self.wrap_pending = False
+        if self.slider_moving:
+            # Seek while playing: playback goes on from the new time, the device is corrected in one batch
+            self.timeline_timer.seek(self.current_time_position)
+            self.haptic_manager.seek(self.current_time_position)
+        else:
+            self.timeline_timer.manual_update(self.current_time_position)
         self.update_time_label(self.current_time_position)
-        self.update_current_amplitudes(self.current_time_position)
+        self.actuator_canvas.invalidate_activity_map()
         self.actuator_canvas.highlight_actuators_at_time(self.current_time_position)
 
 
@@ -3338,163 +3709,55 @@ class Haptics_App(QtWidgets.QMainWindow):
             self.raise_slider_layer()  # Ensure the slider layer stays on top after resizing
         return super(Haptics_App, self).eventFilter(source, event)
 
-
-
-    def update_current_amplitudes(self, time_position):
-        # Tracing the low frequency data
-
-        self.current_amplitudes.clear()
-
-        for actuator_id, signals in self.actuator_signals.items():
-            for signal in signals:
-                if signal["start_time"] <= time_position <= signal["stop_time"]:
-                    signal_duration = signal["stop_time"] - signal["start_time"]
-                    relative_position = (time_position - signal["start_time"]) / signal_duration
-                    index = int(relative_position * len(signal["low_freq"]))
-                    
-                    # Ensure index is within bounds
-                    index = max(0, min(index, len(signal["low_freq"]) - 1))
-                    
-                    amplitude = signal["low_freq"][index]
-                    frequency = signal["high_freq"][index]
-                    
-                    # Update current_amplitudes with only the amplitude and frequency
-                    self.current_amplitudes[actuator_id] = {
-                        "current_amplitude": amplitude,
-                        "current_frequency": frequency,
-                    }
-
-                    break  # Only handle one signal per actuator at a time
-
-        # Return both the current_amplitudes
-        return self.current_amplitudes
-
-    def update_actuator_text(self):
-        # Find the global largest stop time across all actuators
-        all_stop_times = []
-        for signals in self.actuator_signals.values():
-            all_stop_times.extend([signal["stop_time"] for signal in signals])
-
-        if all_stop_times:
-            global_total_time = max(all_stop_times)
+    def update_actuator_text(self, actuator_ids=None):
+        """Refresh the timeline overview rows of the given actuators (all of them by default)."""
+        # Keep the global largest stop time up to date; rows are only rescaled when it changes
+        if actuator_ids is None:
+            self.timeline_extent.reset(self.actuator_signals)
         else:
-            global_total_time = 1  # Avoid division by zero in the width calculation
+            for actuator_id in actuator_ids:
+                self.timeline_extent.update(actuator_id, self.actuator_signals.get(actuator_id))
+        self.timeline_overview.set_total_time(self.calculate_total_time())
 
-        # Define the 3 cm left offset and 1 cm right offset in pixels
-        dpi = self.logicalDpiX()  # Get the screen DPI
-        left_offset = (OS_DEPENDENT_VALUE / 2.54) * dpi  # Convert 3 cm to pixels
-        right_offset = (OS_DEPENDENT_VALUE / 2.54) * dpi  # Convert 1 cm to pixels
-
-        # Update the visual timeline for each actuator widget
-        ############################
-        for actuator_id, (actuator_widget, actuator_label) in self.timeline_widgets.items():
-            # Clear existing signal widgets
-            for i in reversed(range(1, actuator_widget.layout().count())):
-                item = actuator_widget.layout().takeAt(i)
-                widget = item.widget()
-                if widget:
-                    widget.deleteLater()
-                else:
-                    del item
-            
-            # Ensure layout is set
-            if not actuator_widget.layout():
-                layout = QtWidgets.QHBoxLayout()
-                actuator_widget.setLayout(layout)
-                layout.setContentsMargins(0, 0, 0, 0)
-                layout.setSpacing(5)
-
-            # Ensure the ID/Type label is in position 0
-            if actuator_label.parent() is None:
-                actuator_widget.layout().insertWidget(0, actuator_label)
-
-            # Check if the actuator has signals
-            if actuator_id in self.actuator_signals:
-                signals = self.actuator_signals[actuator_id]
-
-                timeline_container = QtWidgets.QWidget(actuator_widget)
-                timeline_container.setStyleSheet("background-color: transparent;")
-                timeline_container.setFixedHeight(30)
-                timeline_layout = QtWidgets.QHBoxLayout(timeline_container)
-                timeline_layout.setContentsMargins(0, 0, 0, 0)
-                timeline_layout.setSpacing(0)
-
-                widget_width = actuator_widget.size().width() - left_offset - right_offset
-                last_stop_time = 0
-
-                # Sort signals by start time
-                signals.sort(key=lambda signal: signal["start_time"])
+        if actuator_ids is None:
+            actuator_ids = [row.actuator_id for row in self.timeline_overview.rows]
+        for actuator_id in actuator_ids:
+            signals = self.actuator_signals.get(actuator_id, [])
 
-                for signal in signals:
-                    # Calculate sizes and positions
-                    signal_duration = signal["stop_time"] - signal["start_time"]
-                    signal_width_ratio = signal_duration / global_total_time
-                    signal_width = int(signal_width_ratio * widget_width)
-
-                    signal_start_ratio = signal["start_time"] / global_total_time
-                    signal_start_position = int(signal_start_ratio * widget_width) + left_offset
-
-                    # Add spacer if there's a gap
-                    if signal["start_time"] > last_stop_time:
-                        gap_duration = signal["start_time"] - last_stop_time
-                        gap_width_ratio = gap_duration / global_total_time
-                        gap_width = int(gap_width_ratio * widget_width)
-                        spacer = QtWidgets.QSpacerItem(gap_width, 30, QtWidgets.QSizePolicy.Policy.Fixed, QtWidgets.QSizePolicy.Policy.Minimum)
-                        timeline_layout.addItem(spacer)
-
-                    # Create the signal widget
-                    signal_params = ", ".join([f"{k}: {v}" for k, v in (signal["parameters"] or {}).items()])
-                    signal_text = f'{signal["type"]} ({signal_params})'
-                    signal_widget = QtWidgets.QLabel(signal_text)
-                    signal_widget.setFixedSize(signal_width, 30)
-                    signal_widget.setStyleSheet("""
-                        background-color: rgba(100, 150, 250, 150); 
-                        color: white; 
-                        border-radius: 7px;
-                        padding: 3px;
-                    """)
-
-                    # Store the actuator_id and signal info for reference
-                    signal_widget.setProperty("actuator_id", actuator_id)
-                    signal_widget.setProperty("signal_info", signal)
-
-                    # Enable custom context menu
-                    signal_widget.setContextMenuPolicy(QtCore.Qt.ContextMenuPolicy.CustomContextMenu)
-                    signal_widget.customContextMenuRequested.connect(lambda pos, w=signal_widget: self.show_signal_context_menu(w, pos))
-
-                    timeline_layout.addWidget(signal_widget)
-                    signal_widget.lower()
-
-                    last_stop_time = signal["stop_time"]
-
-                timeline_layout.addStretch()
-                actuator_widget.layout().addWidget(timeline_container)
-                timeline_container.updateGeometry()
-        #################################
-        # After adding all timeline widgets, ensure the slider layer stays on top
-        self.raise_slider_layer()
+            # Sort signals by start time
+            signals.sort(key=lambda signal: signal["start_time"])
+            self.timeline_overview.set_clips(actuator_id, signals)
 
-    def show_signal_context_menu(self, signal_widget, pos):
-        """Show the context menu for the clicked signal widget."""
-        actuator_id = signal_widget.property("actuator_id")
-        signal = signal_widget.property("signal_info")
+        # After updating the timeline, ensure the slider layer stays on top
+        self.raise_slider_layer()
+        self.compile_timer.start()  # Restarted by every edit
 
-        menu = QMenu(signal_widget)
+    def show_signal_context_menu(self, actuator_id, signal, global_pos):
+        """Show the context menu for the right-clicked clip of the timeline overview."""
+        menu = QMenu(self.timeline_overview)
         info_action = menu.addAction("Show Signal Info")
-        selected_action = menu.exec(signal_widget.mapToGlobal(pos))
+        selected_action = menu.exec(global_pos)
 
         if selected_action == info_action:
             # Print message in the command prompt
             print(f"Right-clicked on signal '{signal['type']}' of actuator '{actuator_id}'")
 
+    def closeEvent(self, event):
+        """Stop the timeline thread with the window: Qt aborts if a QThread is destroyed while running."""
+        self.timeline_timer.pause()
+        self.timeline_thread.quit()
+        self.timeline_thread.wait()
+        self.compile_timer.stop()
+        self.compile_executor.shutdown(cancel_futures=True)
+        super().closeEvent(event)
+
     def resizeEvent(self, event):
         """Override the resize event to update the timeline and slider when the window size changes."""
         super().resizeEvent(event)
         self.position_mpl_status_label()
         self.mpl_status_label.raise_()  # Keep it on top
         
-        # Recalculate positions of timeline containers
-        self.update_actuator_text()
+        # The timeline overview lays its clips out at paint time, so it needs no update here
 
         # Ensure the slider layer stays on top after resizing
         self.raise_slider_layer()
@@ -3515,18 +3778,23 @@ class Haptics_App(QtWidgets.QMainWindow):
         self.ui.gridLayout.removeWidget(self.maincanvas)
         self.maincanvas.setParent(None)  # Detach MplCanvas from its parent
 
-        # Create and add the TimelineCanvas
+        start = time.perf_counter()
+
+        # Create the TimelineCanvas once, then only swap its data model for each actuator
         color_rgb = self.actuator_canvas.branch_colors[actuator_id.split('.')[0]].getRgbF()[:3]
-        self.timeline_canvas = TimelineCanvas(self.ui.widget, color=color_rgb, label=f"Timeline for {actuator_id}", app_reference=self)
-        self.ui.gridLayout.addWidget(self.timeline_canvas, 0, 0, 1, 1)
+        if self.timeline_canvas is None:
+            self.timeline_canvas = TimelineCanvas(self.ui.widget, color=color_rgb, label="Timeline", app_reference=self)
+        if self.ui.gridLayout.indexOf(self.timeline_canvas) == -1:
+            self.ui.gridLayout.addWidget(self.timeline_canvas, 0, 0, 1, 1)
 
         # Store the TimelineCanvas in the dictionary
+        self.timeline_canvases.clear()
         self.timeline_canvases[actuator_id] = self.timeline_canvas
 
         # Retrieve and plot the signal data for this actuator
-        if actuator_id in self.actuator_signals:
-            self.timeline_canvas.signals = self.actuator_signals[actuator_id]
-            self.timeline_canvas.plot_all_signals()
+        signals = self.actuator_signals[actuator_id] if actuator_id in self.actuator_signals else []
+        self.timeline_canvas.show_actuator(actuator_id, color_rgb, signals)
+        timeline_log.debug("Timeline for %s shown in %.1f ms", actuator_id, 1000 * (time.perf_counter() - start))
 
         # Update the status label
         self.mpl_status_label.setText(f"Showing Unit {actuator_id}")
@@ -3540,7 +3808,7 @@ class Haptics_App(QtWidgets.QMainWindow):
             return
 
         # Remove the current widget (TimelineCanvas)
-        if hasattr(self, 'timeline_canvas'):
+        if self.timeline_canvas is not None:
             self.ui.gridLayout.removeWidget(self.timeline_canvas)
             self.timeline_canvas.setParent(None)
 
@@ -3625,14 +3893,10 @@ class Haptics_App(QtWidgets.QMainWindow):
             self.switch_to_main_canvas()
 
     def clear_timeline_canvas(self):
-        # Clear the timeline layout
-        while self.timeline_layout.count() > 0:
-            item = self.timeline_layout.takeAt(0)
-            widget = item.widget()
-            if widget:
-                widget.deleteLater()
-        self.timeline_widgets.clear()
+        # Clear the timeline overview rows
+        self.timeline_overview.clear()
         self.actuator_signals.clear()  # Clear the stored signals
+        self.timeline_extent.reset()
 
     def reset_color_management(self):
         # Reset color management stuff
@@ -3650,66 +3914,44 @@ class Haptics_App(QtWidgets.QMainWindow):
                 print("Invalid input. Please enter valid integer values for width and height.")
     
     def add_actuator_to_timeline(self, new_id, actuator_type, color, x, y):
-        # Convert the color to a suitable format for the stylesheet
-        color_rgb = QColor(color).getRgbF()[:3]
-        color_style = f"background-color: rgba({int(color_rgb[0]*255)}, {int(color_rgb[1]*255)}, {int(color_rgb[2]*255)}, 255);"
-
-        # Create a placeholder widget instead of TimelineCanvas
-        actuator_widget = QWidget(parent=self.ui.scrollAreaWidgetContents)
-        actuator_widget.setStyleSheet(color_style)  # Apply the background color
-
-        # Add a simple label to represent the actuator in the timeline area
-        actuator_layout = QHBoxLayout(actuator_widget)
-        actuator_label = QLabel(f"{actuator_type} - {new_id}")
-        actuator_label.setStyleSheet("color: white;")  # Ensure text is visible
-        actuator_layout.addWidget(actuator_label)
-        
-        # Add the widget to the timeline layout
-        self.timeline_layout.addWidget(actuator_widget)
-        self.timeline_widgets[new_id] = (actuator_widget, actuator_label)
+        # Add a row with the actuator's label and color to the timeline overview
+        self.timeline_overview.add_row(new_id, f"{actuator_type} - {new_id}", QColor(color))
+        self.update_actuator_text([new_id])
 
         self.raise_slider_layer()
 
         self.update_pushButton_5_state()
 
     def update_timeline_actuator(self, old_actuator_id, new_actuator_id, actuator_type, color):
-        if old_actuator_id in self.timeline_widgets:
-            actuator_widget, actuator_label = self.timeline_widgets.pop(old_actuator_id)
-            
-            # Convert the color to a suitable format for the stylesheet
-            color_rgb = QColor(color).getRgbF()[:3]
-            color_style = f"background-color: rgba({int(color_rgb[0]*255)}, {int(color_rgb[1]*255)}, {int(color_rgb[2]*255)}, 255);"
-            
-            # Update the widget's background color
-            actuator_widget.setStyleSheet(color_style)
-            
-            # Update the label text
-            actuator_label.setText(f"{actuator_type} - {new_actuator_id}")
-            
-            # Store the updated reference with the new ID
-            self.timeline_widgets[new_actuator_id] = (actuator_widget, actuator_label)
-            
+        if old_actuator_id in self.timeline_overview.row_index:
+            # Update the row's label and color in place
+            self.timeline_overview.update_row(old_actuator_id, new_actuator_id, f"{actuator_type} - {new_actuator_id}", QColor(color))
+
             # Update the actuator_signals dictionary to reflect the ID change
             if old_actuator_id in self.actuator_signals:
                 self.actuator_signals[new_actuator_id] = self.actuator_signals.pop(old_actuator_id)
+                self.timeline_extent.rename(old_actuator_id, new_actuator_id)
 
             # Immediately update the plotter to reflect the changes
             self.update_plotter(new_actuator_id, actuator_type, color)
             
     def remove_actuator_from_timeline(self, actuator_id):
-        if actuator_id in self.timeline_widgets:
-            actuator_widget, actuator_label = self.timeline_widgets.pop(actuator_id)
-            self.timeline_layout.removeWidget(actuator_widget)
-            actuator_widget.deleteLater()  # Properly delete the widget
+        if actuator_id in self.timeline_overview.row_index:
+            self.timeline_overview.remove_row(actuator_id)
             self.update_pushButton_5_state()
 
         # Remove the associated signal data
         if actuator_id in self.actuator_signals:
             del self.actuator_signals[actuator_id]
+        self.timeline_extent.remove(actuator_id)
+        self.update_actuator_text([])  # Rescale the rows if this was the longest timeline
 
     def import_waveform(self):
-        file_path, _ = QFileDialog.getOpenFileName(self, "Import Waveform", "", "CSV Files (*.csv);;All Files (*)")
+        file_path, _ = QFileDialog.getOpenFileName(self, "Import Waveform", "", "Waveform Files (*.csv *.wav *.flac);;CSV Files (*.csv);;Audio Files (*.wav *.flac);;All Files (*)")
         if file_path:
+            if is_audio_file(file_path):
+                self.import_audio_waveform(file_path)
+                return
             try:
                 # Ask the user to input the sampling rate
                 sampling_rate, ok = QInputDialog.getInt(
@@ -3724,17 +3966,13 @@ class Haptics_App(QtWidgets.QMainWindow):
                 if not ok:
                     return  # User canceled input, exit
 
-                # Read the CSV file
-                data = self.read_csv_file(file_path)
+                # Read the CSV file, resampling it chunk by chunk with a band-limited polyphase filter
                 if sampling_rate != TIME_STAMP:
-                    current_signal_length = len(data)
-                    resample_factor = sampling_rate / TIME_STAMP
-                    data = np.interp(
-                        np.linspace(0, current_signal_length, int(current_signal_length / resample_factor)),
-                        np.arange(0, current_signal_length),
-                        data
-                    )
+                    chunks = resample_chunks(self.read_csv_chunks(file_path), sampling_rate, TIME_STAMP)
+                    data = np.concatenate([np.empty(0)] + list(chunks)).tolist()
                     sampling_rate = TIME_STAMP
+                else:
+                    data = self.read_csv_file(file_path)
                 print(f"CSV Data: {data}")  # Debugging print statement
 
                 # Extract the signal type from the CSV filename
@@ -3750,6 +3988,96 @@ class Haptics_App(QtWidgets.QMainWindow):
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to import waveform: {e}")
 
+    def import_audio_waveform(self, file_path):
+        """
+        Imports a WAV/FLAC capture. Every channel is added to the imported signals, and when as many
+        actuators as channels are selected, the channels can be mapped onto them in one operation.
+        """
+        try:
+            audio_file = open_audio_file(file_path)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to import waveform: {e}")
+            return
+
+        base_name = os.path.basename(file_path)
+        num_channels = audio_file.num_channels
+        if num_channels == 1:
+            waveform_names = [base_name]
+        else:
+            waveform_names = [f"{base_name} [ch{i + 1}]" for i in range(num_channels)]
+
+        # Offer to map channel i onto the i-th selected actuator (in selection order)
+        selected_ids = [actuator.id for actuator in self.actuator_canvas.selected_actuators_order]
+        map_to_actuators = False
+        start_time = 0.0
+        if num_channels > 1 and len(selected_ids) == num_channels:
+            reply = QMessageBox.question(
+                self,
+                "Map Channels to Actuators",
+                f"Map the {num_channels} channels of {base_name} onto the selected actuators ({', '.join(selected_ids)})?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            )
+            if reply == QMessageBox.StandardButton.Yes:
+                start_time, map_to_actuators = QInputDialog.getDouble(
+                    self, "Start Time Input", "Start time of the mapped channels (s):", value=0.0, min=0.0, max=60.0, decimals=2
+                )
+
+        try:
+            # Resample (and segment, when mapping) all channels in parallel
+            with ThreadPoolExecutor(max_workers=min(num_channels, os.cpu_count() or 1)) as executor:
+                results = list(executor.map(
+                    lambda channel: self.process_audio_channel(audio_file, channel, map_to_actuators),
+                    range(num_channels)
+                ))
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to import waveform: {e}")
+            return
+        finally:
+            audio_file.close()
+
+        for waveform_name, result in zip(waveform_names, results):
+            signal_type = os.path.splitext(waveform_name)[0]
+            waveform_data = self.convert_csv_to_waveform_format(result['data'], signal_type, TIME_STAMP)
+            if waveform_data:
+                self.add_imported_waveform(waveform_name, waveform_data)
+
+        if map_to_actuators:
+            for actuator_id, waveform_name, result in zip(selected_ids, waveform_names, results):
+                new_signal = {
+                    "type": waveform_name,
+                    "data": result['data'],
+                    "high_freq": result['high_freq'],
+                    "low_freq": result['low_freq'],
+                    "start_time": start_time,
+                    "stop_time": start_time + len(result['data']) / TIME_STAMP,
+                    "parameters": None
+                }
+                signals = cut_signal_range(self.actuator_signals.get(actuator_id, []), start_time, new_signal["stop_time"])
+                signals.append(new_signal)
+                signals.sort(key=lambda signal: signal["start_time"])
+                self.actuator_signals[actuator_id] = signals
+
+            if self.current_actuator in selected_ids:
+                self.switch_to_timeline_canvas(self.current_actuator)
+            self.update_actuator_text(selected_ids)
+            self.update_pushButton_5_state()
+
+    def process_audio_channel(self, audio_file, channel, segment):
+        """Resample one channel to TIME_STAMP and optionally split it into high/low frequency components."""
+        chunks = audio_file.read_channel_chunks(channel)
+        if audio_file.sampling_rate != TIME_STAMP:
+            chunks = resample_chunks(chunks, audio_file.sampling_rate, TIME_STAMP)
+        data = np.concatenate([np.empty(0)] + list(chunks))
+
+        result = {'data': data.tolist()}
+        if segment:
+            high_freq_signal, low_freq_signal = signal_segmentation_api().signal_segmentation(
+                product_signal=data, sampling_rate=TIME_STAMP, downsample_rate=200
+            )
+            result['high_freq'] = high_freq_signal.tolist()
+            result['low_freq'] = low_freq_signal.tolist()
+        return result
+
     def read_csv_file(self, file_path):
         """
         Reads a CSV file and converts it to a list of rows.
@@ -3759,6 +4087,22 @@ class Haptics_App(QtWidgets.QMainWindow):
             reader = csv.reader(csv_file)
             return [float(row[0]) for row in reader]  # Convert each row to float
 
+    def read_csv_chunks(self, file_path, chunk_size=65536):
+        """
+        Reads a CSV file lazily and yields numpy arrays of at most chunk_size data points,
+        so large captures can be resampled without holding every row in memory.
+        """
+        with open(file_path, 'r') as csv_file:
+            reader = csv.reader(csv_file)
+            chunk = []
+            for row in reader:
+                chunk.append(float(row[0]))
+                if len(chunk) == chunk_size:
+                    yield np.array(chunk)
+                    chunk = []
+            if chunk:
+                yield np.array(chunk)
+
     def convert_csv_to_waveform_format(self, csv_data, signal_type, sampling_rate):
         """
         Converts the CSV data into the specified JSON format for waveforms.
@@ -4123,6 +4467,10 @@ class Haptics_App(QtWidgets.QMainWindow):
             self.customizes.takeChild(index)
 
 if __name__ == "__main__":
+    if '--compile-layout' in sys.argv[1:]:
+        compile_layout()
+        print(f"Regenerated {LAYOUT_PY_PATH}")
+        sys.exit(0)
     app = QtWidgets.QApplication(sys.argv)
     mainWindow = Haptics_App()
     mainWindow.show()
@@ -0,0 +1,303 @@
+'''
+Benchmarks of the segmentation, playback scheduling and command dispatch paths.
+
+Every benchmark runs against synthetic designs of increasing size, headless (Qt uses the offscreen
+platform and commands go to the DryRunTransport of command_player.py instead of a BLE device):
+    segmentation           signal_segmentation_api.signal_segmentation, per clip length (s)
+    total_time             Haptics_App.calculate_total_time (TimelineExtent), per actuator count
+    schedule_playback      HapticCommandManager.play_to on a precompiled schedule, per tick, per actuator count
+    schedule_seek          HapticCommandManager.seek to a random time of a precompiled schedule, per actuator count
+    pack_commands          python_ble_api.pack_commands, per command count
+    compile_commands       design_compiler.compile_commands, per actuator count
+    incremental_compile    design_compiler.CommandCompiler.compile after editing one actuator, per actuator count
+    design_save            DesignSaver.save_design, per actuator count
+    design_load            DesignSaver.load_design, per actuator count
+
+Each run is appended to a JSON-lines history file and compared with the previous results, so
+regressions show up as the code changes (use --fail-on-regression in CI).
+
+Usage:
+    python benchmarks.py [--only NAME ...] [--history FILE] [--threshold 1.25] [--fail-on-regression]
+'''
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')  # No window is ever shown
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from command_player import DryRunTransport
+from design_compiler import compile_commands, CommandCompiler
+
+SAMPLE_RATE = 44100
+TICK = 0.005
+CLIP_SECONDS = 1.0
+CLIPS_PER_ACTUATOR = 10
+
+DEFAULT_HISTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_history.jsonl')
+
+
+# Synthetic designs
+def actuator_ids(num_actuators, chain_length=16):
+    return [f'{chr(ord("A") + i // chain_length)}.{i % chain_length + 1}' for i in range(num_actuators)]
+
+def synthetic_signals(num_actuators, clip_seconds=CLIP_SECONDS, clips_per_actuator=CLIPS_PER_ACTUATOR, seed=0):
+    """Actuator id -> clips, staggered so that roughly half of the actuators play at any time."""
+    rng = np.random.default_rng(seed)
+    num_samples = int(clip_seconds * SAMPLE_RATE)
+    t = np.arange(num_samples) / SAMPLE_RATE
+    # Clips share their sample lists (as clips dropped from the same library signal would)
+    data = np.sin(2 * np.pi * 170 * t).tolist()
+    low_freq = (0.5 + 0.5 * np.sin(2 * np.pi * 3 * t)).tolist()
+    high_freq = np.full(num_samples, 170.0).tolist()
+
+    actuator_signals = {}
+    for actuator_id in actuator_ids(num_actuators):
+        start = rng.uniform(0, clip_seconds)
+        signals = []
+        for _ in range(clips_per_actuator):
+            signals.append({"type": "Sine", "data": data, "high_freq": high_freq, "low_freq": low_freq,
+                            "start_time": start, "stop_time": start + clip_seconds, "parameters": None})
+            start += 2 * clip_seconds  # one clip length of silence between clips
+        actuator_signals[actuator_id] = signals
+    return actuator_signals
+
+def tick_times(actuator_signals, max_ticks=2000):
+    total_time = max(signal["stop_time"] for signals in actuator_signals.values() for signal in signals)
+    return np.arange(0, total_time, TICK)[:max_ticks]
+
+
+# Timing
+def measure(func, repeat=5, min_time=0.2):
+    """Median seconds per call of func over repeat rounds, each long enough to be timed reliably."""
+    number = 1
+    while True:  # Calibrate like timeit.autorange
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        if time.perf_counter() - start >= min_time / repeat or number >= 1 << 20:
+            break
+        number *= 2
+    rounds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        rounds.append((time.perf_counter() - start) / number)
+    return statistics.median(rounds)
+
+@contextlib.contextmanager
+def quiet():
+    """Send prints to /dev/null: they are still formatted (and timed) but do not flood the terminal."""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+# Benchmarks: each takes a size and returns seconds
+def bench_segmentation(clip_seconds):
+    from signal_segmentation_api import signal_segmentation_api
+    t = np.arange(int(clip_seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    product_signal = np.sin(2 * np.pi * 200 * t) * (np.sin(2 * np.pi * 5 * t) > 0)
+    api = signal_segmentation_api()
+    return measure(lambda: api.signal_segmentation(product_signal, SAMPLE_RATE, 200), repeat=3)
+
+def bench_total_time(num_actuators):
+    from timeline_extent import TimelineExtent
+    extent = TimelineExtent()
+    extent.reset(synthetic_signals(num_actuators))
+    return measure(lambda: extent.total_time)
+
+def bench_schedule_playback(num_actuators):
+    import app
+    manager = app.HapticCommandManager(DryRunTransport())
+    manager.load_stream(compile_commands(synthetic_signals(num_actuators), TICK))
+    times = tick_times(synthetic_signals(num_actuators))
+    def run():
+        manager.start_schedule(0)
+        for time_position in times:
+            manager.play_to(time_position)
+        manager.stop_playback()
+    return measure(run, repeat=3) / len(times)
+
+def bench_schedule_seek(num_actuators):
+    import app
+    manager = app.HapticCommandManager(DryRunTransport())
+    manager.load_stream(compile_commands(synthetic_signals(num_actuators), TICK))
+    manager.is_playing = True
+    targets = np.random.default_rng(0).uniform(0, manager.schedule.duration, 100)
+    def run():
+        for time_position in targets:
+            manager.seek(time_position)
+    return measure(run, repeat=3) / len(targets)
+
+def bench_pack_commands(num_commands):
+    from python_ble_api import pack_commands, MAX_COMMANDS_PER_PACKET, PACKET_SIZE
+    rng = np.random.default_rng(0)
+    fields = [rng.integers(0, 128, num_commands), rng.integers(0, 16, num_commands),
+              rng.integers(0, 8, num_commands), rng.integers(0, 2, num_commands)]
+    buffer = np.empty((-(-num_commands // MAX_COMMANDS_PER_PACKET), PACKET_SIZE), dtype=np.uint8)
+    return measure(lambda: pack_commands(*fields, out=buffer))
+
+def bench_compile_commands(num_actuators):
+    actuator_signals = synthetic_signals(num_actuators)
+    return measure(lambda: compile_commands(actuator_signals, TICK), repeat=3)
+
+def bench_incremental_compile(num_actuators):
+    actuator_signals = synthetic_signals(num_actuators)
+    compiler = CommandCompiler(TICK)
+    compiler.compile(actuator_signals)
+    edited = actuator_ids(num_actuators)[0]
+    def run():
+        # A new clip list, as when a clip is dropped on the timeline
+        actuator_signals[edited] = [dict(signal, low_freq=list(signal["low_freq"])) for signal in actuator_signals[edited]]
+        compiler.compile(actuator_signals)
+    return measure(run, repeat=3)
+
+@contextlib.contextmanager
+def design_window(num_actuators, file_name):
+    """A Haptics_App holding a synthetic design, with the file and message dialogs answered automatically."""
+    import app
+    from PyQt6 import QtWidgets
+    qt_app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv[:1])
+
+    patches = {
+        (app.QFileDialog, 'getSaveFileName'): staticmethod(lambda *args, **kwargs: (file_name, '')),
+        (app.QFileDialog, 'getOpenFileName'): staticmethod(lambda *args, **kwargs: (file_name, '')),
+        (app.QMessageBox, 'question'): staticmethod(lambda *args, **kwargs: app.QMessageBox.StandardButton.No),
+        (app.QMessageBox, 'information'): staticmethod(lambda *args, **kwargs: None),
+        (app.QMessageBox, 'warning'): staticmethod(lambda *args, **kwargs: None),
+    }
+    originals = {key: key[0].__dict__.get(key[1]) for key in patches}
+    for (cls, name), replacement in patches.items():
+        setattr(cls, name, replacement)
+    window = None
+    try:
+        with quiet():
+            window = app.Haptics_App()
+            for i, actuator_id in enumerate(actuator_ids(num_actuators)):
+                window.actuator_canvas.add_actuator(40 + 40 * (i % 16), 40 + 40 * (i // 16), new_id=actuator_id)
+            window.actuator_signals.update(synthetic_signals(num_actuators, clips_per_actuator=2))
+            window.update_actuator_text()  # As after an edit: refreshes the rows and the timeline extent
+        yield window
+    finally:
+        for (cls, name), original in originals.items():
+            setattr(cls, name, original)
+        if window is not None:
+            with quiet():
+                window.close()
+                window.deleteLater()
+                qt_app.processEvents()
+
+def bench_design_save(num_actuators):
+    with tempfile.TemporaryDirectory() as directory:
+        with design_window(num_actuators, os.path.join(directory, 'benchmark.dsgn')) as window, quiet():
+            return measure(window.design_saver.save_design, repeat=3)
+
+def bench_design_load(num_actuators):
+    with tempfile.TemporaryDirectory() as directory:
+        with design_window(num_actuators, os.path.join(directory, 'benchmark.dsgn')) as window, quiet():
+            window.design_saver.save_design()
+            return measure(window.design_saver.load_design, repeat=3)
+
+BENCHMARKS = {
+    'segmentation': (bench_segmentation, [1, 5, 20]),
+    'total_time': (bench_total_time, [8, 32, 128]),
+    'schedule_playback': (bench_schedule_playback, [8, 32, 128]),
+    'schedule_seek': (bench_schedule_seek, [8, 32, 128]),
+    'pack_commands': (bench_pack_commands, [20, 128, 1024]),
+    'compile_commands': (bench_compile_commands, [8, 32, 128]),
+    'incremental_compile': (bench_incremental_compile, [8, 32, 128]),
+    'design_save': (bench_design_save, [8, 32]),
+    'design_load': (bench_design_load, [8, 32]),
+}
+
+
+# History
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def read_history(file_name):
+    if not os.path.exists(file_name):
+        return []
+    with open(file_name) as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+def format_seconds(seconds):
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale:
+            return f'{seconds / scale:.3g} {unit}'
+    return f'{seconds / 1e-9:.3g} ns'
+
+def previous_result(history, name, size):
+    """Most recent recorded time of a benchmark (earlier runs may have used --only)."""
+    for run in reversed(history):
+        if size in run['results'].get(name, {}):
+            return run['results'][name][size]
+    return None
+
+def compare(results, history, threshold):
+    """Print every result next to its previous measurement; returns the list of regressions."""
+    regressions = []
+    for name, sizes in results.items():
+        print(name)
+        for size, seconds in sizes.items():
+            line = f'  {size:>6}  {format_seconds(seconds):>10}'
+            before = previous_result(history, name, size)
+            if before:
+                ratio = seconds / before
+                line += f'  ({ratio:.2f}x previous)'
+                if ratio > threshold:
+                    line += '  REGRESSION'
+                    regressions.append((name, size, ratio))
+            print(line)
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), help='run only these benchmarks')
+    parser.add_argument('--history', default=DEFAULT_HISTORY, help='JSON-lines file the results are appended to')
+    parser.add_argument('--threshold', type=float, default=1.25, help='slowdown ratio reported as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true', help='exit with status 1 if a benchmark regressed')
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.only or BENCHMARKS:
+        bench, sizes = BENCHMARKS[name]
+        # JSON keys are strings: use them from the start so results compare with the history
+        results[name] = {str(size): bench(size) for size in sizes}
+
+    history = read_history(args.history)
+    run = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': git_commit(),
+        'machine': platform.node(),
+        'python': platform.python_version(),
+        'results': results,
+    }
+    print(f"Benchmarks at {run['commit'] or 'unknown commit'}"
+          + (f" compared with {history[-1]['commit']} ({history[-1]['timestamp']})" if history else ''))
+    regressions = compare(results, history, args.threshold)
+
+    with open(args.history, 'a') as file:
+        file.write(json.dumps(run) + '\n')
+    if regressions:
+        print(f'{len(regressions)} regression(s) above {args.threshold}x')
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
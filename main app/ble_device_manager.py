@@ -0,0 +1,265 @@
+'''
+Several BLE controllers driven as one device.
+
+Each controller addresses 8 serial groups of 16 actuators (addr 0..127), so large installations
+split their chains over several controllers. BleDeviceManager keeps one python_ble_api per
+controller, all running on a single shared asyncio loop, and maps every chain (the letter of the
+actuator ids) to a controller and a serial group on that controller. Controllers are identified by
+their BLE address, since identical boards all advertise the same name. It exposes the same
+methods as python_ble_api (get_ble_devices, scan_devices, connect_ble_device, connect_ble_address,
+disconnect_ble_device, send_command, send_command_list), so HapticCommandManager and the connection
+dialog use it unchanged: send_command_list splits a tick's commands per controller, rewrites the addresses to the
+controller's own groups, and writes to all controllers concurrently. Global addresses (chain * 16 +
+index) go past 255 from chain Q on; the compiled stream stores them on two bytes, so precompiled
+playback (pack_batches) reaches every controller.
+
+Chains that were not assigned explicitly go to the first connected controller, on their own group
+number (A -> group 0, B -> group 1, ...) when it is free, which is the single-controller behaviour,
+and on the next free group otherwise. Commands to chains that find no free group are dropped.
+'''
+
+import asyncio
+import threading
+
+import numpy as np
+
+from python_ble_api import python_ble_api, start_event_loop, pack_commands, send_batches_async, scan_cache, address_of
+from haptics_logging import get_logger
+
+log = get_logger('ble')
+
+CHAIN_JUMP_INDEX = 16  # actuators per chain (serial group)
+GROUPS_PER_DEVICE = 8  # addr is 7 bits: 8 groups of 16
+MAX_COMMANDS_PER_PACKET = 20
+
+
+def chain_of_addr(addr):
+    return chr(ord('A') + addr // CHAIN_JUMP_INDEX)
+
+
+class BleDeviceManager:
+    def __init__(self):
+        # Shared asyncio loop, started on first use like in python_ble_api
+        self._loop = None
+        self.thread = None
+        self._loop_lock = threading.Lock()
+        self.devices = {}  # device address -> python_ble_api, in connection order
+        self.chain_map = {}  # chain letter -> (device address, serial group on that device)
+        self.scanner = None
+        self.unroutable = set()  # chains already reported as having no free serial group
+
+    @property
+    def loop(self):
+        if self._loop is None:
+            with self._loop_lock:
+                if self._loop is None:
+                    self._loop, self.thread = start_event_loop()
+        return self._loop
+
+    def run_async(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def device_api(self, address):
+        if address not in self.devices:
+            self.devices[address] = python_ble_api(loop=self.loop)
+        return self.devices[address]
+
+    def connected_devices(self):
+        """Addresses of the devices that are connected or reconnecting in the background after a dropped link."""
+        return [address for address, api in self.devices.items()
+                if (api.client is not None and api.client.is_connected) or api.is_reconnecting()]
+
+    # Chains
+    def free_group(self, address, preferred=None):
+        """A serial group of the device that no chain uses (preferred if it is free), or None."""
+        used = {g for device, g in self.chain_map.values() if device == address}
+        if preferred is not None and 0 <= preferred < GROUPS_PER_DEVICE and preferred not in used:
+            return preferred
+        return next((g for g in range(GROUPS_PER_DEVICE) if g not in used), None)
+
+    def assign_chain(self, chain, address, group=None):
+        """Route a chain to a device; group defaults to the next free serial group of that device."""
+        if group is None:
+            group = self.free_group(address)
+        if group is None or not 0 <= group < GROUPS_PER_DEVICE:
+            raise ValueError(f'{address} has no free serial group for chain {chain}')
+        self.chain_map[chain] = (address, group)
+
+    def unassign_device(self, address):
+        self.chain_map = {chain: target for chain, target in self.chain_map.items() if target[0] != address}
+        self.unroutable.clear()  # Groups were freed
+
+    def route(self, addr):
+        """
+        (python_ble_api, address on that device) for a global address, or (None, None) if nothing is
+        connected or the chain has nowhere to go. Unassigned chains are assigned to a free serial group
+        of the first connected device, so two chains never drive the same motors.
+        """
+        chain = chain_of_addr(addr)
+        target = self.chain_map.get(chain)
+        if target is None:
+            connected = self.connected_devices()
+            if not connected:
+                return None, None
+            group = self.free_group(connected[0], preferred=addr // CHAIN_JUMP_INDEX)
+            if group is None:
+                if chain not in self.unroutable:
+                    self.unroutable.add(chain)
+                    log.warning('No free serial group on %s for chain %s, its commands are dropped', connected[0], chain)
+                return None, None
+            self.assign_chain(chain, connected[0], group)
+            target = self.chain_map[chain]
+        return self.devices.get(target[0]), target[1] * CHAIN_JUMP_INDEX + addr % CHAIN_JUMP_INDEX
+
+    # Connection
+    def get_ble_devices(self, force_scan=False):
+        if self.scanner is None:
+            self.scanner = python_ble_api(loop=self.loop)
+        return self.scanner.get_ble_devices(force_scan)
+
+    def scan_devices(self, force_scan=False):
+        if self.scanner is None:
+            self.scanner = python_ble_api(loop=self.loop)
+        return self.scanner.scan_devices(force_scan)
+
+    async def resolve_devices_async(self, devices):
+        """
+        Address of each device given by address or by name, or None if it is not in range. Devices with
+        the same name resolve to different controllers, skipping the ones already connected.
+        """
+        cached_scan = scan_cache.is_fresh()
+        found = await scan_cache.scan()
+        if cached_scan and any(device not in found and address_of(found, device) is None for device in devices):
+            found = await scan_cache.scan(force=True)  # The cached result may be outdated: scan once more
+        used = set(self.connected_devices())
+        addresses = []
+        for device in devices:
+            address = device if device in found else address_of(found, device, exclude=used)
+            if address is not None:
+                used.add(address)
+            addresses.append(address)
+        return addresses
+
+    async def connect_devices_async(self, addresses):
+        """Connect several controllers at once, by address, concurrently."""
+        return await asyncio.gather(*(self.device_api(address).connect_address_async(address, scan_cache.devices.get(address))
+                                      for address in addresses))
+
+    def connect_devices(self, devices, chains=None):
+        """
+        Connect several devices concurrently, given by address or by name (identical controllers can be
+        listed by name several times); chains[i] lists the chains driven by devices[i]. Returns the
+        address each device was connected at, or None if it failed.
+        """
+        addresses = self.run_async(self.resolve_devices_async(list(devices))).result()
+        found = [address for address in addresses if address is not None]
+        results = dict(zip(found, self.run_async(self.connect_devices_async(found)).result()))
+        connected = [address if results.get(address) else None for address in addresses]
+        for address, chain_list in zip(connected, chains or []):
+            if address is not None:
+                for chain in chain_list:
+                    self.assign_chain(chain, address)
+        return connected
+
+    def connect_ble_address(self, address, device_name=None, chains=None):
+        """Connect one device by address (as listed by scan_devices); chains lists the chains it drives."""
+        if not self.run_async(self.device_api(address).connect_address_async(address, device_name)).result():
+            return False
+        for chain in chains or []:
+            self.assign_chain(chain, address)
+        return True
+
+    def connect_ble_device(self, device_name, chains=None):
+        return self.connect_devices([device_name], [chains or []])[0] is not None
+
+    def disconnect_device(self, address):
+        api = self.devices.get(address)
+        if api is None:
+            return False
+        success = api.disconnect_ble_device()
+        if success:
+            del self.devices[address]
+            self.unassign_device(address)
+        return success
+
+    def disconnect_ble_device(self):
+        """Disconnect every controller; True if all of them disconnected."""
+        return all([self.disconnect_device(address) for address in list(self.devices)])
+
+    # Commands
+    def shard_commands(self, commands):
+        """Split commands per device, with addresses rewritten to that device's serial groups."""
+        shards = {}
+        for command in commands:
+            api, addr = self.route(command['addr'])
+            if api is None:
+                continue
+            shards.setdefault(api, []).append(dict(command, addr=addr))
+        return shards
+
+    async def send_shards_async(self, shards):
+        async def send_device(api, commands):
+            # Packets hold 20 commands: one device's packets go out in order, devices in parallel
+            results = []
+            for i in range(0, len(commands), MAX_COMMANDS_PER_PACKET):
+                results.append(await api.send_command_list_async(commands[i:i + MAX_COMMANDS_PER_PACKET]))
+            return all(results)
+        results = await asyncio.gather(*(send_device(api, commands) for api, commands in shards.items()))
+        return all(results)
+
+    def send_command_list(self, commands):
+        shards = self.shard_commands(commands)
+        if not shards:
+            return False  # Not connected: no need to wake up the BLE loop
+        return self.run_async(self.send_shards_async(shards)).result()
+
+    def send_command(self, addr, duty, freq, start_or_stop):
+        return self.send_command_list([{'addr': addr, 'duty': duty, 'freq': freq, 'start_or_stop': start_or_stop}])
+
+    # Precompiled playback (see playback_schedule.py)
+    def routing_key(self):
+        """Changes whenever packets built by pack_batches would be routed differently."""
+        return tuple(sorted(self.chain_map.items())), tuple(self.connected_devices())
+
+    def pack_batches(self, commands):
+        """[(python_ble_api, packets)] for a structured array of commands, routed like shard_commands."""
+        addr = commands['addr'].astype(np.int32)
+        chains = addr // CHAIN_JUMP_INDEX
+        routed = {}  # api -> [(indices into commands, addresses on the device)]
+        for chain in np.unique(chains):
+            api, base = self.route(int(chain) * CHAIN_JUMP_INDEX)
+            if api is None:
+                continue
+            indices = np.flatnonzero(chains == chain)
+            routed.setdefault(api, []).append((indices, base + addr[indices] % CHAIN_JUMP_INDEX))
+        batches = []
+        for api, parts in routed.items():
+            indices = np.concatenate([part[0] for part in parts])
+            device_addr = np.concatenate([part[1] for part in parts])
+            order = np.argsort(indices, kind='stable')  # Keep the order of the frame (stop commands first)
+            indices, device_addr = indices[order], device_addr[order]
+            batches.append((api, pack_commands(device_addr, commands['duty'][indices], commands['freq'][indices],
+                                               commands['start_or_stop'][indices])))
+        return batches
+
+    def send_batches(self, batches):
+        if not batches:
+            return False
+        return self.run_async(send_batches_async(batches)).result()
+
+
+# Example usage
+if __name__ == '__main__':
+    import sys
+    import time
+
+    manager = BleDeviceManager()
+    devices = sys.argv[1:] or ['QT Py ESP32-S3']  # Addresses or names
+    # First device drives chains A and B, the second one C and D, ...
+    chains = [[chr(ord('A') + 2 * i), chr(ord('A') + 2 * i + 1)] for i in range(len(devices))]
+    print(manager.connect_devices(devices, chains))
+    commands = [{'addr': chain * CHAIN_JUMP_INDEX, 'duty': 7, 'freq': 2, 'start_or_stop': 1} for chain in range(2 * len(devices))]
+    manager.send_command_list(commands)
+    time.sleep(2)
+    manager.send_command_list([dict(c, start_or_stop=0) for c in commands])
+    manager.disconnect_ble_device()
@@ -0,0 +1,190 @@
+'''
+Offline playback of a compiled command stream (see design_compiler.py) on the BLE device.
+
+CommandPlayer sends every frame of the stream through the BLE API at its scheduled time, without
+the GUI, TimelineTimer or matplotlib. Frames are scheduled against absolute perf_counter deadlines
+(sleep until shortly before the deadline, then spin), so a slow BLE write delays one frame but never
+shifts the rest of the schedule; frames that are already due when a write returns are merged into one
+batch (last command per address) so playback catches up instead of drifting. The player records how
+late each frame was sent and how long each write took, which gives a baseline for end-to-end latency
+measurements.
+
+Usage:
+    python command_player.py stream.bin --device "QT Py ESP32-S3" [--speed 1.0] [--loops 1]
+    python command_player.py stream.bin --device ctl1=A,B --device ctl2=C,D   (chains split over two devices)
+    python command_player.py stream.bin --device AA:BB:CC:DD:EE:01=A,B --device AA:BB:CC:DD:EE:02=C,D   (by address)
+    python command_player.py stream.csv --dry-run      (timing only, no device)
+'''
+
+import argparse
+import time
+
+import numpy as np
+
+from design_compiler import CommandStream
+from python_ble_api import pack_commands, packable_commands
+
+MAX_COMMANDS_PER_PACKET = 20  # send_command_list_async pads every packet to 20 commands
+SPIN_THRESHOLD = 0.002  # seconds before a deadline where sleeping stops and busy-waiting starts
+
+
+class DryRunTransport:
+    """Stands in for python_ble_api when no device is connected: accepts every packet."""
+    def __init__(self):
+        self.unroutable = set()
+
+    def send_command_list(self, commands):
+        return True
+
+    def routing_key(self):
+        return None
+
+    def pack_batches(self, commands):
+        commands = packable_commands(commands, self.unroutable)
+        if not len(commands):
+            return []
+        return [(self, pack_commands(commands['addr'], commands['duty'], commands['freq'], commands['start_or_stop']))]
+
+    def send_batches(self, batches):
+        return True
+
+
+class CommandPlayer:
+    def __init__(self, ble_api, stream, speed=1.0):
+        self.ble_api = ble_api
+        self.stream = stream
+        self.speed = speed  # 2.0 plays twice as fast
+        self.playing = False
+        self.started_addrs = set()  # addresses that may still be vibrating
+        self.lateness = []  # seconds between each frame's deadline and the start of its write
+        self.write_times = []  # seconds spent in each send_command_list call
+        self.failed_writes = 0
+        self.merged_frames = 0  # frames folded into a later one because the device writes fell behind
+
+    def wait_until(self, deadline):
+        remaining = deadline - time.perf_counter()
+        if remaining > SPIN_THRESHOLD:
+            time.sleep(remaining - SPIN_THRESHOLD)
+        while time.perf_counter() < deadline:
+            pass
+
+    def send_frame(self, commands):
+        for i in range(0, len(commands), MAX_COMMANDS_PER_PACKET):
+            packet = commands[i:i + MAX_COMMANDS_PER_PACKET]
+            write_start = time.perf_counter()
+            if not self.ble_api.send_command_list(packet):
+                self.failed_writes += 1
+            self.write_times.append(time.perf_counter() - write_start)
+        for command in commands:
+            if command['start_or_stop']:
+                self.started_addrs.add(command['addr'])
+            else:
+                self.started_addrs.discard(command['addr'])
+
+    @staticmethod
+    def merge_frames(frames):
+        """Commands of consecutive frames collapsed to the last command of each address."""
+        if len(frames) == 1:
+            return frames[0][1]
+        latest = {}
+        for _, commands in frames:
+            for command in commands:
+                latest.pop(command['addr'], None)  # Keep the order in which the final commands were issued
+                latest[command['addr']] = command
+        return list(latest.values())
+
+    def play(self, loops=1):
+        """Play the stream (blocking); stops every actuator if interrupted."""
+        frame_period = self.stream.tick / self.speed
+        frames = list(self.stream.frames())
+        self.playing = True
+        try:
+            for _ in range(loops):
+                start = time.perf_counter()
+                index = 0
+                while index < len(frames):
+                    if not self.playing:
+                        return
+                    deadline = start + frames[index][0] * frame_period
+                    self.wait_until(deadline)
+                    self.lateness.append(time.perf_counter() - deadline)
+                    # If writes fell behind, send every frame that is already due as one batch
+                    due = index + 1
+                    now = time.perf_counter()
+                    while due < len(frames) and start + frames[due][0] * frame_period <= now:
+                        due += 1
+                    self.merged_frames += due - index - 1
+                    self.send_frame(self.merge_frames(frames[index:due]))
+                    index = due
+                # Let the last frame last its full tick before the next loop starts over
+                self.wait_until(start + self.stream.num_frames * frame_period)
+        finally:
+            self.playing = False
+            self.stop_all()
+
+    def stop(self):
+        """Ask a running play() to return (from another thread)."""
+        self.playing = False
+
+    def stop_all(self):
+        """Send a stop command to every actuator that was started and not stopped by the stream."""
+        stop_commands = [{'addr': addr, 'duty': 0, 'freq': 0, 'start_or_stop': 0} for addr in sorted(self.started_addrs)]
+        if stop_commands:
+            self.send_frame(stop_commands)
+
+    def timing_report(self):
+        """Percentiles of frame lateness and write duration, in milliseconds."""
+        report = {'frames': len(self.lateness), 'writes': len(self.write_times), 'failed_writes': self.failed_writes,
+                  'merged_frames': self.merged_frames}
+        for name, values in (('lateness_ms', self.lateness), ('write_ms', self.write_times)):
+            if values:
+                percentiles = np.percentile(np.array(values) * 1000, [50, 95, 99, 100])
+                report[name] = dict(zip(['p50', 'p95', 'p99', 'max'], np.round(percentiles, 3).tolist()))
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('stream', help='command stream written by design_compiler.py (.bin or .csv)')
+    parser.add_argument('--device', action='append', metavar='DEVICE[=CHAINS]',
+                        help='BLE device (name or address) to connect to, optionally with the chains it drives (repeat '
+                             'for several devices; a repeated name connects another controller with that name; '
+                             'default: QT Py ESP32-S3)')
+    parser.add_argument('--speed', type=float, default=1.0, help='playback speed factor (default: 1.0)')
+    parser.add_argument('--loops', type=int, default=1, help='number of times the stream is played')
+    parser.add_argument('--dry-run', action='store_true', help='do not connect, only measure the scheduling')
+    args = parser.parse_args()
+
+    stream = CommandStream.load(args.stream)
+    print(f'{args.stream}: {len(stream)} commands over {stream.duration:.2f} s (tick {1000 * stream.tick:g} ms)')
+
+    if args.dry_run:
+        ble_api = DryRunTransport()
+    else:
+        from ble_device_manager import BleDeviceManager
+        ble_api = BleDeviceManager()
+        devices, chains = [], []
+        for device in args.device or ['QT Py ESP32-S3']:
+            device, _, chain_list = device.partition('=')
+            devices.append(device)
+            chains.append([chain.strip().upper() for chain in chain_list.split(',') if chain.strip()])
+        addresses = ble_api.connect_devices(devices, chains)
+        if None in addresses:
+            print(f'Could not connect to {", ".join(device for device, address in zip(devices, addresses) if address is None)}')
+            ble_api.disconnect_ble_device()
+            return 1
+
+    player = CommandPlayer(ble_api, stream, speed=args.speed)
+    try:
+        player.play(loops=args.loops)
+    except KeyboardInterrupt:
+        print('Interrupted, actuators stopped')
+    finally:
+        if not args.dry_run:
+            ble_api.disconnect_ble_device()
+    print(player.timing_report())
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
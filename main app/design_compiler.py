@@ -0,0 +1,408 @@
+'''
+Headless compiler from a saved design (.dsgn) to the command stream sent to the actuators.
+
+A design is loaded without creating Haptics_App, every clip that has no high/low frequency
+components yet is segmented, and playback is simulated at a fixed tick: for each tick, each actuator
+takes the amplitude/frequency of its first clip covering that time and only the commands that
+differ from the previous tick are kept. The application plays the same stream (see
+playback_schedule.py). The result is written as a compact binary file or a CSV.
+
+Binary layout (little endian): a 24-byte header (magic b'HCMD', version, reserved, tick period in
+seconds as a double, number of frames, number of commands) followed by one 9-byte record per command
+(frame index uint32, addr uint16, duty, freq, start_or_stop as uint8), sorted by frame. Version 1
+files (one-byte addr) are still read. The CSV has the same
+columns plus the frame time, after a '# tick=... frames=...' comment line.
+
+Usage:
+    python design_compiler.py design.dsgn [other.dsgn ...] [--format bin|csv] [--out-dir DIR]
+                              [--tick-ms 5] [--jobs N] [--resegment]
+'''
+
+import argparse
+import csv
+import os
+import pickle
+import struct
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from haptics_logging import get_logger
+
+log = get_logger('playback')
+
+SAMPLE_RATE = 44100  # same as utils.TIME_STAMP (utils is not imported to stay Qt-free)
+DOWNSAMPLE_RATE = 200  # rate passed to the segmentation when clips are dropped on a timeline
+DEFAULT_TICK = 0.005  # TimelineTimer.update_interval
+
+CHAIN_JUMP_INDEX = 16
+FREQUENCY_SET = [123, 145, 170, 200, 235, 275, 322, 384]
+DEFAULT_FREQ_PARAM = 2  # 170 Hz, used when a clip has no high frequency component
+
+STREAM_MAGIC = b'HCMD'
+STREAM_VERSION = 2
+STREAM_HEADER = struct.Struct('<4sHHdII')
+# Two-byte addresses: the application adds chains past P (addr 255), driven by several controllers
+COMMAND_DTYPE = np.dtype([('frame', '<u4'), ('addr', '<u2'), ('duty', 'u1'), ('freq', 'u1'), ('start_or_stop', 'u1')])
+LEGACY_COMMAND_DTYPES = {1: np.dtype([('frame', '<u4'), ('addr', 'u1'), ('duty', 'u1'), ('freq', 'u1'), ('start_or_stop', 'u1')])}
+MAX_ADDR = np.iinfo(COMMAND_DTYPE['addr']).max
+CSV_FIELDS = ['time', 'frame', 'addr', 'duty', 'freq', 'start_or_stop']
+
+
+# Command parameters (shared with HapticCommandManager)
+def actuator_id_to_addr(actuator_id):
+    chain, index = actuator_id.split('.')
+    return (ord(chain) - ord('A')) * CHAIN_JUMP_INDEX + int(index) - 1
+
+def map_amplitude_to_duty(amplitude):
+    # Map amplitude from 0 to 1 to 0 to 15
+    return int(round(amplitude * 15))
+
+def map_frequency_to_freq_param(frequency):
+    if frequency == 0:  # no high frequency component, use default 170 Hz
+        return DEFAULT_FREQ_PARAM
+    # Index of the closest frequency in the set
+    return min(range(len(FREQUENCY_SET)), key=lambda i: abs(FREQUENCY_SET[i] - frequency))
+
+def map_amplitudes_to_duties(amplitudes):
+    """Vectorized map_amplitude_to_duty (np.rint rounds half to even, like round())."""
+    return np.rint(np.asarray(amplitudes, dtype=float) * 15).astype(int)
+
+def map_frequencies_to_freq_params(frequencies):
+    """Vectorized map_frequency_to_freq_param."""
+    frequencies = np.asarray(frequencies, dtype=float)
+    freq_params = np.abs(frequencies[:, None] - np.array(FREQUENCY_SET)[None, :]).argmin(axis=1)
+    freq_params[frequencies == 0] = DEFAULT_FREQ_PARAM
+    return freq_params
+
+
+# Designs
+def load_design(file_name):
+    """Unpickle a .dsgn file. PyQt6 must be importable (colors are stored as QColor), but no Qt application is created."""
+    with open(file_name, 'rb') as file:
+        return pickle.load(file)
+
+def design_signals(design):
+    """Actuator id -> list of clips, rebuilt from the timeline records for designs without actuator_signals."""
+    if design.get('actuator_signals'):
+        return design['actuator_signals']
+    actuator_signals = {}
+    for signal_info in design.get('timeline', []):
+        signal = {key: value for key, value in signal_info.items() if key != 'actuator_id'}
+        actuator_signals.setdefault(signal_info['actuator_id'], []).append(signal)
+    return actuator_signals
+
+def segment_signals(actuator_signals, resegment=False):
+    """Fill in the high/low frequency components of clips that lack them (or of every clip if resegment)."""
+    segmentation_api = None
+    segmented = 0
+    for signals in actuator_signals.values():
+        for signal in signals:
+            if not resegment and signal.get('high_freq') is not None and signal.get('low_freq') is not None:
+                continue
+            if signal.get('data') is None or len(signal['data']) == 0:
+                continue
+            if segmentation_api is None:
+                from signal_segmentation_api import signal_segmentation_api
+                segmentation_api = signal_segmentation_api()
+            high_freq_signal, low_freq_signal = segmentation_api.signal_segmentation(
+                product_signal=np.asarray(signal['data'], dtype=float), sampling_rate=SAMPLE_RATE, downsample_rate=DOWNSAMPLE_RATE
+            )
+            signal['high_freq'] = high_freq_signal.tolist()
+            signal['low_freq'] = low_freq_signal.tolist()
+            segmented += 1
+    return segmented
+
+
+# Compilation
+def sample_actuator(signals, times):
+    """
+    Amplitude and frequency of one actuator at each of the given times.
+    Returns (active mask, amplitudes, frequencies); the first clip covering a time wins.
+    """
+    active = np.zeros(len(times), dtype=bool)
+    amplitudes = np.zeros(len(times))
+    frequencies = np.zeros(len(times))
+    # Fill in reverse order so that earlier clips overwrite later ones where they overlap
+    for signal in reversed(signals):
+        low_freq, high_freq = signal.get('low_freq'), signal.get('high_freq')
+        if low_freq is None or high_freq is None or len(low_freq) == 0:
+            continue
+        start, stop = np.searchsorted(times, signal['start_time'], 'left'), np.searchsorted(times, signal['stop_time'], 'right')
+        if stop <= start:
+            continue
+        low_freq, high_freq = np.asarray(low_freq, dtype=float), np.asarray(high_freq, dtype=float)
+        duration = signal['stop_time'] - signal['start_time']
+        relative_position = (times[start:stop] - signal['start_time']) / duration if duration > 0 else np.zeros(stop - start)
+        indices = np.clip((relative_position * len(low_freq)).astype(int), 0, len(low_freq) - 1)
+        active[start:stop] = True
+        amplitudes[start:stop] = low_freq[indices]
+        frequencies[start:stop] = high_freq[np.minimum(indices, len(high_freq) - 1)]
+    return active, amplitudes, frequencies
+
+def timeline_frames(actuator_signals, tick=DEFAULT_TICK):
+    """Number of ticks of the timeline: the last clip ends within the last one."""
+    total_time = max((signal['stop_time'] for signals in actuator_signals.values() for signal in signals), default=0)
+    return int(np.ceil(total_time / tick)) if total_time > 0 else 0
+
+def sample_frames(signals, num_frames, tick=DEFAULT_TICK):
+    """(active, duties, freqs) of one actuator at each of the first num_frames ticks."""
+    active, amplitudes, frequencies = sample_actuator(signals, np.arange(num_frames) * tick)
+    duties = np.where(active, map_amplitudes_to_duties(amplitudes), 0)
+    freqs = np.where(active, map_frequencies_to_freq_params(frequencies), 0)
+    return active, duties, freqs
+
+def frame_commands(addr, active, duties, freqs):
+    """
+    Commands of one actuator from its sampled frames: a command when it starts or its duty/freq
+    changes, a stop command on the tick after its clips end, and a stop command after the last
+    frame if it is still active then.
+    """
+    if not active.any():
+        return np.zeros(0, dtype=COMMAND_DTYPE)
+    records = []
+    was_active = np.concatenate(([False], active[:-1]))
+    changed = np.concatenate(([True], (duties[1:] != duties[:-1]) | (freqs[1:] != freqs[:-1])))
+    starts = np.flatnonzero(active & (~was_active | changed))
+    stops = np.flatnonzero(~active & was_active)  # prepare_command(actuator_id, 0, 0, 0)
+    for frames, duty, freq, start_or_stop in ((stops, 0, DEFAULT_FREQ_PARAM, 0), (starts, duties[starts], freqs[starts], 1)):
+        command = np.zeros(len(frames), dtype=COMMAND_DTYPE)
+        command['frame'], command['addr'], command['duty'] = frames, addr, duty
+        command['freq'], command['start_or_stop'] = freq, start_or_stop
+        records.append(command)
+    if active[-1]:  # Still playing when the timeline ends: stop_playback()
+        records.append(np.array([(len(active), addr, 0, 0, 0)], dtype=COMMAND_DTYPE))
+    return np.concatenate(records)
+
+def actuator_addr(actuator_id):
+    """Address of an actuator in the stream, or None (with a warning) if its id has none."""
+    try:
+        addr = actuator_id_to_addr(actuator_id)
+    except (ValueError, TypeError):
+        addr = None
+    if addr is None or not 0 <= addr <= MAX_ADDR:
+        log.warning('Actuator %s has no stream address, its clips are not played', actuator_id)
+        return None
+    return addr
+
+def merge_commands(records, tick, num_frames):
+    """CommandStream of the commands of every actuator; per frame, stop commands go first (as in HapticCommandManager.update)."""
+    commands = np.concatenate(records) if records else np.zeros(0, dtype=COMMAND_DTYPE)
+    commands = commands[np.lexsort((commands['start_or_stop'], commands['frame']))]
+    return CommandStream(tick, num_frames + 1 if num_frames else 0, commands)
+
+def compile_commands(actuator_signals, tick=DEFAULT_TICK):
+    """
+    Simulate playback of the clips at a fixed tick and return the CommandStream that the
+    application would send (see frame_commands), with stop commands for every active actuator at the end.
+    """
+    num_frames = timeline_frames(actuator_signals, tick)
+    addrs = {actuator_id: actuator_addr(actuator_id) for actuator_id in actuator_signals}
+    records = [frame_commands(addrs[actuator_id], *sample_frames(signals, num_frames, tick))
+               for actuator_id, signals in actuator_signals.items() if addrs[actuator_id] is not None]
+    return merge_commands(records, tick, num_frames)
+
+
+class CommandCompiler:
+    """
+    Compiles the clips of the application into a CommandStream before playback, and keeps the
+    sampled frames of every actuator so that only the actuators whose clips changed are sampled
+    again on the next compile. Clips are compared by their start/stop times and component lists
+    (the application replaces a clip's lists rather than editing them in place). The application
+    compiles on a worker thread after edits; the lock serializes compiles, so a compile started by
+    Play waits for the one in progress and reuses its frames.
+    """
+    def __init__(self, tick=DEFAULT_TICK):
+        self.tick = tick
+        self.lock = threading.Lock()
+        self.cache = {}  # actuator id -> (clip key, component lists kept alive for the key, (active, duties, freqs))
+        self.stream = None
+        self.stream_key = None
+        self.sampled = 0  # actuators sampled by the last compile
+
+    @staticmethod
+    def clip_key(signals):
+        return tuple((id(s.get('low_freq')), id(s.get('high_freq')), s['start_time'], s['stop_time']) for s in signals)
+
+    def invalidate(self, actuator_id=None):
+        """Forget the frames of one actuator (all of them by default), e.g. after editing a clip's lists in place."""
+        with self.lock:
+            if actuator_id is None:
+                self.cache.clear()
+            else:
+                self.cache.pop(actuator_id, None)
+            self.stream_key = None
+
+    def actuator_frames(self, actuator_id, signals):
+        """Sampled frames of an actuator up to the end of its own last clip."""
+        key = self.clip_key(signals)
+        cached = self.cache.get(actuator_id)
+        if cached is not None and cached[0] == key:
+            return cached[2]
+        own_frames = timeline_frames({actuator_id: signals}, self.tick) + 1  # +1: a clip may end exactly on a tick
+        frames = sample_frames(signals, own_frames, self.tick)
+        self.cache[actuator_id] = (key, [(s.get('low_freq'), s.get('high_freq')) for s in signals], frames)
+        self.sampled += 1
+        return frames
+
+    def compile(self, actuator_signals):
+        """CommandStream of the clips; the previous stream is returned as is if nothing changed."""
+        with self.lock:
+            return self.compile_locked(actuator_signals)
+
+    def compile_locked(self, actuator_signals):
+        self.sampled = 0
+        stream_key = tuple((actuator_id, self.clip_key(signals)) for actuator_id, signals in actuator_signals.items())
+        if self.stream is not None and stream_key == self.stream_key:
+            return self.stream
+        for actuator_id in set(self.cache) - set(actuator_signals):
+            del self.cache[actuator_id]
+
+        num_frames = timeline_frames(actuator_signals, self.tick)
+        records = []
+        for actuator_id, signals in actuator_signals.items():
+            addr = actuator_addr(actuator_id)
+            if addr is None:
+                continue
+            active, duties, freqs = self.actuator_frames(actuator_id, signals)
+            # Fit the actuator's frames to the timeline (frames after its last clip are inactive)
+            padding = max(0, num_frames - len(active))
+            active, duties, freqs = (np.pad(a[:num_frames], (0, padding)) for a in (active, duties, freqs))
+            records.append(frame_commands(addr, active, duties, freqs))
+        self.stream = merge_commands(records, self.tick, num_frames)
+        self.stream_key = stream_key
+        return self.stream
+
+
+class CommandStream:
+    def __init__(self, tick, num_frames, commands):
+        self.tick = tick  # seconds between two frames
+        self.num_frames = num_frames
+        self.commands = commands  # structured array of COMMAND_DTYPE sorted by frame
+
+    def __len__(self):
+        return len(self.commands)
+
+    @property
+    def duration(self):
+        return self.num_frames * self.tick
+
+    def frames(self):
+        """Yield (frame index, list of command dicts) for every frame that has commands."""
+        boundaries = np.flatnonzero(np.diff(self.commands['frame'])) + 1
+        for group in np.split(self.commands, boundaries) if len(self.commands) else []:
+            yield int(group['frame'][0]), [
+                {'addr': int(c['addr']), 'duty': int(c['duty']), 'freq': int(c['freq']), 'start_or_stop': int(c['start_or_stop'])}
+                for c in group
+            ]
+
+    # Files
+    def save(self, file_name):
+        if file_name.lower().endswith('.csv'):
+            self.write_csv(file_name)
+        else:
+            self.write_binary(file_name)
+
+    def write_binary(self, file_name):
+        with open(file_name, 'wb') as file:
+            file.write(STREAM_HEADER.pack(STREAM_MAGIC, STREAM_VERSION, 0, self.tick, self.num_frames, len(self.commands)))
+            file.write(self.commands.astype(COMMAND_DTYPE, copy=False).tobytes())
+
+    def write_csv(self, file_name):
+        with open(file_name, 'w', newline='') as file:
+            file.write(f'# tick={self.tick!r} frames={self.num_frames}\n')
+            writer = csv.writer(file)
+            writer.writerow(CSV_FIELDS)
+            for c in self.commands:
+                writer.writerow([f"{c['frame'] * self.tick:.6f}", c['frame'], c['addr'], c['duty'], c['freq'], c['start_or_stop']])
+
+    @classmethod
+    def load(cls, file_name):
+        with open(file_name, 'rb') as file:
+            is_binary = file.read(len(STREAM_MAGIC)) == STREAM_MAGIC
+        return cls.read_binary(file_name) if is_binary else cls.read_csv(file_name)
+
+    @classmethod
+    def read_binary(cls, file_name):
+        with open(file_name, 'rb') as file:
+            magic, version, _, tick, num_frames, num_commands = STREAM_HEADER.unpack(file.read(STREAM_HEADER.size))
+            dtype = COMMAND_DTYPE if version == STREAM_VERSION else LEGACY_COMMAND_DTYPES.get(version)
+            if magic != STREAM_MAGIC or dtype is None:
+                raise ValueError(f'{file_name} is not a version {STREAM_VERSION} command stream')
+            commands = np.frombuffer(file.read(num_commands * dtype.itemsize), dtype=dtype).astype(COMMAND_DTYPE)
+        if len(commands) != num_commands:
+            raise ValueError(f'{file_name} is truncated ({len(commands)} of {num_commands} commands)')
+        return cls(tick, num_frames, commands)
+
+    @classmethod
+    def read_csv(cls, file_name):
+        tick, num_frames = DEFAULT_TICK, None
+        with open(file_name, newline='') as file:
+            first_line = file.readline()
+            if first_line.startswith('#'):
+                metadata = dict(field.split('=') for field in first_line[1:].split())
+                tick, num_frames = float(metadata['tick']), int(metadata['frames'])
+            else:
+                file.seek(0)
+            reader = csv.DictReader(file)
+            rows = [tuple(int(row[field]) for field in COMMAND_DTYPE.names) for row in reader]
+        commands = np.array(rows, dtype=COMMAND_DTYPE)
+        if num_frames is None:
+            num_frames = int(commands['frame'].max()) + 1 if len(commands) else 0
+        return cls(tick, num_frames, commands)
+
+
+# Command line
+def export_design(file_name, out_dir=None, output_format='bin', tick=DEFAULT_TICK, resegment=False):
+    """Compile one design file and write its command stream; returns a summary dict."""
+    start = time.perf_counter()
+    actuator_signals = design_signals(load_design(file_name))
+    segmented = segment_signals(actuator_signals, resegment)
+    stream = compile_commands(actuator_signals, tick)
+
+    base_name = os.path.splitext(os.path.basename(file_name))[0]
+    out_file = os.path.join(out_dir or os.path.dirname(os.path.abspath(file_name)), f'{base_name}.{output_format}')
+    stream.save(out_file)
+    return {
+        'design': file_name,
+        'output': out_file,
+        'actuators': len(actuator_signals),
+        'segmented_clips': segmented,
+        'frames': stream.num_frames,
+        'commands': len(stream),
+        'seconds': time.perf_counter() - start,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('designs', nargs='+', help='.dsgn files to compile')
+    parser.add_argument('--format', choices=['bin', 'csv'], default='bin', help='output format (default: bin)')
+    parser.add_argument('--out-dir', help='directory for the output files (default: next to each design)')
+    parser.add_argument('--tick-ms', type=float, default=DEFAULT_TICK * 1000, help='playback tick in milliseconds (default: 5)')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='designs compiled in parallel (default: CPU count)')
+    parser.add_argument('--resegment', action='store_true', help='segment every clip again instead of reusing stored components')
+    args = parser.parse_args()
+
+    if args.out_dir:
+        os.makedirs(args.out_dir, exist_ok=True)
+    options = (args.out_dir, args.format, args.tick_ms / 1000, args.resegment)
+
+    failed = 0
+    # Segmentation is CPU bound: one process per design
+    with ProcessPoolExecutor(max_workers=max(1, min(args.jobs, len(args.designs)))) as executor:
+        futures = {file_name: executor.submit(export_design, file_name, *options) for file_name in args.designs}
+        for file_name, future in futures.items():
+            try:
+                result = future.result()
+                print(f"{result['design']} -> {result['output']}: {result['actuators']} actuators, {result['frames']} frames, "
+                      f"{result['commands']} commands, {result['segmented_clips']} clips segmented ({result['seconds']:.2f} s)")
+            except Exception as e:
+                failed += 1
+                print(f'{file_name}: failed to compile ({e})')
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,65 @@
+'''
+Level-gated logging for the application, with one logger per subsystem ("haptics.<subsystem>").
+
+Only warnings and errors are shown by default, so the playback hot path pays for a level check and
+nothing else. Levels are set per subsystem with the HAPTICS_LOG environment variable:
+    HAPTICS_LOG=ble=DEBUG,timer=INFO python app.py
+    HAPTICS_LOG=DEBUG python app.py          (every subsystem)
+Messages take %-style arguments so they are only formatted when emitted; arguments that are costly
+to compute (e.g. min/max over a clip) are built under `if log.isEnabledFor(logging.DEBUG)`.
+'''
+
+import logging
+import os
+import sys
+
+ROOT_LOGGER = 'haptics'
+SUBSYSTEMS = ['timer', 'playback', 'ble', 'canvas', 'timeline', 'ui']
+DEFAULT_LEVEL = logging.WARNING
+LOG_FORMAT = '%(asctime)s %(name)s %(levelname)s: %(message)s'
+
+_handler = None
+
+
+def get_logger(subsystem):
+    return logging.getLogger(f'{ROOT_LOGGER}.{subsystem}')
+
+def parse_levels(spec):
+    """'ble=DEBUG,timer=INFO' -> {'ble': 10, 'timer': 20}; a bare level applies to every subsystem ('' key)."""
+    levels = {}
+    for entry in (spec or '').split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        subsystem, _, level = entry.rpartition('=')
+        level = logging.getLevelName(level.strip().upper())
+        if not isinstance(level, int):
+            print(f'Ignoring unknown log level in HAPTICS_LOG entry "{entry}"')
+            continue
+        levels[subsystem.strip()] = level
+    return levels
+
+def configure_logging(spec=None):
+    """Attach the stdout handler and apply the levels of spec (HAPTICS_LOG when None)."""
+    global _handler
+    root = logging.getLogger(ROOT_LOGGER)
+    if _handler is None:
+        _handler = logging.StreamHandler(sys.stdout)
+        _handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        root.addHandler(_handler)
+        root.propagate = False
+
+    levels = parse_levels(os.environ.get('HAPTICS_LOG') if spec is None else spec)
+    root.setLevel(levels.pop('', DEFAULT_LEVEL))
+    for subsystem in SUBSYSTEMS:
+        # NOTSET defers to the root level set above
+        get_logger(subsystem).setLevel(levels.pop(subsystem, logging.NOTSET))
+    for subsystem, level in levels.items():
+        get_logger(subsystem).setLevel(level)
+
+def set_level(subsystem, level):
+    """Change the level of one subsystem at runtime, e.g. set_level('ble', logging.DEBUG)."""
+    get_logger(subsystem).setLevel(level)
+
+
+configure_logging()
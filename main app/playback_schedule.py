@@ -0,0 +1,130 @@
+'''
+Precompiled playback: a compiled command stream packed into ready-to-send BLE packets.
+
+The application compiles its clips into a CommandStream on a worker thread after edits, and again
+for what changed when playback starts (see design_compiler.CommandCompiler, which only samples the
+actuators edited since the previous compile), and PlaybackSchedule packs the commands of every frame for the routing of the transport
+(python_ble_api, BleDeviceManager or command_player.DryRunTransport). While playing, each tick only
+looks up the frames that are due and hands their packets to the transport: no amplitude lookup,
+command dicts or diffing against the last sent commands. The packets are kept until the stream or
+the routing (connected devices, chain assignments) changes.
+
+The schedule also stores a keyframe of the full actuator state every KEYFRAME_INTERVAL frames, so
+the state at any time is rebuilt from the closest keyframe and at most KEYFRAME_INTERVAL frames of
+commands. Seeking compares that state with what the device is playing and sends one batch with
+only the differences (see correction).
+
+A LoopRegion precomputes, once, the batch that takes the device from the state at the end of a
+region back to the state at its start, so a loop wraps by sending the last frames, that batch and
+the first frames of the next pass together, without rebuilding any state.
+'''
+
+import numpy as np
+
+from design_compiler import COMMAND_DTYPE
+
+TIME_EPSILON = 1e-9  # frame times are multiples of the tick: do not miss a frame to rounding
+KEYFRAME_INTERVAL = 200  # frames with commands between two keyframes: bounds the replay after a keyframe
+NUM_ADDRS = 128  # addresses of one controller; states grow to the largest address of the stream
+
+
+def empty_state(num_addrs=NUM_ADDRS):
+    """Actuator state indexed by address: the last command of every address (nothing playing)."""
+    state = np.zeros(num_addrs, dtype=COMMAND_DTYPE)
+    state['addr'] = np.arange(num_addrs)
+    return state
+
+def state_size(commands):
+    return max(NUM_ADDRS, int(commands['addr'].max()) + 1 if len(commands) else 0)
+
+def fit_state(state, num_addrs):
+    """state extended with idle addresses up to num_addrs."""
+    if len(state) >= num_addrs:
+        return state
+    return np.concatenate((state, empty_state(num_addrs)[len(state):]))
+
+def apply_commands(state, commands):
+    state[commands['addr']] = commands  # Frames have one command per address
+
+def correction(current, target):
+    """Commands that bring actuators from the current state to the target state: stops first, then starts and changes."""
+    num_addrs = max(len(current), len(target))
+    current, target = fit_state(current, num_addrs), fit_state(target, num_addrs)
+    playing, target_playing = current['start_or_stop'] == 1, target['start_or_stop'] == 1
+    stops = current[playing & ~target_playing].copy()
+    stops['duty'], stops['freq'], stops['start_or_stop'] = 0, 0, 0  # As stop_playback sends them
+    changed = target_playing & (~playing | (current['duty'] != target['duty']) | (current['freq'] != target['freq']))
+    return np.concatenate((stops, target[changed]))
+
+
+class PlaybackSchedule:
+    def __init__(self, stream, transport):
+        self.stream = stream
+        commands = stream.commands
+        starts = np.flatnonzero(np.diff(commands['frame'])) + 1
+        starts = np.concatenate(([0], starts)) if len(commands) else np.zeros(0, dtype=int)
+        self.frames = commands['frame'][starts].astype(np.int64)  # frames that have commands
+        self.times = self.frames * stream.tick
+        self.offsets = np.append(starts, len(commands))  # commands of frame i: commands[offsets[i]:offsets[i + 1]]
+        self.batches = []
+        self.keyframes = []  # keyframes[k]: state before frame k * KEYFRAME_INTERVAL
+        self.num_addrs = state_size(commands)
+        state = empty_state(self.num_addrs)
+        for index, (start, stop) in enumerate(zip(self.offsets[:-1], self.offsets[1:])):
+            if index % KEYFRAME_INTERVAL == 0:
+                self.keyframes.append(state.copy())
+            self.batches.append(transport.pack_batches(commands[start:stop]))
+            apply_commands(state, commands[start:stop])
+        if len(self.frames) % KEYFRAME_INTERVAL == 0:
+            self.keyframes.append(state.copy())  # state_at(len(self)) also starts from a keyframe
+        self.routing_key = transport.routing_key()  # After packing: routing may assign unassigned chains
+
+    def __len__(self):
+        return len(self.frames)
+
+    @property
+    def duration(self):
+        return self.stream.duration
+
+    def is_valid_for(self, stream, transport):
+        return stream is self.stream and transport.routing_key() == self.routing_key
+
+    def index_at(self, time_position):
+        """Index of the first frame after time_position (the frames before it are due)."""
+        return int(np.searchsorted(self.times, time_position + TIME_EPSILON, 'right'))
+
+    def frame_commands(self, index):
+        return self.stream.commands[self.offsets[index]:self.offsets[index + 1]]
+
+    def pack_commands(self, transport, commands):
+        """Batches of an array of commands, none if it is empty (an empty packet is still a write)."""
+        return transport.pack_batches(commands) if len(commands) else []
+
+    def state_at(self, index):
+        """Actuator state once the frames before index are sent, from the closest keyframe."""
+        keyframe = index // KEYFRAME_INTERVAL
+        state = self.keyframes[keyframe].copy()
+        commands = self.stream.commands[self.offsets[keyframe * KEYFRAME_INTERVAL]:self.offsets[index]][::-1]
+        _, last = np.unique(commands['addr'], return_index=True)  # First in reverse order: last command of each address
+        apply_commands(state, commands[last])
+        return state
+
+
+class LoopRegion:
+    def __init__(self, schedule, transport, start_time, end_time):
+        self.schedule = schedule
+        self.start_time = start_time
+        self.end_time = end_time
+        self.start_index = schedule.index_at(start_time)
+        self.end_index = schedule.index_at(end_time)
+        self.start_state = schedule.state_at(self.start_index)
+        # From the state once the frames up to end_time are sent back to the state at start_time
+        self.wrap_batches = schedule.pack_commands(transport, correction(schedule.state_at(self.end_index), self.start_state))
+
+    @property
+    def length(self):
+        return self.end_time - self.start_time
+
+    def wrap(self, time_position):
+        """time_position folded into the region, keeping how far it went past the end (no gap at the wrap)."""
+        return self.start_time + (time_position - self.start_time) % self.length
@@ -1,19 +1,173 @@
 import asyncio
-from bleak import BleakScanner, BleakClient
 import threading
 import time
 
+import numpy as np
+
+from telemetry import telemetry
+from haptics_logging import get_logger
+
+log = get_logger('ble')
+
+# bleak is imported in the methods that scan/connect, so that creating the API object is cheap
+
+SCAN_CACHE_TTL = 30.0  # seconds a scan result is reused before scanning again
+RECONNECT_INITIAL_DELAY = 0.5  # seconds before the second reconnect attempt, doubled after every failure
+RECONNECT_MAX_DELAY = 10.0
+
+COMMAND_SIZE = 3  # bytes per command
+MAX_COMMANDS_PER_PACKET = 20
+PACKET_SIZE = COMMAND_SIZE * MAX_COMMANDS_PER_PACKET  # packets are padded with 0xFF to 60 bytes
+
+def run_loop(loop):
+    asyncio.set_event_loop(loop)
+    loop.run_forever()
+
+def start_event_loop():
+    """Start an asyncio loop running forever in a daemon thread; returns (loop, thread)."""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=run_loop, args=(loop,), daemon=True)
+    thread.start()
+    return loop, thread
+
+def valid_commands(addr, duty, freq, start_or_stop):
+    """Boolean mask of the commands whose fields fit the packet format."""
+    return ((addr >= 0) & (addr <= 127) & (duty >= 0) & (duty <= 15) & (freq >= 0) & (freq <= 7)
+            & ((start_or_stop == 0) | (start_or_stop == 1)))
+
+def packable_commands(commands, reported):
+    """
+    The commands of a structured array (design_compiler.COMMAND_DTYPE) that fit the packet format.
+    The others are dropped, with a warning for the addresses that are not in reported yet.
+    """
+    valid = valid_commands(commands['addr'].astype(np.int64), commands['duty'], commands['freq'], commands['start_or_stop'])
+    if valid.all():
+        return commands
+    dropped = set(np.unique(commands['addr'][~valid]).tolist()) - reported
+    if dropped:
+        reported.update(dropped)
+        log.warning('No device address for %s, their commands are dropped', sorted(dropped))
+    return commands[valid]
+
+def pack_commands(addr, duty, freq, start_or_stop, out=None):
+    """
+    Pack arrays of command fields into packets of 20 commands (same encoding as create_command).
+    Returns a uint8 array of shape (num_packets, 60), padded with 0xFF. out is an optional
+    preallocated uint8 array of shape (n, 60) with n >= num_packets, reused between calls; the
+    packets are written into its first rows. Raises ValueError if a field is out of range.
+    """
+    # Wide integers: out-of-range fields are refused below instead of wrapping around
+    addr = np.asarray(addr, dtype=np.int64)
+    duty = np.asarray(duty, dtype=np.int64)
+    freq = np.asarray(freq, dtype=np.int64)
+    start_or_stop = np.asarray(start_or_stop, dtype=np.int64)
+    valid = valid_commands(addr, duty, freq, start_or_stop)
+    if not valid.all():
+        raise ValueError(f'invalid commands at indices {np.flatnonzero(~valid).tolist()}')
+
+    num_commands = len(addr)
+    num_packets = max(1, -(-num_commands // MAX_COMMANDS_PER_PACKET))
+    if out is None:
+        out = np.empty((num_packets, PACKET_SIZE), dtype=np.uint8)
+    elif len(out) < num_packets:
+        raise ValueError(f'buffer holds {len(out)} packets, {num_packets} needed')
+    packets = out[:num_packets]
+    flat = packets.reshape(-1)  # view: the first rows of a C-contiguous array are contiguous
+    flat[num_commands * COMMAND_SIZE:] = 0xFF
+    commands = flat[:num_commands * COMMAND_SIZE].reshape(num_commands, COMMAND_SIZE)
+    commands[:, 0] = ((addr >> 4) << 2) | (start_or_stop & 0x01)
+    commands[:, 1] = 0x40 | (addr & 0x0F)
+    commands[:, 2] = 0x80 | ((duty & 0x0F) << 3) | (freq & 0x07)
+    return packets
+
+def unpack_commands(packets):
+    """Command dicts of packets built by pack_commands, without the padding."""
+    commands = np.asarray(packets, dtype=np.uint8).reshape(-1, COMMAND_SIZE)
+    commands = commands[commands[:, 0] != 0xFF]
+    return [{'addr': int(b1 >> 2) * 16 + int(b2 & 0x0F), 'duty': int(b3 >> 3) & 0x0F, 'freq': int(b3 & 0x07),
+             'start_or_stop': int(b1 & 0x01)} for b1, b2, b3 in commands]
+
+async def send_batches_async(batches):
+    """Send [(python_ble_api, packets)]: the packets of one device in order, devices concurrently."""
+    per_device = {}
+    for api, packets in batches:
+        per_device.setdefault(api, []).append(packets)
+    async def send_device(api, packet_lists):
+        results = [await api.send_packets_async(packets) for packets in packet_lists]
+        return all(results)
+    results = await asyncio.gather(*(send_device(api, packet_lists) for api, packet_lists in per_device.items()))
+    return all(results)
+
+def command_arrays(commands):
+    """(addr, duty, freq, start_or_stop) arrays of a list of command dicts; missing fields are -1 (invalid)."""
+    fields = np.array([(c.get('addr', -1), c.get('duty', -1), c.get('freq', -1), c.get('start_or_stop', -1))
+                       for c in commands], dtype=np.int64).reshape(-1, 4)
+    return fields[:, 0], fields[:, 1], fields[:, 2], fields[:, 3]
+
+class ScanCache:
+    """Result of the last BLE scan (address -> name), shared by every python_ble_api instance."""
+    def __init__(self, ttl=SCAN_CACHE_TTL):
+        self.ttl = ttl
+        self.devices = {}
+        self.scanned_at = None  # time.monotonic() of the last scan
+        self.scan_task = None  # scan in progress, awaited by concurrent callers on the same loop
+
+    def is_fresh(self):
+        return self.scanned_at is not None and time.monotonic() - self.scanned_at < self.ttl
+
+    def invalidate(self):
+        self.scanned_at = None
+
+    async def discover(self):
+        from bleak import BleakScanner
+        devices = await BleakScanner.discover()
+        self.devices = {d.address: d.name for d in devices if d.name}  # Identical controllers share a name
+        self.scanned_at = time.monotonic()
+        return self.devices
+
+    async def scan(self, force=False):
+        """address -> name, scanning only if the cached result is older than the TTL (or force)."""
+        if not force and self.is_fresh():
+            return dict(self.devices)
+        loop = asyncio.get_running_loop()
+        if self.scan_task is None or self.scan_task.done() or self.scan_task.get_loop() is not loop:
+            self.scan_task = loop.create_task(self.discover())
+        return dict(await asyncio.shield(self.scan_task))
+
+scan_cache = ScanCache()
+
+def address_of(devices, device_name, exclude=()):
+    """First address of a scan result (address -> name) with that name, skipping the addresses in exclude."""
+    return next((address for address, name in devices.items() if name == device_name and address not in exclude), None)
+
 class python_ble_api:
-    def __init__(self):
+    def __init__(self, loop=None):
         self.MOTOR_UUID = 'f22535de-5375-44bd-8ca9-d0ea9ff9e410'
         self.client = None
-        self.loop = asyncio.new_event_loop()
-        self.thread = threading.Thread(target=self.run_loop, daemon=True)
-        self.thread.start()
+        # The asyncio loop and its thread are only started on first use (see the loop property),
+        # unless a loop shared with other devices is given (see ble_device_manager.py)
+        self._loop = loop
+        self.thread = None
+        self._loop_lock = threading.Lock()
+
+        # Reconnection: the last connected address is kept, and while reconnecting the latest
+        # command of each actuator is queued and sent once the link is back
+        self.device_name = None
+        self.address = None
+        self.auto_reconnect = True
+        self.expect_disconnect = False
+        self.reconnect_task = None
+        self.pending_commands = {}  # addr -> latest command not delivered because the link was down
+        self._packet_buffer = np.empty((1, PACKET_SIZE), dtype=np.uint8)
+        self.unroutable = set()  # addresses already reported as not fitting the packet format
 
-    def run_loop(self):
-        asyncio.set_event_loop(self.loop)
-        self.loop.run_forever()
+    @property
+    def loop(self):
+        if self._loop is None:
+            with self._loop_lock:
+                if self._loop is None:
+                    self._loop, self.thread = start_event_loop()
+        return self._loop
 
     def create_command(self, addr, duty, freq, start_or_stop):
         serial_group = addr // 16
@@ -25,22 +179,25 @@ class python_ble_api:
 
     async def send_command_async(self, addr, duty, freq, start_or_stop) -> bool:
         if self.client is None or not self.client.is_connected:
+            self.queue_commands([{'addr': addr, 'duty': duty, 'freq': freq, 'start_or_stop': start_or_stop}])
             return False
         if addr < 0 or addr > 127 or duty < 0 or duty > 15 or freq < 0 or freq > 7 or start_or_stop not in [0, 1]:
             return False
         command = self.create_command(int(addr), int(duty), int(freq), int(start_or_stop))
         command = command + bytearray([0xFF, 0xFF, 0xFF]) * 19 # Padding
         try:
+            write_start = time.perf_counter()
             await self.client.write_gatt_char(self.MOTOR_UUID, command)
-            print(f'BLE sent command to #{addr} with duty {duty} and freq {freq}, start_or_stop {start_or_stop}')
+            telemetry.record('ble.write', time.perf_counter() - write_start)
+            log.debug('BLE sent command to #%d with duty %d and freq %d, start_or_stop %d', addr, duty, freq, start_or_stop)
             return True
         except Exception as e:
-            print(f'BLE failed to send command to #{addr} with duty {duty} and freq {freq}. Error: {e}')
+            log.warning('BLE failed to send command to #%d with duty %d and freq %d. Error: %s', addr, duty, freq, e)
             return False
 
     '''
     send a list of commands to the BLE device at once.
-    10 commands at most.
+    Packets hold 20 commands: longer lists are sent as several packets, in order.
     commands is in the format of a list of json objects:
     [
         {
@@ -59,74 +216,215 @@ class python_ble_api:
     '''
     async def send_command_list_async(self, commands) -> bool:
         if self.client is None or not self.client.is_connected:
+            self.queue_commands(commands)
             return False
-        command = bytearray()
-        for c in commands:
-            addr = c.get('addr', -1)
-            duty = c.get('duty', -1)
-            freq = c.get('freq', -1)
-            start_or_stop = c.get('start_or_stop', -1)
-            if addr < 0 or addr > 127 or duty < 0 or duty > 15 or freq < 0 or freq > 7 or start_or_stop not in [0, 1]:
-                return False
-            command = command + self.create_command(int(addr), int(duty), int(freq), int(start_or_stop))
-        # padding to 60 bytes
-        command = command + bytearray([0xFF, 0xFF, 0xFF]) * (20 - len(commands))
         try:
-            await self.client.write_gatt_char(self.MOTOR_UUID, command)
-            print(f'BLE sent command list {commands}')
+            fields = command_arrays(commands)
+        except (ValueError, OverflowError) as e:  # Not integers, or too large for an integer array
+            log.warning('BLE refused command list %s: %s', commands, e)
+            return False
+        if await self.send_arrays_async(*fields):
+            log.debug('BLE sent command list %s', commands)
+            return True
+        return False
+
+    async def send_arrays_async(self, addr, duty, freq, start_or_stop) -> bool:
+        """Send commands given as arrays of fields, any number of them (packed 20 per packet)."""
+        if self.client is None or not self.client.is_connected:
+            if self.is_reconnecting():
+                self.queue_commands([{'addr': int(a), 'duty': int(d), 'freq': int(f), 'start_or_stop': int(s)}
+                                     for a, d, f, s in zip(addr, duty, freq, start_or_stop)])
+            return False
+        try:
+            packets = pack_commands(addr, duty, freq, start_or_stop, out=self.packet_buffer(len(addr)))
+        except (ValueError, OverflowError) as e:  # Fields out of range, or too large for an integer array
+            log.warning('BLE refused %d command(s): %s', len(addr), e)
+            return False
+        return await self.send_packets_async(packets)
+
+    def packet_buffer(self, num_commands):
+        """Preallocated packet buffer (used on the BLE loop only), grown when a list needs more packets."""
+        num_packets = max(1, -(-num_commands // MAX_COMMANDS_PER_PACKET))
+        if len(self._packet_buffer) < num_packets:
+            self._packet_buffer = np.empty((num_packets, PACKET_SIZE), dtype=np.uint8)
+        return self._packet_buffer
+
+    async def send_packets_async(self, packets) -> bool:
+        """Write packets built by pack_commands, one BLE write per row, in order."""
+        if self.client is None or not self.client.is_connected:
+            if self.is_reconnecting():
+                self.queue_commands(unpack_commands(packets))
+            return False
+        # Copy the packets before the first await: they may live in the shared packet buffer, which a
+        # concurrent send_command_list_async (e.g. flush_pending_async) refills while this one writes
+        payloads = [packet.tobytes() for packet in packets]
+        written = 0
+        try:
+            for payload in payloads:
+                write_start = time.perf_counter()
+                await self.client.write_gatt_char(self.MOTOR_UUID, payload)
+                telemetry.record('ble.write', time.perf_counter() - write_start)
+                written += 1
             return True
         except Exception as e:
-            print(f'BLE failed to send command list {commands}. Error: {e}')
+            log.warning('BLE failed to send %d packet(s). Error: %s', len(payloads) - written, e)
+            # The write may fail before bleak reports the dropped link: reconnect from here and keep the
+            # packets not written yet, so that their commands (stops included) are sent once the link is back
+            if self.auto_reconnect and not self.expect_disconnect and self.address is not None:
+                self.start_reconnect()
+                self.queue_commands(unpack_commands(np.frombuffer(b''.join(payloads[written:]), dtype=np.uint8)))
             return False
 
-    async def get_ble_devices_async(self):
-        devices = await BleakScanner.discover()
-        return [d.name for d in devices if d.name != '']
+    async def get_ble_devices_async(self, force_scan=False):
+        return list((await scan_cache.scan(force_scan)).values())
+
+    async def scan_devices_async(self, force_scan=False):
+        """[(name, address)] of the devices in range, from the scan cache unless it is stale (or force_scan)."""
+        return sorted((name, address) for address, name in (await scan_cache.scan(force_scan)).items())
 
     async def connect_ble_device_async(self, device_name) -> bool:
-        devices = await BleakScanner.discover()
-        for d in devices:
-            if d.name == device_name:
-                self.client = BleakClient(d.address)
-                try:
-                    await self.client.connect()
-                    if self.client.is_connected:
-                        print(f'BLE connected to {d.address}')
-                        return True
-                except Exception as e:
-                    print(f'BLE failed to connect to {d.address}. Error: {e}')
-                    return False
-        print(f'BLE failed to find device with name: {device_name}')
+        cached_scan = scan_cache.is_fresh()
+        address = address_of(await scan_cache.scan(), device_name)
+        if address is not None and await self.connect_address_async(address, device_name):
+            return True
+        if cached_scan:
+            # The cached result may be outdated (device restarted, or not in range at the time): scan once more
+            address = address_of(await scan_cache.scan(force=True), device_name)
+            if address is not None:
+                return await self.connect_address_async(address, device_name)
+        log.warning('BLE failed to find device with name: %s', device_name)
         return False
 
+    async def connect_address_async(self, address, device_name=None) -> bool:
+        """Connect directly to a known address, without scanning."""
+        from bleak import BleakClient
+        self.client = BleakClient(address, disconnected_callback=self.on_disconnected)
+        self.expect_disconnect = False
+        try:
+            await self.client.connect()
+            if self.client.is_connected:
+                self.address = address
+                self.device_name = device_name or self.device_name
+                log.info('BLE connected to %s', address)
+                return True
+        except Exception as e:
+            log.warning('BLE failed to connect to %s. Error: %s', address, e)
+        self.client = None
+        return False
+
+    def on_disconnected(self, client):
+        """Called by bleak when the link drops; reconnects in the background unless the drop was requested."""
+        if client is not self.client or self.expect_disconnect or not self.auto_reconnect:
+            return
+        # Some bleak backends call this from their own thread
+        self.loop.call_soon_threadsafe(self.start_reconnect)
+
+    def start_reconnect(self):
+        if not self.is_reconnecting() and not self.expect_disconnect:
+            log.warning('BLE connection to %s lost, reconnecting', self.address)
+            self.reconnect_task = self.loop.create_task(self.reconnect_async())
+
+    async def reconnect_async(self):
+        """Reconnect to the last address with exponential backoff, then send the queued commands."""
+        delay = RECONNECT_INITIAL_DELAY
+        attempt = 1
+        if self.client is not None and self.client.is_connected:
+            # Started by a failed write on a link bleak still reports as up: close it before reconnecting
+            try:
+                await self.client.disconnect()
+            except Exception as e:
+                log.debug('BLE failed to close the link to %s. Error: %s', self.address, e)
+        while not self.expect_disconnect:
+            if await self.connect_address_async(self.address):
+                log.info('BLE reconnected to %s after %d attempt(s)', self.address, attempt)
+                await self.flush_pending_async()
+                return True
+            await asyncio.sleep(delay)
+            delay = min(2 * delay, RECONNECT_MAX_DELAY)
+            attempt += 1
+        return False
+
+    def is_reconnecting(self):
+        return self.reconnect_task is not None and not self.reconnect_task.done()
+
+    def queue_commands(self, commands):
+        """Keep the latest command of each actuator while a reconnection is in progress."""
+        if not self.is_reconnecting():
+            return
+        for c in commands:
+            self.pending_commands.pop(c['addr'], None)  # Re-insert so the final order of commands is kept
+            self.pending_commands[c['addr']] = c
+
+    async def flush_pending_async(self):
+        commands, self.pending_commands = list(self.pending_commands.values()), {}
+        for i in range(0, len(commands), 20):
+            await self.send_command_list_async(commands[i:i + 20])
+
     async def disconnect_ble_device_async(self) -> bool:
+        self.expect_disconnect = True  # Do not reconnect after a requested disconnection
+        if self.is_reconnecting():
+            self.reconnect_task.cancel()
+        self.pending_commands = {}
+        if self.client is None:
+            return True
         try:
             await self.client.disconnect()
             if not self.client.is_connected:
                 self.client = None
-                print(f'BLE disconnected')
+                log.info('BLE disconnected')
                 return True
         except Exception as e:
-            print(f'BLE failed to disconnect. Error: {e}')
+            log.warning('BLE failed to disconnect. Error: %s', e)
         return False
 
     def run_async(self, coro):
         return asyncio.run_coroutine_threadsafe(coro, self.loop)
     
-    def get_ble_devices(self):
-        return self.run_async(self.get_ble_devices_async()).result()
+    def get_ble_devices(self, force_scan=False):
+        return self.run_async(self.get_ble_devices_async(force_scan)).result()
+
+    def scan_devices(self, force_scan=False):
+        return self.run_async(self.scan_devices_async(force_scan)).result()
 
     def connect_ble_device(self, device_name):
         return self.run_async(self.connect_ble_device_async(device_name)).result()
 
+    def connect_ble_address(self, address, device_name=None):
+        return self.run_async(self.connect_address_async(address, device_name)).result()
+
     def disconnect_ble_device(self):
         return self.run_async(self.disconnect_ble_device_async()).result()
 
     def send_command(self, addr, duty, freq, start_or_stop):
+        if self.client is None and not self.is_reconnecting():
+            return False  # Not connected: no need to wake up the BLE loop
         return self.run_async(self.send_command_async(addr, duty, freq, start_or_stop)).result()
     
     def send_command_list(self, commands):
+        if self.client is None and not self.is_reconnecting():
+            return False  # Not connected: no need to wake up the BLE loop
         return self.run_async(self.send_command_list_async(commands)).result()
+
+    # Precompiled playback (see playback_schedule.py)
+    def routing_key(self):
+        return None  # Addresses are sent as they are: packets never need to be rebuilt
+
+    def pack_batches(self, commands):
+        """[(api, packets)] for a structured array of commands (design_compiler.COMMAND_DTYPE)."""
+        commands = packable_commands(commands, self.unroutable)
+        if not len(commands):
+            return []
+        return [(self, pack_commands(commands['addr'], commands['duty'], commands['freq'], commands['start_or_stop']))]
+
+    def send_batches(self, batches):
+        if self.client is None and not self.is_reconnecting():
+            return False
+        return self.run_async(send_batches_async(batches)).result()
+
+    def send_arrays(self, addr, duty, freq, start_or_stop):
+        if self.client is None and not self.is_reconnecting():
+            return False
+        return self.run_async(self.send_arrays_async(addr, duty, freq, start_or_stop)).result()
         
 
 if __name__ == '__main__':
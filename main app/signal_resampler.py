@@ -0,0 +1,149 @@
+'''
+Band-limited rational (polyphase) resampling used when importing waveforms.
+
+resample_signal converts a whole array at once, StreamingResampler converts a signal chunk by chunk
+with bounded memory (only the filter history and one output block are kept alive), and resample_chunks
+wraps the streaming resampler for any iterable of chunks (e.g. rows read lazily from a file).
+'''
+
+from fractions import Fraction
+from math import ceil
+
+import numpy as np
+
+DEFAULT_CHUNK_SIZE = 65536
+MAX_GATHER_ELEMENTS = 1 << 20  # upper bound of the (outputs x taps) matrix built per block
+
+
+class StreamingResampler:
+    def __init__(self, orig_rate, target_rate, window=('kaiser', 5.0)):
+        ratio = Fraction(int(target_rate), int(orig_rate))
+        self.up = ratio.numerator
+        self.down = ratio.denominator
+
+        from scipy.signal import firwin
+
+        # Same anti-aliasing filter design as scipy.signal.resample_poly
+        max_rate = max(self.up, self.down)
+        half_len = 10 * max_rate
+        h = firwin(2 * half_len + 1, 1.0 / max_rate, window=window) * self.up
+        self.delay = half_len  # group delay of the filter in the upsampled domain
+
+        # Split the filter into `up` phases: phases[p, k] = h[p + k * up]
+        self.taps = ceil(len(h) / self.up)
+        padded = np.zeros(self.taps * self.up)
+        padded[:len(h)] = h
+        self.phases = padded.reshape(self.taps, self.up).T.copy()
+        self.tap_offsets = np.arange(self.taps)
+        self.block_size = max(1, MAX_GATHER_ELEMENTS // self.taps)
+
+        self.reset()
+
+    def reset(self):
+        """Forget all buffered input so the resampler can be reused for a new signal."""
+        # The buffer starts with taps - 1 zeros standing in for the samples before the signal
+        self.buffer = np.zeros(self.taps - 1)
+        self.buffer_start = -(self.taps - 1)  # absolute input index of buffer[0]
+        self.received = 0  # number of real input samples received so far
+        self.next_output = 0  # absolute index of the next output sample
+
+    def output_length(self, input_length):
+        """Number of output samples produced for an input of the given length (matches resample_poly)."""
+        return ceil(input_length * self.up / self.down)
+
+    def process(self, chunk):
+        """Feed a chunk of input samples and return every output sample that is now fully determined."""
+        chunk = np.asarray(chunk, dtype=float).ravel()
+        if len(chunk) == 0:
+            return np.empty(0)
+        self.buffer = np.concatenate((self.buffer, chunk))
+        self.received += len(chunk)
+
+        # Output n needs input up to (n * down + delay) // up, which must already be received
+        ready_end = (self.received * self.up - 1 - self.delay) // self.down + 1
+        return self._emit(ready_end)
+
+    def flush(self):
+        """Emit the remaining output samples (treating the signal as zero beyond its end) and reset."""
+        total = self.output_length(self.received)
+        if self.next_output < total:
+            last_base = ((total - 1) * self.down + self.delay) // self.up
+            missing = last_base + 1 - (self.buffer_start + len(self.buffer))
+            if missing > 0:
+                self.buffer = np.concatenate((self.buffer, np.zeros(missing)))
+            output = self._emit(total)
+        else:
+            output = np.empty(0)
+        self.reset()
+        return output
+
+    def _emit(self, end):
+        if end <= self.next_output:
+            return np.empty(0)
+
+        output = np.empty(end - self.next_output)
+        written = 0
+        for block_start in range(self.next_output, end, self.block_size):
+            n = np.arange(block_start, min(block_start + self.block_size, end))
+            position = n * self.down + self.delay
+            base = position // self.up
+            phase = position % self.up
+
+            # Gather x[base - k] for every tap k and apply the matching filter phase
+            indices = (base - self.buffer_start)[:, None] - self.tap_offsets[None, :]
+            block = np.einsum('ij,ij->i', self.buffer[indices], self.phases[phase])
+            output[written:written + len(block)] = block
+            written += len(block)
+        self.next_output = end
+
+        # Drop the input history that no future output can reach
+        next_base = (self.next_output * self.down + self.delay) // self.up
+        keep_from = next_base - (self.taps - 1) - self.buffer_start
+        if keep_from > 0:
+            self.buffer = self.buffer[keep_from:]
+            self.buffer_start += keep_from
+        return output
+
+
+def resample_chunks(chunks, orig_rate, target_rate):
+    """Resample an iterable of input chunks, yielding output chunks as soon as they are available."""
+    resampler = StreamingResampler(orig_rate, target_rate)
+    for chunk in chunks:
+        output = resampler.process(chunk)
+        if len(output) > 0:
+            yield output
+    output = resampler.flush()
+    if len(output) > 0:
+        yield output
+
+
+def resample_signal(data, orig_rate, target_rate, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Resample a whole signal from orig_rate to target_rate, returning a numpy array."""
+    data = np.asarray(data, dtype=float).ravel()
+    if int(orig_rate) == int(target_rate):
+        return data.copy()
+
+    resampler = StreamingResampler(orig_rate, target_rate)
+    output = np.empty(resampler.output_length(len(data)))
+    written = 0
+    for start in range(0, len(data), chunk_size):
+        block = resampler.process(data[start:start + chunk_size])
+        output[written:written + len(block)] = block
+        written += len(block)
+    block = resampler.flush()
+    output[written:written + len(block)] = block
+    return output
+
+
+# Example usage
+if __name__ == '__main__':
+    from scipy.signal import resample_poly
+
+    fs = 192000
+    t = np.arange(fs) / fs
+    capture = np.sin(2 * np.pi * 170 * t) + 0.2 * np.sin(2 * np.pi * 30000 * t)  # 30 kHz must be filtered out
+
+    converted = resample_signal(capture, fs, 44100)
+    reference = resample_poly(capture, 147, 640)
+    print(f'Input length: {len(capture)}, output length: {len(converted)}')
+    print(f'Max deviation from resample_poly: {np.max(np.abs(converted - reference))}')
@@ -1,8 +1,6 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.fft import fft, fftfreq
-from scipy.signal import stft
-from scipy.signal import hilbert
+# SciPy (and matplotlib for the debug plots) are imported inside the methods, on first use,
+# so that importing this module does not slow down the application startup
 
 DOMINANT_CUTOFF = 110
 
@@ -37,6 +35,8 @@ class signal_segmentation_api:
 
 
     def signal_segmentation(self, product_signal, sampling_rate, downsample_rate, threshold=102):
+        from scipy.fft import fft, fftfreq
+        from scipy.signal import stft, hilbert
         # print(f"product_signal: Max={np.max(product_signal)}, Min={np.min(product_signal)}")
         # print(f"Sampling Rate: {sampling_rate}, Downsample Rate: {downsample_rate}, Threshold: {threshold}")
         # Perform STFT on the signal to get the high-frequency components
@@ -82,6 +82,7 @@ class signal_segmentation_api:
 
         # print(f"High Frequency Signal: Max={np.max(high_freq_signal)}, Min={np.min(high_freq_signal)}")
         # # Plot the high frequency signal
+        # import matplotlib.pyplot as plt
         # plt.figure(figsize=(10, 4))
         # plt.plot(np.linspace(0, len(product_signal)-1, len(high_freq_signal)), high_freq_signal, '-o')
         # plt.title('High Frequency Signal')
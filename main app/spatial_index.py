@@ -0,0 +1,91 @@
+'''
+Uniform-grid spatial index over 2D points (actuator positions on the canvas).
+
+Space is cut into square cells of a fixed size and every item is stored in the cell containing its
+position, so inserting, moving and removing an item are O(1), and a neighbourhood query only visits
+the few cells overlapping the query radius instead of every item on the canvas.
+'''
+
+from math import floor
+
+DEFAULT_CELL_SIZE = 40  # twice the default actuator size
+
+
+class UniformGrid:
+    def __init__(self, cell_size=DEFAULT_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}  # (column, row) -> set of items
+        self.positions = {}  # item -> (x, y)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __contains__(self, item):
+        return item in self.positions
+
+    def cell_of(self, x, y):
+        return floor(x / self.cell_size), floor(y / self.cell_size)
+
+    def insert(self, item, x, y):
+        if item in self.positions:
+            self.move(item, x, y)
+            return
+        self.positions[item] = (x, y)
+        self.cells.setdefault(self.cell_of(x, y), set()).add(item)
+
+    def move(self, item, x, y):
+        old_x, old_y = self.positions[item]
+        old_cell, new_cell = self.cell_of(old_x, old_y), self.cell_of(x, y)
+        if old_cell != new_cell:
+            self.discard_from_cell(item, old_cell)
+            self.cells.setdefault(new_cell, set()).add(item)
+        self.positions[item] = (x, y)
+
+    def remove(self, item):
+        position = self.positions.pop(item, None)
+        if position is not None:
+            self.discard_from_cell(item, self.cell_of(*position))
+
+    def clear(self):
+        self.cells.clear()
+        self.positions.clear()
+
+    def discard_from_cell(self, item, cell):
+        items = self.cells.get(cell)
+        if items is not None:
+            items.discard(item)
+            if not items:
+                del self.cells[cell]
+
+    def query(self, x, y, radius):
+        """Items whose position lies within radius of (x, y)."""
+        first_column, first_row = self.cell_of(x - radius, y - radius)
+        last_column, last_row = self.cell_of(x + radius, y + radius)
+        radius_squared = radius * radius
+        found = []
+        for column in range(first_column, last_column + 1):
+            for row in range(first_row, last_row + 1):
+                for item in self.cells.get((column, row), ()):
+                    item_x, item_y = self.positions[item]
+                    if (item_x - x) ** 2 + (item_y - y) ** 2 <= radius_squared:
+                        found.append(item)
+        return found
+
+    def any_within(self, x, y, radius, exclude=None):
+        """True if an item other than exclude lies within radius of (x, y)."""
+        return any(item is not exclude for item in self.query(x, y, radius))
+
+
+# Example usage
+if __name__ == '__main__':
+    import random
+    import time
+
+    grid = UniformGrid()
+    points = [(random.uniform(0, 700), random.uniform(0, 300)) for _ in range(2000)]
+    for i, (x, y) in enumerate(points):
+        grid.insert(i, x, y)
+
+    start = time.perf_counter()
+    hits = sum(len(grid.query(x, y, 20)) for x, y in points)
+    print(f'{len(points)} neighbourhood queries in {1000 * (time.perf_counter() - start):.1f} ms ({hits} hits)')
@@ -0,0 +1,86 @@
+'''
+Startup benchmark: time from process start to the first paint of the main window.
+
+Each run starts a fresh Python process (so nothing is cached in sys.modules) that imports app.py,
+builds Haptics_App, shows it and stops at the first paint event. The report also lists which heavy
+dependencies were already imported at that point and whether the BLE event loop thread was started,
+which should both stay empty/false now that they are loaded on first use.
+
+Usage:
+    python startup_benchmark.py [--runs N]
+    QT_QPA_PLATFORM=offscreen python startup_benchmark.py    (headless machines)
+'''
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HEAVY_MODULES = ['scipy', 'scipy.signal', 'bleak', 'matplotlib.pyplot', 'soundfile']
+
+
+def measure_startup():
+    """Run in the child process: start the app and print the timings as JSON."""
+    start = time.perf_counter()
+    timings = {}
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from PyQt6 import QtCore, QtWidgets
+    import app
+    timings['import'] = time.perf_counter() - start
+
+    qt_app = QtWidgets.QApplication(sys.argv[:1])
+    window = app.Haptics_App()
+    timings['construct'] = time.perf_counter() - start
+
+    class FirstPaintFilter(QtCore.QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QtCore.QEvent.Type.Paint and 'first_paint' not in timings:
+                if isinstance(obj, QtWidgets.QWidget) and obj.window() is window:
+                    timings['first_paint'] = time.perf_counter() - start
+                    QtCore.QTimer.singleShot(0, qt_app.quit)
+            return False
+
+    paint_filter = FirstPaintFilter()
+    qt_app.installEventFilter(paint_filter)
+    window.show()
+    qt_app.exec()
+
+    result = {
+        'timings': timings,
+        'loaded_heavy_modules': [name for name in HEAVY_MODULES if name in sys.modules],
+        'ble_loop_started': window.ble_api.thread is not None,
+    }
+    print(json.dumps(result))
+
+
+def run_benchmark(runs):
+    results = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), '--child'],
+                                capture_output=True, text=True, check=True).stdout
+        # The app prints its own messages; the result is the last JSON line
+        results.append(json.loads([line for line in output.splitlines() if line.startswith('{')][-1]))
+
+    print(f'Startup over {runs} runs (median, seconds):')
+    for phase in ('import', 'construct', 'first_paint'):
+        values = [result['timings'][phase] for result in results if phase in result['timings']]
+        if values:
+            print(f'  {phase:12s} {statistics.median(values):.3f}  (min {min(values):.3f}, max {max(values):.3f})')
+    print(f'Heavy modules loaded before first paint: {results[-1]["loaded_heavy_modules"] or "none"}')
+    print(f'BLE loop thread started before first paint: {results[-1]["ble_loop_started"]}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='number of cold starts to measure')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure_startup()
+    else:
+        run_benchmark(args.runs)
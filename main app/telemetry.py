@@ -0,0 +1,105 @@
+'''
+Low-overhead playback telemetry.
+
+Durations are recorded into fixed-size ring buffers (one per metric name, e.g. 'tick.send',
+'timer.jitter', 'ble.write'), so recording costs one array store and memory stays bounded however
+long playback runs. Statistics (count, mean, percentiles, max) are only computed when asked for, by
+the stats dialog of the application or when the telemetry is dumped to JSON.
+
+Code being measured records into the shared `telemetry` instance:
+    start = time.perf_counter()
+    ...
+    telemetry.record('tick.send', time.perf_counter() - start)
+'''
+
+import json
+import threading
+import time
+
+import numpy as np
+
+DEFAULT_CAPACITY = 4096  # samples kept per metric, about 20 s of 5 ms ticks
+PERCENTILES = [50, 95, 99]
+
+
+class RingBuffer:
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.samples = np.zeros(capacity)
+        self.index = 0  # position of the next sample
+        self.count = 0  # samples recorded since the last reset, including overwritten ones
+
+    def append(self, value):
+        self.samples[self.index] = value
+        self.index = (self.index + 1) % len(self.samples)
+        self.count += 1
+
+    def values(self):
+        """Samples still in the buffer, oldest first."""
+        if self.count < len(self.samples):
+            return self.samples[:self.count].copy()
+        return np.roll(self.samples, -self.index)
+
+    def reset(self):
+        self.index = 0
+        self.count = 0
+
+
+class Telemetry:
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.enabled = True
+        self.buffers = {}  # metric name -> RingBuffer
+        self.lock = threading.Lock()  # Only guards creating buffers: BLE writes are recorded from the BLE thread
+        self.started = time.time()
+
+    def record(self, name, seconds):
+        if not self.enabled:
+            return
+        buffer = self.buffers.get(name)
+        if buffer is None:
+            with self.lock:
+                buffer = self.buffers.setdefault(name, RingBuffer(self.capacity))
+        buffer.append(seconds)
+
+    def reset(self):
+        for buffer in list(self.buffers.values()):
+            buffer.reset()
+        self.started = time.time()
+
+    def summary(self):
+        """Metric name -> statistics in milliseconds over the samples still buffered."""
+        stats = {}
+        for name, buffer in sorted(self.buffers.items()):
+            values = buffer.values() * 1000
+            if len(values) == 0:
+                continue
+            percentiles = np.percentile(values, PERCENTILES)
+            stats[name] = {
+                'count': buffer.count,
+                'mean_ms': round(float(values.mean()), 4),
+                **{f'p{p}_ms': round(float(v), 4) for p, v in zip(PERCENTILES, percentiles)},
+                'max_ms': round(float(values.max()), 4),
+            }
+        return stats
+
+    def dump_json(self, file_name):
+        with open(file_name, 'w') as file:
+            json.dump({
+                'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+                'dumped': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'capacity': self.capacity,
+                'metrics': self.summary(),
+            }, file, indent=2)
+
+
+# Shared by the application, the timer and the BLE API
+telemetry = Telemetry()
+
+
+# Example usage
+if __name__ == '__main__':
+    start = time.perf_counter()
+    for _ in range(100000):
+        telemetry.record('example', 0.001)
+    print(f'record(): {1e9 * (time.perf_counter() - start) / 100000:.0f} ns per call')
+    print(telemetry.summary())
@@ -0,0 +1,153 @@
+'''
+Cached composition of a timeline's clips into one sampled signal.
+
+ComposedTimeline keeps the combined signal of a clip list (each clip tiled over its own
+[start_time, stop_time) range, later clips drawn over earlier ones) together with its min/max LOD
+pyramid. Calling update() with the current clip list only re-renders the sample ranges touched by
+clips that were added, removed or changed since the previous call, and refreshes the pyramid over
+those ranges, so a redraw after a selection change or a single clip edit costs almost nothing.
+
+Clips are compared by their sample range and by the identity of their data list: the timeline code
+always replaces clip data with new lists when editing, so in-place mutation of a clip's data is not
+detected (call invalidate() if that ever happens).
+'''
+
+import numpy as np
+
+from waveform_lod import MinMaxPyramid
+
+DEFAULT_DURATION = 10  # seconds of silence shown for an empty timeline
+
+
+class ComposedTimeline:
+    def __init__(self, sample_rate, component='data'):
+        self.sample_rate = sample_rate
+        self.component = component  # Options: 'data', 'high_freq', 'low_freq'
+        self.invalidate()
+
+    def invalidate(self):
+        """Drop the cached signal so the next update() renders every clip again."""
+        self.clips = []  # (start_sample, stop_sample, clip data) for each clip of the last update
+        self.duration = None
+        self.data = np.zeros(0)
+        self.pyramid = None
+
+    def clip_key(self, signal):
+        start_sample = int(signal["start_time"] * self.sample_rate)
+        stop_sample = int(signal["stop_time"] * self.sample_rate)
+        return start_sample, stop_sample, signal.get(self.component)
+
+    def update(self, signals):
+        """
+        Bring the cached signal in line with the given clips.
+        Returns (duration in seconds, combined samples, MinMaxPyramid of the samples).
+        """
+        if not signals:
+            total_samples = self.sample_rate * DEFAULT_DURATION
+            if self.clips or self.duration != DEFAULT_DURATION:
+                self.clips = []
+                self.duration = DEFAULT_DURATION
+                self.data = np.zeros(total_samples)
+                self.pyramid = MinMaxPyramid(self.data)
+            return self.duration, self.data, self.pyramid
+
+        clips = [self.clip_key(signal) for signal in signals]
+        duration = max(signal["stop_time"] for signal in signals)
+        total_samples = int(duration * self.sample_rate)
+
+        # Sample ranges whose content may have changed since the last update
+        old_ids = {self.identity(clip) for clip in self.clips}
+        new_ids = {self.identity(clip) for clip in clips}
+        if old_ids == new_ids and [self.identity(clip) for clip in self.clips] != [self.identity(clip) for clip in clips]:
+            # Same clips in another order: overlapping parts may be drawn differently
+            dirty = [(0, total_samples)]
+        else:
+            dirty = [clip[:2] for clip in self.clips if self.identity(clip) not in new_ids]
+            dirty += [clip[:2] for clip in clips if self.identity(clip) not in old_ids]
+
+        resized = total_samples != len(self.data)
+        if resized:
+            data = np.zeros(total_samples)
+            keep = min(total_samples, len(self.data))
+            data[:keep] = self.data[:keep]
+            self.data = data
+
+        ranges = self.merge_ranges(dirty, total_samples)
+        for start, stop in ranges:
+            self.render_range(clips, start, stop)
+
+        if resized or self.pyramid is None:
+            self.pyramid = MinMaxPyramid(self.data)
+        else:
+            for start, stop in ranges:
+                self.pyramid.update_range(start, stop)
+
+        self.clips = clips
+        self.duration = duration
+        return self.duration, self.data, self.pyramid
+
+    @staticmethod
+    def identity(clip):
+        start_sample, stop_sample, data = clip
+        return start_sample, stop_sample, id(data)
+
+    @staticmethod
+    def merge_ranges(ranges, total_samples):
+        """Clip the ranges to the signal length and merge the overlapping ones."""
+        merged = []
+        for start, stop in sorted(ranges):
+            start, stop = max(0, start), min(total_samples, stop)
+            if stop <= start:
+                continue
+            if merged and start <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], stop))
+            else:
+                merged.append((start, stop))
+        return merged
+
+    def render_range(self, clips, start, stop):
+        """Re-render data[start:stop] from every clip overlapping it, in timeline order."""
+        self.data[start:stop] = 0.0
+        for clip_start, clip_stop, clip_data in clips:
+            lo, hi = max(start, clip_start), min(stop, clip_stop)
+            if hi <= lo:
+                continue
+            if clip_data is not None and len(clip_data) > 0:
+                # The clip is repeated to fill its duration (same as tiling it and truncating)
+                self.data[lo:hi] = self.tiled_samples(clip_data, lo - clip_start, hi - lo)
+            else:
+                self.data[lo:hi] = 0.0  # Fallback to an empty signal for this duration
+
+    @staticmethod
+    def tiled_samples(clip_data, offset, count):
+        """Samples offset .. offset + count of clip_data repeated end to end."""
+        first = offset % len(clip_data)
+        if first + count <= len(clip_data):
+            return np.asarray(clip_data[first:first + count], dtype=float)
+        rotated = np.concatenate((np.asarray(clip_data[first:], dtype=float), np.asarray(clip_data[:first], dtype=float)))
+        return np.resize(rotated, count)
+
+
+# Example usage
+if __name__ == '__main__':
+    import time
+
+    fs = 44100
+    clips = [
+        {"data": list(np.sin(2 * np.pi * 170 * np.arange(fs) / fs)), "start_time": 0, "stop_time": 30},
+        {"data": list(np.ones(fs // 10)), "start_time": 30, "stop_time": 60},
+    ]
+    timeline = ComposedTimeline(fs)
+
+    start = time.perf_counter()
+    timeline.update(clips)
+    print(f'Full composition: {1000 * (time.perf_counter() - start):.1f} ms')
+
+    start = time.perf_counter()
+    timeline.update(clips)
+    print(f'Unchanged clips: {1000 * (time.perf_counter() - start):.3f} ms')
+
+    clips[1] = dict(clips[1], data=list(np.full(fs // 10, 0.5)))
+    start = time.perf_counter()
+    timeline.update(clips)
+    print(f'One clip changed: {1000 * (time.perf_counter() - start):.1f} ms')
@@ -0,0 +1,70 @@
+'''
+Design-wide extent of the timeline (the largest clip stop time), kept up to date incrementally.
+
+TimelineExtent stores the last stop time of each actuator, counts how many actuators end at each
+stop time and keeps those times in a max-heap, so the total time is read in O(1) on every playback
+tick and an edit only costs a pass over the clips of the edited actuator. Stop times that no
+actuator uses anymore are dropped from the heap lazily, when they reach its top.
+
+The application reports edits where it already refreshes the timeline overview
+(Haptics_App.update_actuator_text), and when actuators are renamed, removed or cleared.
+'''
+
+import heapq
+from collections import Counter
+
+
+class TimelineExtent:
+    def __init__(self):
+        self.stop_times = {}  # actuator id -> stop time of its last clip
+        self.counts = Counter()  # stop time -> number of actuators ending there
+        self.heap = []  # negated stop times, may hold times whose count dropped to 0
+
+    def update(self, actuator_id, signals):
+        """Record the clips of one actuator after they were added, removed or trimmed."""
+        self.remove(actuator_id)
+        if not signals:
+            return
+        stop_time = max(signal["stop_time"] for signal in signals)
+        self.stop_times[actuator_id] = stop_time
+        if self.counts[stop_time] == 0:
+            heapq.heappush(self.heap, -stop_time)
+        self.counts[stop_time] += 1
+
+    def remove(self, actuator_id):
+        stop_time = self.stop_times.pop(actuator_id, None)
+        if stop_time is None:
+            return
+        self.counts[stop_time] -= 1
+        if self.counts[stop_time] == 0:
+            del self.counts[stop_time]
+
+    def rename(self, old_actuator_id, new_actuator_id):
+        if old_actuator_id in self.stop_times:
+            self.stop_times[new_actuator_id] = self.stop_times.pop(old_actuator_id)
+
+    def reset(self, actuator_signals=None):
+        """Rebuild from every actuator's clips (e.g. after a design was loaded)."""
+        self.stop_times.clear()
+        self.counts.clear()
+        self.heap = []
+        for actuator_id, signals in (actuator_signals or {}).items():
+            self.update(actuator_id, signals)
+
+    @property
+    def total_time(self):
+        while self.heap and -self.heap[0] not in self.counts:
+            heapq.heappop(self.heap)
+        return -self.heap[0] if self.heap else 0
+
+
+# Example usage
+if __name__ == '__main__':
+    extent = TimelineExtent()
+    extent.update('A.1', [{"start_time": 0, "stop_time": 2.5}, {"start_time": 3, "stop_time": 4.0}])
+    extent.update('A.2', [{"start_time": 1, "stop_time": 6.0}])
+    print(extent.total_time)  # 6.0
+    extent.update('A.2', [{"start_time": 1, "stop_time": 3.0}])  # A.2's clip trimmed
+    print(extent.total_time)  # 4.0
+    extent.remove('A.1')
+    print(extent.total_time)  # 3.0
@@ -0,0 +1,168 @@
+'''
+Custom-painted overview of every actuator's timeline (the rows below the waveform plotter).
+
+TimelineOverview is a single widget that paints one row per actuator with its clips drawn as
+rounded boxes, instead of one QWidget per actuator and one QLabel per clip. Only the rows inside
+the exposed area are painted, so scrolling through hundreds of actuators stays cheap; clicks are
+hit-tested against the cached clip rectangles; and updating one actuator only recomputes and
+repaints that row (unless the global timeline length changed, which rescales every row).
+'''
+
+from PyQt6 import QtCore, QtGui, QtWidgets
+
+from utils import OS_DEPENDENT_VALUE
+
+ROW_HEIGHT = 46
+ROW_SPACING = 6
+CLIP_HEIGHT = 30
+CLIP_RADIUS = 7
+CLIP_PADDING = 3
+CLIP_COLOR = QtGui.QColor(100, 150, 250, 150)
+TEXT_COLOR = QtGui.QColor('white')
+
+
+class TimelineRow:
+    def __init__(self, actuator_id, label, color):
+        self.actuator_id = actuator_id
+        self.label = label  # e.g. "LRA - A.1"
+        self.color = QtGui.QColor(color)
+        self.clips = []  # (signal, text) sorted by start time
+
+
+class TimelineOverview(QtWidgets.QWidget):
+    clip_context_menu_requested = QtCore.pyqtSignal(str, object, QtCore.QPoint)  # actuator id, signal, global position
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []  # rows in display order
+        self.row_index = {}  # actuator id -> index in self.rows
+        self.total_time = 1  # length of the longest timeline, shared by every row
+        self.setSizePolicy(QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Fixed)
+        self.update_height()
+
+    # Rows
+    def add_row(self, actuator_id, label, color):
+        self.row_index[actuator_id] = len(self.rows)
+        self.rows.append(TimelineRow(actuator_id, label, color))
+        self.update_height()
+        self.update(self.row_rect(len(self.rows) - 1))
+
+    def update_row(self, old_actuator_id, new_actuator_id, label, color):
+        """Rename / recolour a row in place."""
+        index = self.row_index.pop(old_actuator_id, None)
+        if index is None:
+            return
+        row = self.rows[index]
+        row.actuator_id, row.label, row.color = new_actuator_id, label, QtGui.QColor(color)
+        self.row_index[new_actuator_id] = index
+        self.update(self.row_rect(index))
+
+    def remove_row(self, actuator_id):
+        index = self.row_index.pop(actuator_id, None)
+        if index is None:
+            return
+        del self.rows[index]
+        self.row_index = {row.actuator_id: i for i, row in enumerate(self.rows)}
+        self.update_height()
+        self.update()
+
+    def clear(self):
+        self.rows.clear()
+        self.row_index.clear()
+        self.update_height()
+        self.update()
+
+    def set_clips(self, actuator_id, signals):
+        """Replace the clips shown for one actuator and repaint only its row."""
+        index = self.row_index.get(actuator_id)
+        if index is None:
+            return
+        clips = []
+        for signal in sorted(signals, key=lambda signal: signal["start_time"]):
+            signal_params = ", ".join([f"{k}: {v}" for k, v in (signal["parameters"] or {}).items()])
+            clips.append((signal, f'{signal["type"]} ({signal_params})'))
+        self.rows[index].clips = clips
+        self.update(self.row_rect(index))
+
+    def set_total_time(self, total_time):
+        """Set the time mapped to the full row width; every row is rescaled when it changes."""
+        total_time = total_time or 1  # Avoid division by zero in the width calculation
+        if total_time != self.total_time:
+            self.total_time = total_time
+            self.update()
+
+    # Geometry
+    def update_height(self):
+        self.setFixedHeight(max(1, len(self.rows) * (ROW_HEIGHT + ROW_SPACING)))
+
+    def row_rect(self, index):
+        return QtCore.QRect(0, index * (ROW_HEIGHT + ROW_SPACING), self.width(), ROW_HEIGHT)
+
+    def time_offsets(self):
+        """Left/right margins in pixels, matching the playback slider travel."""
+        dpi = self.logicalDpiX()
+        offset = (OS_DEPENDENT_VALUE / 2.54) * dpi
+        return offset, offset
+
+    def clip_rect(self, index, signal):
+        left_offset, right_offset = self.time_offsets()
+        timeline_width = self.width() - left_offset - right_offset
+        x = left_offset + signal["start_time"] / self.total_time * timeline_width
+        width = (signal["stop_time"] - signal["start_time"]) / self.total_time * timeline_width
+        row_top = index * (ROW_HEIGHT + ROW_SPACING)
+        return QtCore.QRectF(x, row_top + (ROW_HEIGHT - CLIP_HEIGHT) / 2, width, CLIP_HEIGHT)
+
+    def visible_rows(self, rect):
+        """Range of row indices intersecting rect."""
+        pitch = ROW_HEIGHT + ROW_SPACING
+        first = max(0, rect.top() // pitch)
+        last = min(len(self.rows), rect.bottom() // pitch + 1)
+        return range(first, last)
+
+    def hit_test(self, pos):
+        """Return (row, signal) under the widget position pos; signal is None between clips."""
+        pitch = ROW_HEIGHT + ROW_SPACING
+        index = int(pos.y()) // pitch
+        if not 0 <= index < len(self.rows) or pos.y() - index * pitch >= ROW_HEIGHT:
+            return None, None
+        row = self.rows[index]
+        for signal, _ in reversed(row.clips):  # Later clips are drawn on top
+            if self.clip_rect(index, signal).contains(QtCore.QPointF(pos)):
+                return row, signal
+        return row, None
+
+    # Events
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        painter.setRenderHint(QtGui.QPainter.RenderHint.Antialiasing)
+        exposed = event.rect()
+        for index in self.visible_rows(exposed):
+            row = self.rows[index]
+            row_rect = self.row_rect(index)
+            painter.fillRect(row_rect, row.color)
+
+            # Actuator label on the left of the row
+            painter.setPen(TEXT_COLOR)
+            label_rect = row_rect.adjusted(9, 0, -9, 0)
+            painter.drawText(label_rect, QtCore.Qt.AlignmentFlag.AlignLeft | QtCore.Qt.AlignmentFlag.AlignVCenter, row.label)
+
+            # Clips, skipping those outside the exposed area
+            for signal, text in row.clips:
+                clip_rect = self.clip_rect(index, signal)
+                if clip_rect.right() < exposed.left() or clip_rect.left() > exposed.right():
+                    continue
+                painter.setPen(QtCore.Qt.PenStyle.NoPen)
+                painter.setBrush(CLIP_COLOR)
+                painter.drawRoundedRect(clip_rect, CLIP_RADIUS, CLIP_RADIUS)
+                painter.setPen(TEXT_COLOR)
+                text_rect = clip_rect.adjusted(CLIP_PADDING, CLIP_PADDING, -CLIP_PADDING, -CLIP_PADDING)
+                elided = painter.fontMetrics().elidedText(text, QtCore.Qt.TextElideMode.ElideRight, max(0, int(text_rect.width())))
+                painter.drawText(text_rect, QtCore.Qt.AlignmentFlag.AlignLeft | QtCore.Qt.AlignmentFlag.AlignVCenter, elided)
+        painter.end()
+
+    def contextMenuEvent(self, event):
+        row, signal = self.hit_test(event.pos())
+        if signal is not None:
+            self.clip_context_menu_requested.emit(row.actuator_id, signal, event.globalPos())
+        else:
+            super().contextMenuEvent(event)
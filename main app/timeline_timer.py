@@ -1,6 +1,12 @@
 from PyQt6.QtCore import QThread, QObject, pyqtSignal, QTimer
 from PyQt6.QtWidgets import QApplication, QMainWindow, QPushButton, QVBoxLayout, QWidget
 from time import perf_counter
+import threading
+
+from telemetry import telemetry
+from haptics_logging import get_logger
+
+log = get_logger('timer')
 
 class TimelineTimer(QObject):
     # Signals to communicate with other components
@@ -13,6 +19,9 @@ class TimelineTimer(QObject):
         self.update_interval = 5  # 5 ms interval in milliseconds
         self.last_lapse = -1
         self.update_count = 0
+        # seek, shift and manual_update are called from the GUI thread, update may run on the timer's thread:
+        # the lock makes each of them atomic, so a seek is never overwritten by a tick in progress
+        self.lock = threading.Lock()
 
         # Create a QTimer
         self.timer = QTimer()
@@ -22,40 +31,63 @@ class TimelineTimer(QObject):
 
     def update(self):
         """Update the current time and emit the time_updated signal."""
-        if self.playing:
+        with self.lock:
+            if not self.playing:
+                return
             current_lapse = perf_counter()
             time_lapse = current_lapse - self.last_lapse
             # if time_lapse > self.update_interval / 1000.0:
             self.current_time += time_lapse
             self.current_time = round(self.current_time, 6)
-            print(self.update_count, self.current_time)
+            tick = self.update_count
             self.update_count += 1
             self.last_lapse = current_lapse
-            self.time_updated.emit(self.current_time)
+            current_time = self.current_time
+        # Interval between two ticks and its deviation from the nominal interval
+        telemetry.record('timer.interval', time_lapse)
+        telemetry.record('timer.jitter', abs(time_lapse - self.update_interval / 1000.0))
+        log.debug('tick %d at %.6f s', tick, current_time)
+        self.time_updated.emit(current_time)  # Outside the lock: the slot may seek
 
     def play(self):
         """Start progressing the timeline forward."""
-        self.playing = True
-        self.last_lapse = perf_counter()
-        self.update_count = 0
+        with self.lock:
+            self.playing = True
+            self.last_lapse = perf_counter()
+            self.update_count = 0
         # self.timer.start()
 
     def pause(self):
         """Pause the timeline."""
-        self.playing = False
-        self.last_lapse = -1
+        with self.lock:
+            self.playing = False
+            self.last_lapse = -1
 
     def reset(self):
         """Reset the timeline to the initial state."""
-        self.playing = False
-        self.current_time = 0.0
-        self.last_lapse = -1
+        with self.lock:
+            self.playing = False
+            self.current_time = 0.0
+            self.last_lapse = -1
+
+    def seek(self, current_time):
+        """Jump to current_time without pausing: the next tick continues from there."""
+        with self.lock:
+            self.current_time = current_time
+            if self.playing:
+                self.last_lapse = perf_counter()
+
+    def shift(self, offset):
+        """Move the current time by offset without pausing; the time since the last tick is kept (loop wraps)."""
+        with self.lock:
+            self.current_time = round(self.current_time + offset, 6)
 
     def manual_update(self, current_time):
         """Manually update the timeline's current time."""
-        self.playing = False
-        self.current_time = current_time
-        self.last_lapse = -1
+        with self.lock:
+            self.playing = False
+            self.current_time = current_time
+            self.last_lapse = -1
 
 
 class MainWindow(QMainWindow):
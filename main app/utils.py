@@ -69,4 +69,32 @@ def generate_contrasting_color(existing_colors):
         
 def to_subscript(text):
     subscript_map = str.maketrans('0123456789', '₀₁₂₃₄₅₆₇₈₉')
-    return text.translate(subscript_map)
\ No newline at end of file
+    return text.translate(subscript_map)
+
+def slice_signal(signal, start_time, stop_time):
+    '''Return the part of a clip between start_time and stop_time as a new clip.
+    Each component is cut at the same relative position, so the downsampled
+    high_freq/low_freq lists stay aligned with data.'''
+    duration = signal["stop_time"] - signal["start_time"]
+    part = {**signal, "start_time": start_time, "stop_time": stop_time}
+    for key in ("data", "high_freq", "low_freq"):
+        values = signal.get(key)
+        if values is None or duration <= 0:
+            continue
+        begin = int(round((start_time - signal["start_time"]) / duration * len(values)))
+        end = int(round((stop_time - signal["start_time"]) / duration * len(values)))
+        part[key] = values[begin:end]
+    return part
+
+def cut_signal_range(signals, start_time, stop_time):
+    '''Return the clips with start_time..stop_time cleared: overlapping clips are trimmed, split or dropped.'''
+    adjusted_signals = []
+    for signal in signals:
+        if signal["stop_time"] <= start_time or signal["start_time"] >= stop_time:
+            adjusted_signals.append(signal)  # No overlap, keep the signal as is
+            continue
+        if signal["start_time"] < start_time:
+            adjusted_signals.append(slice_signal(signal, signal["start_time"], start_time))
+        if signal["stop_time"] > stop_time:
+            adjusted_signals.append(slice_signal(signal, stop_time, signal["stop_time"]))
+    return adjusted_signals
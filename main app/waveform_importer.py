@@ -0,0 +1,133 @@
+'''
+Readers for binary audio captures (WAV, optionally FLAC) used by the waveform importer.
+
+WAV files are parsed with the standard library and their sample data is memory-mapped, so a long
+multichannel capture is never loaded into memory as a whole: each channel is read back in chunks
+that can be fed straight into signal_resampler.resample_chunks.
+FLAC files are decoded block by block through the optional soundfile package.
+'''
+
+import os
+import struct
+
+import numpy as np
+
+soundfile = None  # optional dependency, imported when the first FLAC file is opened
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+AUDIO_FILE_EXTENSIONS = ('.wav', '.flac')
+
+
+class WavFile:
+    def __init__(self, file_path):
+        self.file_path = file_path
+        audio_format, self.num_channels, self.sampling_rate, self.bits_per_sample, data_offset, data_size = self.parse_header(file_path)
+
+        bytes_per_sample = self.bits_per_sample // 8
+        frame_size = bytes_per_sample * self.num_channels
+        self.num_frames = data_size // frame_size
+
+        # Map the raw data chunk; samples are converted to float only when a chunk is read
+        if audio_format == WAVE_FORMAT_IEEE_FLOAT and self.bits_per_sample in (32, 64):
+            dtype, self.scale, self.bias = np.dtype(f'<f{bytes_per_sample}'), 1.0, 0.0
+        elif audio_format == WAVE_FORMAT_PCM and self.bits_per_sample == 8:
+            dtype, self.scale, self.bias = np.dtype('u1'), 1 / 128, -128.0  # 8-bit PCM is unsigned
+        elif audio_format == WAVE_FORMAT_PCM and self.bits_per_sample in (16, 32):
+            dtype, self.scale, self.bias = np.dtype(f'<i{bytes_per_sample}'), 1 / 2 ** (self.bits_per_sample - 1), 0.0
+        elif audio_format == WAVE_FORMAT_PCM and self.bits_per_sample == 24:
+            dtype, self.scale, self.bias = np.dtype('u1'), 1 / 2 ** 23, 0.0  # assembled from 3 bytes per sample
+        else:
+            raise ValueError(f"Unsupported WAV encoding (format {audio_format}, {self.bits_per_sample} bits)")
+
+        if self.bits_per_sample == 24:
+            shape = (self.num_frames, self.num_channels, 3)
+        else:
+            shape = (self.num_frames, self.num_channels)
+        self.samples = np.memmap(file_path, dtype=dtype, mode='r', offset=data_offset, shape=shape)
+
+    @staticmethod
+    def parse_header(file_path):
+        """Walk the RIFF chunks and return (format, channels, rate, bits, data offset, data size)."""
+        file_size = os.path.getsize(file_path)
+        fmt = None
+        with open(file_path, 'rb') as f:
+            riff, _, wave = struct.unpack('<4sI4s', f.read(12))
+            if riff != b'RIFF' or wave != b'WAVE':
+                raise ValueError(f"{os.path.basename(file_path)} is not a RIFF/WAVE file")
+            while True:
+                header = f.read(8)
+                if len(header) < 8:
+                    break
+                chunk_id, chunk_size = struct.unpack('<4sI', header)
+                if chunk_id == b'fmt ':
+                    fmt = f.read(chunk_size)
+                elif chunk_id == b'data':
+                    if fmt is None:
+                        break
+                    audio_format, channels, rate, _, _, bits = struct.unpack('<HHIIHH', fmt[:16])
+                    if audio_format == WAVE_FORMAT_EXTENSIBLE and len(fmt) >= 26:
+                        audio_format = struct.unpack('<H', fmt[24:26])[0]  # first field of the sub-format GUID
+                    data_offset = f.tell()
+                    data_size = min(chunk_size, file_size - data_offset)  # streamed WAVs may leave the size unset
+                    return audio_format, channels, rate, bits, data_offset, data_size
+                else:
+                    f.seek(chunk_size, os.SEEK_CUR)
+                if chunk_size % 2:
+                    f.seek(1, os.SEEK_CUR)  # chunks are padded to an even size
+        raise ValueError(f"{os.path.basename(file_path)} has no fmt/data chunk")
+
+    def read_channel_chunks(self, channel, chunk_size=65536):
+        """Yield one channel as float arrays in [-1, 1], chunk_size frames at a time."""
+        for start in range(0, self.num_frames, chunk_size):
+            raw = self.samples[start:start + chunk_size, channel]
+            if self.bits_per_sample == 24:
+                raw = raw.astype(np.int32)
+                raw = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+                raw = np.where(raw >= 1 << 23, raw - (1 << 24), raw)  # sign-extend
+            yield (np.asarray(raw, dtype=float) + self.bias) * self.scale
+
+    def close(self):
+        mmap = getattr(self.samples, '_mmap', None)
+        self.samples = None
+        if mmap is not None:
+            mmap.close()
+
+
+class FlacFile:
+    def __init__(self, file_path):
+        global soundfile
+        if soundfile is None:
+            try:
+                import soundfile
+            except ImportError:
+                raise ImportError("FLAC import requires the soundfile package (pip install soundfile)")
+        self.file_path = file_path
+        info = soundfile.info(file_path)
+        self.num_channels = info.channels
+        self.sampling_rate = info.samplerate
+        self.num_frames = info.frames
+
+    def read_channel_chunks(self, channel, chunk_size=65536):
+        """Yield one channel as float arrays in [-1, 1], decoding chunk_size frames at a time."""
+        for block in soundfile.blocks(self.file_path, blocksize=chunk_size, dtype='float64', always_2d=True):
+            yield block[:, channel]
+
+    def close(self):
+        pass
+
+
+def is_audio_file(file_path):
+    return os.path.splitext(file_path)[1].lower() in AUDIO_FILE_EXTENSIONS
+
+
+def open_audio_file(file_path):
+    """Open a WAV or FLAC capture, dispatching on the file extension."""
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == '.wav':
+        return WavFile(file_path)
+    if extension == '.flac':
+        return FlacFile(file_path)
+    raise ValueError(f"Unsupported audio file type: {extension}")
@@ -0,0 +1,145 @@
+'''
+Level-of-detail rendering for long, uniformly sampled waveforms.
+
+MinMaxPyramid precomputes min/max mipmaps of a signal (each level reduces the previous one by a fixed factor),
+so the envelope of any sample range can be reduced to a given number of buckets by touching only a few
+blocks per bucket. LODLine keeps a matplotlib Line2D fed with one min/max pair per horizontal pixel of the
+visible x-range and refreshes it when the axes are panned, zoomed or resized, so drawing cost depends on
+the widget width instead of the clip length.
+'''
+
+import numpy as np
+
+PYRAMID_FACTOR = 4
+PYRAMID_MIN_LEVEL_SIZE = 256
+
+
+class MinMaxPyramid:
+    def __init__(self, data, factor=PYRAMID_FACTOR, min_level_size=PYRAMID_MIN_LEVEL_SIZE):
+        self.data = np.asarray(data, dtype=float).ravel()
+        self.factor = factor
+        # levels[k] = (block_size, mins, maxs), level 0 being the raw samples
+        self.levels = [(1, self.data, self.data)]
+        block_size, mins, maxs = self.levels[0]
+        while len(mins) > min_level_size:
+            starts = np.arange(0, len(mins), factor)
+            mins = np.minimum.reduceat(mins, starts)
+            maxs = np.maximum.reduceat(maxs, starts)
+            block_size *= factor
+            self.levels.append((block_size, mins, maxs))
+
+    def __len__(self):
+        return len(self.data)
+
+    def update_range(self, start, stop):
+        """Recompute the blocks covering data[start:stop] after those samples were changed in place."""
+        start, stop = max(0, start), min(len(self.data), stop)
+        if stop <= start:
+            return
+        for level in range(1, len(self.levels)):
+            _, source_mins, source_maxs = self.levels[level - 1]
+            _, mins, maxs = self.levels[level]
+            # Blocks of this level containing the changed blocks of the level below
+            start, stop = start // self.factor, -(-stop // self.factor)
+            source = slice(start * self.factor, min(stop * self.factor, len(source_mins)))
+            starts = np.arange(0, source.stop - source.start, self.factor)
+            mins[start:stop] = np.minimum.reduceat(source_mins[source], starts)
+            maxs[start:stop] = np.maximum.reduceat(source_maxs[source], starts)
+
+    def envelope(self, start, stop, num_buckets):
+        """
+        Reduce data[start:stop] to at most num_buckets (min, max) pairs.
+        Returns (sample indices, values) ready to be drawn as a line; ranges that are already
+        small enough are returned sample by sample.
+        """
+        start, stop = max(0, start), min(len(self.data), stop)
+        if stop <= start:
+            return np.empty(0, dtype=int), np.empty(0)
+        num_buckets = max(1, int(num_buckets))
+        if stop - start <= 2 * num_buckets:
+            return np.arange(start, stop), self.data[start:stop]
+
+        # Coarsest level whose blocks still fit at least once in every bucket
+        samples_per_bucket = (stop - start) / num_buckets
+        level = 0
+        while level + 1 < len(self.levels) and self.levels[level + 1][0] <= samples_per_bucket:
+            level += 1
+        block_size, mins, maxs = self.levels[level]
+
+        first_block, last_block = start // block_size, -(-stop // block_size)
+        edges = np.unique(np.linspace(first_block, last_block, num_buckets + 1).astype(int))
+        bucket_starts = edges[:-1] - first_block
+        bucket_mins = np.minimum.reduceat(mins[first_block:last_block], bucket_starts)
+        bucket_maxs = np.maximum.reduceat(maxs[first_block:last_block], bucket_starts)
+
+        # Draw each bucket as a vertical stroke from its min to its max
+        indices = np.repeat(edges[:-1] * block_size, 2)
+        values = np.empty(2 * len(bucket_mins))
+        values[0::2] = bucket_mins
+        values[1::2] = bucket_maxs
+        return indices, values
+
+
+class LODLine:
+    def __init__(self, axes, x, y, pyramid=None, **line_kwargs):
+        """Plot y against the uniformly spaced x on axes, decimated to the visible pixels."""
+        self.axes = axes
+        self.pyramid = pyramid if pyramid is not None else MinMaxPyramid(y)
+        num_samples = len(self.pyramid)
+        self.x0 = float(x[0]) if num_samples else 0.0
+        self.dx = (float(x[-1]) - self.x0) / (num_samples - 1) if num_samples > 1 else 1.0
+
+        # Start with the envelope of the whole signal so the data limits (autoscaling) cover all of it
+        self.line, = axes.plot(*self.envelope(self.x0, self.x0 + self.dx * num_samples), **line_kwargs)
+
+        self.xlim_cid = axes.callbacks.connect('xlim_changed', lambda _: self.refresh())
+        canvas = axes.figure.canvas
+        self.resize_cid = canvas.mpl_connect('resize_event', lambda _: self.refresh()) if canvas is not None else None
+
+    def envelope(self, x_min, x_max):
+        """Line data for the x-range [x_min, x_max] at one min/max pair per horizontal pixel."""
+        start = int(np.floor((x_min - self.x0) / self.dx)) - 1
+        stop = int(np.ceil((x_max - self.x0) / self.dx)) + 2
+        num_pixels = max(1, int(self.axes.bbox.width))
+        indices, values = self.pyramid.envelope(start, stop, num_pixels)
+        return self.x0 + indices * self.dx, values
+
+    def refresh(self):
+        """Recompute the line data for the current view of the axes."""
+        self.line.set_data(*self.envelope(*self.axes.get_xlim()))
+
+    def set_signal(self, x, y, pyramid=None):
+        """
+        Swap in a new signal while keeping the same Line2D. The line holds the envelope of the
+        whole signal until the next refresh, so relim()/autoscale_view() can run in between.
+        """
+        self.pyramid = pyramid if pyramid is not None else MinMaxPyramid(y)
+        num_samples = len(self.pyramid)
+        self.x0 = float(x[0]) if num_samples else 0.0
+        self.dx = (float(x[-1]) - self.x0) / (num_samples - 1) if num_samples > 1 else 1.0
+        self.line.set_data(*self.envelope(self.x0, self.x0 + self.dx * num_samples))
+
+    def detach(self):
+        """Stop following the axes; call before the axes are cleared or the line is discarded."""
+        if self.xlim_cid is not None:
+            self.axes.callbacks.disconnect(self.xlim_cid)
+            self.xlim_cid = None
+        if self.resize_cid is not None:
+            self.axes.figure.canvas.mpl_disconnect(self.resize_cid)
+            self.resize_cid = None
+
+
+# Example usage
+if __name__ == '__main__':
+    import time
+
+    fs = 44100
+    signal = np.sin(2 * np.pi * 170 * np.arange(60 * fs) / fs)  # 60 s timeline, 2.6M samples
+
+    start = time.perf_counter()
+    pyramid = MinMaxPyramid(signal)
+    print(f'Pyramid with {len(pyramid.levels)} levels built in {time.perf_counter() - start:.3f} s')
+
+    start = time.perf_counter()
+    indices, values = pyramid.envelope(0, len(signal), 800)
+    print(f'Envelope of {len(signal)} samples -> {len(values)} points in {1000 * (time.perf_counter() - start):.2f} ms')